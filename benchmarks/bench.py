@@ -0,0 +1,392 @@
+"""
+The benchmark suite of pymg.
+
+It measures what pymg costs compared with the bare Python interpreter by running synthetic scripts
+through pymg (in both --in-process and --subprocess modes) and through "python script.py".
+The scripts vary in size, traceback depth, volume of local variables and recipe. Each case reports
+the median wall time, the peak RSS and the time split between the phases of pymg (syntax check,
+workspace, child interpreter startup and rendering), and the number of writes and the peak memory of the rendering.
+
+The results are written as JSON, so they can be compared between commits:
+
+    python benchmarks/bench.py -o before.json
+    python benchmarks/bench.py -o after.json --compare before.json --threshold 0.1
+
+The exit code is 1 if a case is slower than the compared result by more than the threshold,
+or if the import budget of the exceptionhook (pymg.hook) is exceeded:
+https://github.com/mimseyedi/pymg/blob/master/docs/guide/how_does_pymg_work.md#hook_budget
+"""
+
+
+import io
+import os
+import sys
+import json
+import time
+import click
+import shutil
+import platform
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from pathlib import Path
+from contextlib import redirect_stdout
+
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, ROOT.__str__())
+
+# The state and caches of pymg (the crash history, the fingerprint database, the last operation and the search and
+# syntax caches) are kept in a temporary home while benchmarking, in this process and in the synthetic runs,
+# so the benchmark does not add to the state of the user. It must be set before pymg is imported.
+BENCH_HOME: Path = Path(tempfile.mkdtemp(prefix='pymg-bench-home-'))
+
+for variable in ('PYMG_FINGERPRINTS', 'PYMG_INDEX'):
+    os.environ.pop(variable, None)
+
+os.environ.update({
+    'XDG_STATE_HOME': Path(BENCH_HOME, 'state').__str__(), 'XDG_CACHE_HOME': Path(BENCH_HOME, 'cache').__str__(),
+    **({'LOCALAPPDATA': BENCH_HOME.__str__()} if os.name == 'nt' else {})
+})
+
+from pymg import pymg
+from pymg.hook import HOOK_IMPORT_BUDGET
+
+
+# The synthetic scripts are run with the pymg package of this repository.
+ENVIRONMENT: dict = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [ROOT.__str__(), os.environ.get('PYTHONPATH')]))}
+
+# The options of pymg that produce each recipe.
+RECIPES: dict = {
+    'type': ['-t'], 'message': ['-m'], 'file': ['-f'], 'scope': ['-s'], 'line': ['-l'], 'code': ['-c'],
+    'trace': ['-T'], 'inner': ['-i'], 'locals': ['-L'],
+    'trace_with_locals': ['-T', '-L'], 'inner_with_locals': ['-i', '-L'],
+}
+
+# Every case changes one dimension of the base case.
+BASE_CASE: dict = {'lines': 1000, 'depth': 10, 'locals': 0, 'recipe': 'type'}
+
+DIMENSIONS: dict = {
+    'quick': {
+        'lines': [1000, 100000], 'depth': [1, 100], 'locals': [0, 100000],
+        'recipe': ['type', 'code', 'trace', 'inner_with_locals'],
+    },
+    'full': {
+        'lines': [1000, 10000, 100000, 1000000], 'depth': [1, 10, 100, 1000], 'locals': [0, 1000, 100000, 1000000],
+        'recipe': list(RECIPES),
+    },
+}
+
+
+class WriteCounter(io.RawIOBase):
+    """
+    A pipe that counts the writes (the write system calls of a real pipe) and the bytes that reach it.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes, self.size = 0, 0
+
+    def writable(self) -> bool:
+        """
+        :return: bool
+        """
+
+        return True
+
+    def write(self, data: bytes) -> int:
+        """
+        The task of this method is to count a write and to discard its data.
+
+        :param data: The data of the write.
+        :return: int
+        """
+
+        self.writes += 1
+        self.size += len(data)
+
+        return len(data)
+
+
+def gen_script(lines: int, depth: int, locals_: int) -> str:
+    """
+    The task of this function is to generate a synthetic script that raises an exception.
+
+    :param lines: The number of lines of the script.
+    :param depth: The depth of the traceback (the number of frames of the recursive function).
+    :param locals_: The number of items in the local variables of the innermost frame.
+    :return: str
+    """
+
+    body: list = [
+        'import sys',
+        f'sys.setrecursionlimit({depth + 1000})',
+        '',
+        'def recurse(n):',
+        '    if n <= 1:',
+        f'        data = list(range({locals_}))',
+        f'        table = {{i: str(i) for i in range({min(locals_, 100000)})}}',
+        '        return 1 / 0',
+        '    return recurse(n - 1)',
+        '',
+    ]
+
+    body.extend(f'value_{number} = {number}' for number in range(max(lines - len(body) - 1, 0)))
+    body.append(f'recurse({depth})')
+
+    return '\n'.join(body) + '\n'
+
+
+def run(command: list[str], cwd: Path) -> tuple[float, int|None]:
+    """
+    The task of this function is to run a command and to measure its wall time and peak RSS.
+
+    -Note: The peak RSS is measured with os.wait4, which is not available on Windows, so there it is None.
+
+    :param command: The command.
+    :param cwd: The working directory of the command.
+    :return: tuple[float, int|None]
+    """
+
+    start: float = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=cwd, env=ENVIRONMENT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    if not hasattr(os, 'wait4'):
+        process.wait()
+        return time.perf_counter() - start, None
+
+    # os.wait4 reaps the process and reports the resource usage of this process alone.
+    _, status, usage = os.wait4(process.pid, 0)
+    wall: float = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    return wall, usage.ru_maxrss
+
+
+def measure_phases(script: Path, recipe: str, repeat: int) -> dict:
+    """
+    The task of this function is to measure the phases of pymg inside this process.
+
+    :param script: The path of the synthetic script.
+    :param recipe: The recipe.
+    :param repeat: The number of repetitions.
+    :return: dict
+    """
+
+    phases: dict = {
+        'syntax_check': [], 'workspace': [], 'child_startup': [], 'rendering': [],
+        'rendering_writes': [], 'rendering_peak_bytes': []
+    }
+    empty_script: Path = Path(script.parent, 'empty.py')
+    empty_script.write_text('')
+
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        _, code = pymg.check_syntax(source_file=script, source=pymg.read_source(source_file=script))
+        phases['syntax_check'].append(time.perf_counter() - start)
+
+        start: float = time.perf_counter()
+        workspace: Path = pymg.mk_workspace()
+        recipe_file, source_info_file, settings_file = pymg.get_workspace_files()
+        pymg.write_recipe(recipe_file=recipe_file, recipe_data=[recipe])
+        pymg.write_source_info(source_info_file=source_info_file, source_info=(script,))
+        pymg.write_settings(settings_file=settings_file, settings={})
+        phases['workspace'].append(time.perf_counter() - start)
+
+        launcher_wall, _ = run([sys.executable, '-c', pymg.gen_launcher(), empty_script.__str__()], cwd=script.parent)
+        python_wall, _ = run([sys.executable, empty_script.__str__()], cwd=script.parent)
+        phases['child_startup'].append(max(launcher_wall - python_wall, 0))
+
+        recursion_limit: int = sys.getrecursionlimit()
+        try:
+            exec(code, {'__name__': '__main__', '__file__': script.__str__()})
+        except ZeroDivisionError:
+            exc_type, exc_message, traceback_ = sys.exc_info()
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+
+        pipe: WriteCounter = WriteCounter()
+        start: float = time.perf_counter()
+        with redirect_stdout(io.TextIOWrapper(io.BufferedWriter(pipe), encoding='utf-8')) as stdout:
+            pymg.display_error_message(exc_type=exc_type, exc_message=exc_message, traceback_=traceback_.tb_next)
+            stdout.flush()
+        phases['rendering'].append(time.perf_counter() - start)
+        phases['rendering_writes'].append(pipe.writes)
+
+        tracemalloc.start()
+        with redirect_stdout(io.StringIO()):
+            pymg.display_error_message(exc_type=exc_type, exc_message=exc_message, traceback_=traceback_.tb_next)
+        phases['rendering_peak_bytes'].append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        del exc_type, exc_message, traceback_
+        pymg.rm_workspace(workspace=workspace)
+
+    return {phase: statistics.median(times) for phase, times in phases.items()}
+
+
+def measure_case(case: dict, directory: Path, repeat: int) -> dict:
+    """
+    The task of this function is to measure one case against the bare Python interpreter.
+
+    :param case: The case (lines, depth, locals and recipe).
+    :param directory: The directory where the synthetic script is written.
+    :param repeat: The number of repetitions.
+    :return: dict
+    """
+
+    script: Path = Path(directory, 'script.py')
+    script.write_text(gen_script(lines=case['lines'], depth=case['depth'], locals_=case['locals']))
+
+    launcher: str = 'import sys; from pymg.pymg import main; main()'
+    commands: dict = {
+        'python': [sys.executable, script.__str__()],
+        'in_process': [sys.executable, '-c', launcher, script.__str__(), *RECIPES[case['recipe']]],
+        'subprocess': [sys.executable, '-c', launcher, script.__str__(), *RECIPES[case['recipe']], '--subprocess'],
+    }
+
+    result: dict = {**case}
+    for mode, command in commands.items():
+        walls, rss = zip(*[run(command=command, cwd=directory) for _ in range(repeat)])
+        result[mode] = {'wall': statistics.median(walls), 'peak_rss_kb': None if None in rss else max(rss)}
+
+    result['overhead'] = {
+        mode: result[mode]['wall'] - result['python']['wall'] for mode in ('in_process', 'subprocess')
+    }
+    result['phases'] = measure_phases(script=script, recipe=case['recipe'], repeat=repeat)
+
+    return result
+
+
+def gen_cases(preset: str) -> dict:
+    """
+    The task of this function is to generate the cases of a preset. Each case changes one dimension of the base case.
+
+    :param preset: The name of the preset (quick or full).
+    :return: dict
+    """
+
+    cases: dict = {}
+    for dimension, values in DIMENSIONS[preset].items():
+        for value in values:
+            case: dict = {**BASE_CASE, dimension: value}
+            cases[f"lines={case['lines']},depth={case['depth']},locals={case['locals']},recipe={case['recipe']}"] = case
+
+    return cases
+
+
+def measure_hook_import() -> dict:
+    """
+    The task of this function is to measure the import of the exceptionhook (pymg.hook)
+    and to check it against its budget.
+
+    :return: dict
+    """
+
+    list_modules: str = 'import sys; {}print("\\n".join(sys.modules))'
+
+    baseline: set = set(subprocess.run(
+        [sys.executable, '-c', list_modules.format('')], env=ENVIRONMENT, capture_output=True, text=True
+    ).stdout.split())
+    with_hook: set = set(subprocess.run(
+        [sys.executable, '-c', list_modules.format('import pymg.hook; ')], env=ENVIRONMENT, capture_output=True, text=True
+    ).stdout.split())
+
+    importtime: str = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import pymg.hook'], env=ENVIRONMENT, capture_output=True, text=True
+    ).stderr
+
+    cumulative: int = max(
+        [int(line.split('|')[1]) for line in importtime.splitlines() if line.split('|')[-1].strip() == 'pymg'],
+        default=0
+    )
+    new_modules: list = sorted(with_hook - baseline - {'pymg', 'pymg.hook'})
+
+    return {
+        'cumulative_us': cumulative, 'budget_us': HOOK_IMPORT_BUDGET, 'new_modules': new_modules,
+        'within_budget': cumulative < HOOK_IMPORT_BUDGET and not new_modules
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    The task of this function is to compare the results with a baseline and to return the regressions.
+
+    :param results: The results of this run.
+    :param baseline: The results of a previous run.
+    :param threshold: The allowed relative slowdown (0.1 = 10%).
+    :return: list[str]
+    """
+
+    regressions: list = []
+    for name, result in results['cases'].items():
+        if (previous := baseline.get('cases', {}).get(name)) is None:
+            continue
+
+        for mode in ('in_process', 'subprocess'):
+            before, after = previous[mode]['wall'], result[mode]['wall']
+            if after > before * (1 + threshold):
+                regressions.append(f'{name} [{mode}]: {before:.4f}s -> {after:.4f}s (+{(after / before - 1):.0%})')
+
+    return regressions
+
+
+@click.command(context_settings={'help_option_names': ['-h', '--help']})
+@click.option('-p', '--preset', type=click.Choice(list(DIMENSIONS)), default='quick', show_default=True, help="The cases to run.")
+@click.option('-n', '--repeat', type=click.IntRange(min=1), default=5, show_default=True, help="The number of repetitions of each case (the median is reported).")
+@click.option('-o', '--output', type=Path, help="Writes the results (JSON) to a file.")
+@click.option('--compare', 'baseline_file', type=Path, help="Compares the results with the results (JSON) of a previous run.")
+@click.option('--threshold', type=click.FloatRange(min=0), default=0.1, show_default=True, help="The allowed relative slowdown compared with --compare.")
+def main(preset: str, repeat: int, output: Path|None, baseline_file: Path|None, threshold: float):
+    """
+    Measures the overhead of pymg compared with the bare Python interpreter.
+    """
+
+    directory: Path = Path(tempfile.mkdtemp(prefix='pymg-bench-'))
+
+    try:
+        results: dict = {
+            'meta': {
+                'python': platform.python_version(), 'platform': platform.platform(),
+                'commit': subprocess.run(
+                    ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True
+                ).stdout.strip(),
+                'preset': preset, 'repeat': repeat,
+            },
+            'hook_import': measure_hook_import(),
+            'cases': {},
+        }
+
+        for name, case in gen_cases(preset=preset).items():
+            click.echo(f'{name} ...', err=True)
+            results['cases'][name] = measure_case(case=case, directory=directory, repeat=repeat)
+
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        shutil.rmtree(BENCH_HOME, ignore_errors=True)
+
+    report: str = json.dumps(results, indent=2)
+    if output is not None:
+        output.write_text(report + '\n')
+    else:
+        click.echo(report)
+
+    failures: list = [] if results['hook_import']['within_budget'] else [
+        f"pymg.hook import: {results['hook_import']['cumulative_us']}us "
+        f"(budget {HOOK_IMPORT_BUDGET}us), new modules: {results['hook_import']['new_modules']}"
+    ]
+
+    if baseline_file is not None:
+        failures.extend(compare(results=results, baseline=json.loads(baseline_file.read_text()), threshold=threshold))
+
+    for failure in failures:
+        click.echo(f'REGRESSION: {failure}', err=True)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -27,4 +27,4 @@ pymg Github repository:
 https://github.com/mimseyedi/pymg
 """
 
-from .pymg import display_error_message
\ No newline at end of file
+from .hook import display_error_message
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+The thin client of the pymg server.
+
+It sends the command line of pymg (the options, the Python file and its arguments) together with the current
+directory, the environment variables, the interpreter and its sys.path and the size of the terminal to a pymg server
+(pymg --serve) over a Unix socket, and streams back the stdout and stderr of the run (including the rendered exception). Because it only imports
+modules that the Python interpreter has already loaded at startup (and socket), it starts almost as fast as Python.
+
+If no server is running (or the server runs another Python interpreter), the command line is interpreted by pymg
+itself.
+
+Usage:
+    pymg-client [--socket PATH] [OPTIONS] [PYTHON_FILE]...
+"""
+
+
+import os
+import sys
+import json
+import socket
+import struct
+
+
+# The header of every frame that the server sends: the channel (1 for stdout, 2 for stderr,
+# 0 for the exit code) and the length of the data of the frame.
+FRAME_HEADER: struct.Struct = struct.Struct('!BI')
+
+# The channel of the frame that the server sends instead of running the command line, when the interpreter of the
+# client (sys.executable or sys.prefix, such as another virtual environment) is not the interpreter of the server.
+FRAME_LOCAL: int = 3
+
+# The default path of the Unix socket of the pymg server.
+SERVER_SOCKET: str = os.path.join(
+    os.environ['XDG_RUNTIME_DIR'], 'pymg', 'server.sock') if os.environ.get('XDG_RUNTIME_DIR') \
+    else os.path.join(os.environ.get('XDG_STATE_HOME', os.path.join(os.path.expanduser('~'), '.local', 'state')),
+                      'pymg', 'server.sock')
+
+
+def recv_exactly(connection: socket.socket, size: int) -> bytes:
+    """
+    The task of this function is to receive exactly size bytes from the server (or fewer if the connection is closed).
+
+    :param connection: The connection to the pymg server.
+    :param size: The number of bytes.
+    :return: bytes
+    """
+
+    data: bytearray = bytearray()
+
+    while len(data) < size and (chunk := connection.recv(size - len(data))):
+        data.extend(chunk)
+
+    return bytes(data)
+
+
+def request(argv: list[str], socket_path: str) -> int|None:
+    """
+    The task of this function is to send a command line to the pymg server and to stream back its output.
+    If the server can not run it (another interpreter), None is returned.
+
+    :param argv: The command line of pymg (without the program name).
+    :param socket_path: The path of the Unix socket of the pymg server.
+    :return: int|None
+    """
+
+    try:
+        columns: int = os.get_terminal_size(sys.stdout.fileno()).columns
+    except (OSError, ValueError):
+        columns: int = int(os.environ.get('COLUMNS', 80))
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(
+            json.dumps(
+                {
+                    'argv': argv, 'cwd': os.getcwd(), 'env': dict(os.environ),
+                    'executable': sys.executable, 'prefix': sys.prefix, 'path': sys.path,
+                    'isatty': sys.stdout.isatty(), 'columns': columns
+                }
+            ).encode('utf-8') + b'\n'
+        )
+
+        streams: dict = {1: sys.stdout.buffer, 2: sys.stderr.buffer}
+
+        while header := recv_exactly(connection, FRAME_HEADER.size):
+            channel, length = FRAME_HEADER.unpack(header)
+            data: bytes = recv_exactly(connection, length)
+
+            if channel == 0:
+                return int(data)
+
+            if channel == FRAME_LOCAL:
+                return None
+
+            streams[channel].write(data)
+            streams[channel].flush()
+
+    return 1
+
+
+def main() -> None:
+    """
+    The task of this function is to run the command line through the pymg server,
+    or through pymg itself if no server is running or the server runs another interpreter.
+
+    :return: None
+    """
+
+    argv, socket_path = sys.argv[1:], os.environ.get('PYMG_SOCKET', SERVER_SOCKET)
+
+    if argv[:1] == ['--socket'] and len(argv) > 1:
+        argv, socket_path = argv[2:], argv[1]
+
+    try:
+        exit_code: int|None = request(argv=argv, socket_path=socket_path)
+    except (AttributeError, FileNotFoundError, ConnectionRefusedError):
+        exit_code: int|None = None
+
+    if exit_code is None:
+        from .pymg import main as pymg_main
+
+        pymg_main(args=argv, prog_name='pymg')
+    else:
+        sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+"""
+The lightweight exceptionhook of pymg.
+
+This module is imported by the launcher of pymg before the first line of the source is executed,
+so it only imports modules that the Python interpreter has already loaded at startup. The renderer (pymg.pymg)
+and therefore click, requests and rich are imported only when an exception actually occurs.
+
+-Note: The import cost of this module is kept within the budget documented in:
+https://github.com/mimseyedi/pymg/blob/master/docs/guide/how_does_pymg_work.md#hook_budget
+"""
+
+
+import io
+import os
+import sys
+import time
+import _thread
+from types import TracebackType, ModuleType
+
+
+# The budget of importing this module (cumulative microseconds reported by -X importtime), which is checked by
+# the tests (tests/test_hook.py) and the benchmark suite (benchmarks/bench.py).
+HOOK_IMPORT_BUDGET: int = 5000
+
+# The time when pymg (or the launcher of a child interpreter) started to import pymg, which is
+# the first timestamp of the --timings option (before click, rich and requests are imported).
+STARTED: int = time.perf_counter_ns()
+
+
+def mark(phase: str, timestamp: int|None=None) -> None:
+    """
+    The task of this function is to record the end of a phase of pymg for the --timings option.
+
+    -Note: The PYMG_TIMINGS environment variable holds the path of the timings file, which is inherited by
+    the child interpreter, so the phases of both processes are appended (one short line with a single write call)
+    to the same file. perf_counter is a system-wide monotonic clock, so the timestamps of the processes are comparable.
+    Without the --timings option, this function only looks up the environment variable.
+
+    :param phase: The name of the phase that ended.
+    :param timestamp: The time (perf_counter_ns) when the phase ended (now by default).
+    :return: None
+    """
+
+    if timings_file := os.environ.get('PYMG_TIMINGS'):
+        timestamp = time.perf_counter_ns() if timestamp is None else timestamp
+
+        fd: int = os.open(timings_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, f'{os.getpid()}\t{phase}\t{timestamp}\n'.encode())
+        finally:
+            os.close(fd)
+
+
+def start_tracing() -> None:
+    """
+    The task of this function is to start tracing the memory allocations of the source (--memory option).
+
+    -Note: The PYMG_MEMORY environment variable holds the number of frames that tracemalloc stores for each
+    allocation. tracemalloc is imported only if the --memory option is used, so without it nothing is imported or
+    traced.
+
+    :return: None
+    """
+
+    if frames := os.environ.get('PYMG_MEMORY'):
+        import tracemalloc
+
+        tracemalloc.start(int(frames))
+
+
+def take_memory() -> tuple|None:
+    """
+    The task of this function is to take a snapshot of the traced memory allocations and the counts of the garbage
+    collector when an exception occurs and to stop tracing (--memory option), before the renderer is imported
+    and allocates memory itself.
+
+    -Note: Just like start_tracing, it does nothing without the --memory option (PYMG_MEMORY), so the tracing that
+    the source started itself is neither displayed nor stopped.
+
+    :return: tuple|None (the snapshot, the current and the peak size of the traced memory, the number of objects
+             and the number of collections of each generation of the garbage collector)
+    """
+
+    if not os.environ.get('PYMG_MEMORY') or (tracemalloc := sys.modules.get('tracemalloc')) is None \
+            or not tracemalloc.is_tracing():
+        return None
+
+    import gc
+
+    try:
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    except MemoryError:
+        return None
+    finally:
+        tracemalloc.stop()
+
+    return snapshot, current, peak, gc.get_count(), tuple(stats['collections'] for stats in gc.get_stats())
+
+
+def display_error_message(exc_type: type, exc_message: Exception, traceback_: TracebackType) -> None:
+    """
+    *** This is a customized exceptionhook function. ***
+
+    The task of this function is to import the renderer of pymg when an exception occurs
+    and to pass the exception information to its display_error_message function.
+
+    :param exc_type: The type of exception that occurred.
+    :param exc_message: The message of exception that occurred.
+    :param traceback_: A traceback that contains full information about the file where the exception occurred.
+    :return: None
+    """
+
+    mark(phase='run')
+    memory: tuple|None = take_memory()
+
+    from .pymg import display_error_message as render_error_message
+
+    render_error_message(exc_type=exc_type, exc_message=exc_message, traceback_=traceback_, memory=memory)
+
+
+def display_thread_error(args) -> None:
+    """
+    *** This is a customized threading.excepthook function. ***
+
+    The task of this function is to pass the exception of a thread (threading.Thread) to the renderer of pymg,
+    labeled with the name of the thread. Just like the default threading.excepthook, SystemExit is ignored.
+
+    :param args: The exc_type, exc_value, exc_traceback and thread of the exception (threading.ExceptHookArgs).
+    :return: None
+    """
+
+    if args.exc_type is SystemExit:
+        return
+
+    from .pymg import display_error_message as render_error_message, gen_origin
+
+    render_error_message(
+        exc_type=args.exc_type, exc_message=args.exc_value, traceback_=args.exc_traceback,
+        origin=gen_origin(thread_name=args.thread.name if args.thread is not None else str(_thread.get_ident()))
+    )
+
+
+def patch_process(process_module: ModuleType) -> None:
+    """
+    The task of this function is to patch the processes of multiprocessing (multiprocessing.process.BaseProcess),
+    so that the exceptions of child processes are displayed by pymg, labeled with the name of the process.
+
+    -Note: A child process runs its target inside BaseProcess._bootstrap, which catches every exception and prints
+    the traceback itself, so the exceptionhook is never called. The patched _bootstrap runs the target through
+    a function that passes the exception to the renderer and exits with code 1 instead. Forked children inherit
+    the patch, and the command line of spawned children (a new Python interpreter) is extended to install
+    the exceptionhooks of pymg before the child is bootstrapped.
+
+    :param process_module: The multiprocessing.process module.
+    :return: None
+    """
+
+    base_process: type = process_module.BaseProcess
+
+    if getattr(base_process, '_pymg_patched', False):
+        return
+
+    bootstrap_, start = base_process._bootstrap, base_process.start
+
+    def bootstrap_process(self, *args, **kwargs):
+        run = self.run
+
+        def run_process() -> None:
+            try:
+                run()
+
+            except SystemExit:
+                raise
+
+            except BaseException:
+                from .pymg import display_error_message as render_error_message, gen_origin
+
+                exc_type, exc_message, traceback_ = sys.exc_info()
+                render_error_message(
+                    exc_type=exc_type, exc_message=exc_message, traceback_=traceback_.tb_next, origin=gen_origin()
+                )
+                sys.exit(1)
+
+        self.run = run_process
+
+        return bootstrap_(self, *args, **kwargs)
+
+    def start_process(self) -> None:
+        from multiprocessing import spawn
+
+        if not getattr(spawn.get_command_line, '_pymg_patched', False):
+            get_command_line = spawn.get_command_line
+
+            def get_hooked_command_line(**kwargs) -> list:
+                command_line: list = get_command_line(**kwargs)
+
+                if '-c' in command_line:
+                    position: int = command_line.index('-c') + 1
+                    command_line[position] = (
+                        f'import sys; sys.path.insert(0, {os.path.dirname(os.path.dirname(__file__))!r}); '
+                        f'from pymg.hook import install_hooks; install_hooks(); {command_line[position]}'
+                    )
+
+                return command_line
+
+            get_hooked_command_line._pymg_patched = True
+            spawn.get_command_line = get_hooked_command_line
+
+        start(self)
+
+    base_process._bootstrap, base_process.start = bootstrap_process, start_process
+    base_process._pymg_patched = True
+
+
+def patch_threading(threading_module: ModuleType) -> None:
+    """
+    The task of this function is to install the exceptionhook of pymg for the threads (threading.excepthook).
+
+    -Note: Only threading.excepthook is replaced, so threading.__excepthook__ stays the default excepthook of Python
+    and the source can still restore it.
+
+    :param threading_module: The threading module.
+    :return: None
+    """
+
+    threading_module.excepthook = display_thread_error
+
+
+class HookFinder:
+    """
+    A meta path finder that waits for the modules of PATCHES (threading and multiprocessing.process) to be imported,
+    and then patches each of them.
+
+    -Note: The exceptionhooks are installed before the first line of the source is executed, when these modules
+    are usually not imported yet (and importing them would exceed the import budget of this module). So this finder
+    stays in sys.meta_path, finds nothing by itself and only wraps the loading of these modules.
+    """
+
+    PATCHES: dict = {'threading': patch_threading, 'multiprocessing.process': patch_process}
+
+    @staticmethod
+    def find_spec(name: str, path=None, target=None):
+        if (patch := HookFinder.PATCHES.get(name)) is None:
+            return None
+
+        for finder in sys.meta_path:
+            if finder is not HookFinder and (spec := finder.find_spec(name, path, target)) is not None:
+                break
+        else:
+            return None
+
+        exec_module = spec.loader.exec_module
+
+        def exec_and_patch(module: ModuleType) -> None:
+            exec_module(module)
+            patch(module)
+
+        spec.loader.exec_module = exec_and_patch
+
+        return spec
+
+
+def install_hooks() -> None:
+    """
+    The task of this function is to install the exceptionhooks of pymg: sys.excepthook, threading.excepthook
+    and the patch of the processes of multiprocessing.
+
+    -Note: threading and multiprocessing are patched right away if they are already imported, otherwise
+    when they are imported (HookFinder).
+
+    :return: None
+    """
+
+    sys.excepthook = display_error_message
+
+    for name, patch in HookFinder.PATCHES.items():
+        if (module := sys.modules.get(name)) is not None:
+            patch(module)
+
+    if HookFinder not in sys.meta_path and not HookFinder.PATCHES.keys() <= sys.modules.keys():
+        sys.meta_path.insert(0, HookFinder)
+
+
+def bootstrap() -> None:
+    """
+    The task of this function is to install the exceptionhooks and to interpret (execute)
+    the source file by its real path as the __main__ module, just like the Python interpreter does.
+
+    -Note: This function is called by the launcher that pymg passes to the Python interpreter with the -c option,
+    so sys.argv[1] is the path of the source file and the rest of sys.argv are its command line arguments.
+    Because the source file itself is executed, the tracebacks point at its true file name and lines.
+
+    :return: None
+    """
+
+    mark(phase='launch')
+
+    sys.argv = sys.argv[1:]
+    source_file: str = sys.argv[0]
+
+    sys.path[0] = os.path.dirname(source_file)
+    install_hooks()
+
+    with io.open_code(source_file) as source_file_:
+        code = compile(source_file_.read(), source_file, 'exec', dont_inherit=True)
+
+    mark(phase='compile')
+
+    main_module = ModuleType('__main__')
+    main_module.__dict__.update(
+        __file__=source_file, __cached__=None,
+        __loader__=None, __package__=None, __spec__=None
+    )
+    sys.modules['__main__'] = main_module
+
+    start_tracing()
+
+    try:
+        exec(code, main_module.__dict__)
+
+    except SystemExit:
+        raise
+
+    except BaseException:
+        exc_type, exc_message, traceback_ = sys.exc_info()
+        sys.excepthook(exc_type, exc_message, traceback_.tb_next)
+        sys.exit(1)
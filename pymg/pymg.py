@@ -31,30 +31,282 @@ https://github.com/mimseyedi/pymg
 import os
 import re
 import sys
+import json
+import time
+import glob
+import zlib
 import click
+import signal
+import select
+import socket
+import struct
+import shutil
 import pickle
+import atexit
+import hashlib
+import reprlib
+import sqlite3
+import datetime
+import tempfile
 import requests
-import traceback
+import tokenize
+import linecache
+import threading
 import subprocess
+import ctypes.util
+from array import array
 from pathlib import Path
-from types import TracebackType, ModuleType
+from itertools import islice
+from xml.etree import ElementTree
+from .client import FRAME_LOCAL, FRAME_HEADER, SERVER_SOCKET
+from types import TracebackType, ModuleType, CodeType, FrameType
+from contextlib import redirect_stdout, contextmanager
+from .hook import install_hooks, mark, start_tracing, HookFinder, STARTED
+from io import BytesIO, StringIO, BufferedReader, BufferedWriter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    from rich.rule import Rule
+    from rich.text import Text
     from rich.panel import Panel
-    from rich.console import Group
+    from rich.style import Style
+    from rich.cells import cell_len
     from rich.syntax import Syntax
-    from rich import print as cprint
+    from rich.markup import escape
+    from rich.padding import Padding
+    from rich.console import Group, Console
+    from rich import box, print as cprint, reconfigure, get_console
 except ImportError:
     subprocess.run([sys.executable, "-m", "pip", "install", "rich"], stdout=subprocess.DEVNULL)
 finally:
+    from rich.rule import Rule
+    from rich.text import Text
     from rich.panel import Panel
-    from rich.console import Group
+    from rich.style import Style
+    from rich.cells import cell_len
     from rich.syntax import Syntax
-    from rich import print as cprint
+    from rich.markup import escape
+    from rich.padding import Padding
+    from rich.console import Group, Console
+    from rich import box, print as cprint, reconfigure, get_console
+
+
+# Every run gets its own workspace (a unique temporary directory) that is handed to the
+# interpreted file through the PYMG_WORKSPACE environment variable and removed at exit.
+# Without a run of pymg (an exceptionhook installed by hand), there is no workspace (see get_workspace_files).
+WORKSPACE: Path|None = Path(os.environ['PYMG_WORKSPACE']) if os.environ.get('PYMG_WORKSPACE') else None
+
+# The templates of concurrent exceptions (threads and child processes) are displayed one after another
+# by holding OUTPUT_THREAD_LOCK and an exclusive lock on OUTPUT_LOCK (see output_lock).
+OUTPUT_LOCK: Path|None = Path(WORKSPACE, 'output.pymglock') if WORKSPACE is not None else None
+OUTPUT_THREAD_LOCK: threading.Lock = threading.Lock()
+
+# The recipe of the templates when no option of the recipe is selected.
+DEFAULT_RECIPE: list = ['inner_with_locals']
+
+# The options that make up the recipe (in order of the templates) and the options that
+# are passed to the exceptionhook as settings of the templates.
+RECIPE_OPTIONS: list = ['type', 'message', 'file', 'scope', 'line', 'code', 'trace', 'inner', 'locals', 'search']
+SETTING_OPTIONS: list = [
+    'locals_length', 'locals_items', 'locals_depth', 'locals_size',
+    'locals_timeout', 'locals_budget', 'search_timeout', 'search_online',
+    'format', 'export', 'trace_head', 'trace_tail', 'context', 'suppress_known', 'history_size',
+    'memory', 'memory_frames', 'memory_top'
+]
+
+# The default limits for displaying the local variables.
+LOCALS_LIMITS: dict = {
+    'locals_length': 160, 'locals_items': 10, 'locals_depth': 3,
+    'locals_size': 20000, 'locals_timeout': 0.5, 'locals_budget': 3.0
+}
+
+# The results of the --search option are cached per user (see get_search_cache) for SEARCH_CACHE_TTL seconds,
+# and only the SEARCH_CACHE_SIZE most recent queries are kept.
+SEARCH_CACHE_TTL: int = 7 * 24 * 60 * 60
+SEARCH_CACHE_SIZE: int = 256
+SEARCH_TIMEOUT: float = 5.0
+SEARCH_API: str = 'https://api.stackexchange.com/2.3/search'
+
+# The --watch option reruns the source file when no change has happened for WATCH_DEBOUNCE seconds
+# (the files are polled every WATCH_POLL_INTERVAL seconds where inotify is not available).
+WATCH_DEBOUNCE: float = 0.05
+WATCH_POLL_INTERVAL: float = 0.25
+
+# The records of the --format json|ndjson option keep at most RECORD_FRAMES frames (the first and the last half)
+# and at most RECORD_CHAIN chained exceptions (__cause__/__context__).
+RECORD_FRAMES: int = 200
+RECORD_CHAIN: int = 8
+
+# Every exception is fingerprinted (its type and the normalized signature of its frames) and counted in a per-user
+# SQLite database (see get_fingerprint_files). The occurrences are appended to a spool first and moved into the
+# database in one transaction when the spool grows beyond FINGERPRINT_SPOOL_SIZE bytes (or when the database
+# is read by --stats and --report).
+FINGERPRINT_SPOOL_SIZE: int = 1024 * 1024
+FINGERPRINT_REPORT_SIZE: int = 64 * 1024
+FINGERPRINT_LENGTH: int = 12
+
+# A compressed snapshot of every displayed exception is kept in the crash history (the last HISTORY_SIZE ones),
+# so the --recent and --show options can display it again without executing the source file. The local variables
+# are kept only if the recipe displayed them (--locals), and at most HISTORY_LOCALS of them for each frame.
+HISTORY_SIZE: int = 20
+HISTORY_LOCALS: int = 100
+
+# The --syntax option caches the modification time, size and content hash of the intact files of a project
+# (see get_syntax_cache), and checks the changed files in a process pool if there are more than SYNTAX_POOL_SIZE of them.
+SYNTAX_POOL_SIZE: int = 32
+
+# The escape sequences (styles and hyperlinks) that are removed from the report of an exception.
+ANSI_ESCAPE: re.Pattern = re.compile(r'\x1b(\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(\x07|\x1b\\))')
+
+# An escape sequence at the end of a chunk of output that is not complete yet: a lone ESC, a CSI sequence without
+# its final byte or an OSC sequence (titles, hyperlinks) without its terminator (BEL or ESC \). The --output option
+# holds it back from the text file until the rest of it arrives, for at most PARTIAL_ESCAPE_SIZE bytes.
+PARTIAL_ESCAPE: re.Pattern = re.compile(rb'\x1b(\[[0-?]*[ -/]*|\][^\x07\x1b]*\x1b?)?\Z')
+PARTIAL_ESCAPE_SIZE: int = 4096
+
+# The phases of pymg that the --timings option displays. Each phase ends when its name is recorded
+# (pymg.hook.mark), in the pymg process, the child interpreter or the exceptionhook.
+TIMING_PHASES: dict = {
+    'imports': 'Importing pymg',
+    'syntax': 'Checking the syntax',
+    'workspace': 'Writing the workspace',
+    'launch': 'Starting the child',
+    'compile': 'Compiling in the child',
+    'run': 'Running the source',
+    'import': 'Importing the renderer',
+    'recipe': 'Reading the recipe',
+    'frames': 'Frames and fingerprint',
+    'templates': 'Generating the templates',
+    'print': 'Printing the templates',
+    'search': 'Searching',
+    'record': 'Recording the exception',
+    'exit': 'Exiting'
+}
+
+# The default settings of the templates (used for the settings that were not passed to the exceptionhook).
+DEFAULT_SETTINGS: dict = {
+    **LOCALS_LIMITS, 'search_timeout': SEARCH_TIMEOUT, 'search_online': True,
+    'format': 'panel', 'export': '-', 'trace_head': 10, 'trace_tail': 10, 'context': 0,
+    'suppress_known': 0, 'history_size': HISTORY_SIZE, 'memory': False, 'memory_frames': 10, 'memory_top': 10
+}
+
+
+
+def get_state_dir() -> Path:
+    """
+    The task of this function is to return the per-user state directory of pymg, where the information of the
+    last operation, the fingerprint database, the crash history and the local solution index are kept.
+
+    -Note: The paths of the state and cache directories are computed from the environment variables on every call
+    (instead of once at import), because a worker of the pymg server takes over the environment of its client.
+
+    :return: Path
+    """
+
+    if os.name == 'nt' and 'LOCALAPPDATA' in os.environ:
+        return Path(os.environ['LOCALAPPDATA'], 'pymg')
+
+    return Path(os.environ.get('XDG_STATE_HOME', Path(Path.home(), '.local', 'state')), 'pymg')
+
+
+def get_cache_dir() -> Path:
+    """
+    The task of this function is to return the per-user cache directory of pymg (the search and syntax caches).
+
+    :return: Path
+    """
+
+    if os.name == 'nt' and 'LOCALAPPDATA' in os.environ:
+        return Path(os.environ['LOCALAPPDATA'], 'pymg', 'cache')
+
+    return Path(os.environ.get('XDG_CACHE_HOME', Path(Path.home(), '.cache')), 'pymg')
+
+
+def get_recent_files() -> tuple[Path, Path, Path]:
+    """
+    The task of this function is to return the paths of the recipe, source information and settings files
+    of the last operation (for the --recent and --rerun options).
+
+    :return: tuple[Path, Path, Path]
+    """
+
+    state_dir: Path = get_state_dir()
+
+    return Path(state_dir, 'recipe.pymgrcp'), Path(state_dir, 'sourceinfo.pymgsinfo'), Path(state_dir, 'settings.pymgstg')
+
+
+def get_workspace_files() -> tuple[Path, Path, Path]|None:
+    """
+    The task of this function is to return the paths of the recipe, source information and settings files
+    of the current workspace, or None outside of a run of pymg.
+
+    -Note: There is no fallback to a shared directory (such as the temporary directory), because anyone could
+    plant a pickle there that runs code when the exceptionhook reads it.
+
+    :return: tuple[Path, Path, Path]|None
+    """
+
+    if WORKSPACE is None:
+        return None
+
+    return Path(WORKSPACE, 'recipe.pymgrcp'), Path(WORKSPACE, 'sourceinfo.pymgsinfo'), Path(WORKSPACE, 'settings.pymgstg')
+
+
+def get_search_cache() -> Path:
+    """
+    The task of this function is to return the path of the cache of the --search option.
+
+    :return: Path
+    """
+
+    return Path(get_cache_dir(), 'search.pymgcache')
+
+
+def get_index_file() -> Path:
+    """
+    The task of this function is to return the path of the local solution index (built by the --build-index option)
+    that the --search option queries first. It can be changed with the PYMG_INDEX environment variable.
+
+    :return: Path
+    """
+
+    return Path(os.environ.get('PYMG_INDEX', Path(get_state_dir(), 'solutions.db')))
+
+
+def get_fingerprint_files() -> tuple[Path, Path]:
+    """
+    The task of this function is to return the paths of the fingerprint database and its spool. The database
+    can be changed with the PYMG_FINGERPRINTS environment variable.
+
+    :return: tuple[Path, Path]
+    """
+
+    db_file: Path = Path(os.environ.get('PYMG_FINGERPRINTS', Path(get_state_dir(), 'fingerprints.db')))
 
+    return db_file, db_file.with_suffix('.spool')
 
-MIRROR_FILE: Path = Path(Path(__file__).parent, 'mirror.py')
-RECIPE_FILE: Path = Path(Path(__file__).parent, 'recipe.pymgrcp')
-SOURCE_INFO: Path = Path(Path(__file__).parent, 'sourceinfo.pymgsinfo')
+
+def get_history_dir() -> Path:
+    """
+    The task of this function is to return the directory of the crash history.
+
+    :return: Path
+    """
+
+    return Path(get_state_dir(), 'history')
+
+
+def get_syntax_cache() -> Path:
+    """
+    The task of this function is to return the path of the syntax cache of the --syntax option.
+
+    :return: Path
+    """
+
+    return Path(get_cache_dir(), 'syntax.pymgcache')
 
 
 def read_source(source_file: Path) -> list[str]:
@@ -67,31 +319,62 @@ def read_source(source_file: Path) -> list[str]:
     :return: list[str]
     """
 
-    with open(file=source_file, mode='r') as source_file_:
+    with tokenize.open(source_file) as source_file_:
         source: list = source_file_.readlines()
 
     return source
 
 
-def mk_mirror_file(mirror_file: Path, source: list[str], header: list[str]) -> None:
+def mk_workspace() -> Path:
+    """
+    The task of this function is to create a new workspace for one run of pymg and to make it the current workspace.
+
+    -Note: The workspace is a unique temporary directory that contains the recipe, source information and settings
+    files of the run, so any number of concurrent runs can not overwrite each other's files. Its path is passed to
+    the interpreted file through the PYMG_WORKSPACE environment variable.
+
+    :return: Path
+    """
+
+    global WORKSPACE, OUTPUT_LOCK
+
+    WORKSPACE = Path(tempfile.mkdtemp(prefix='pymg-'))
+    OUTPUT_LOCK = Path(WORKSPACE, 'output.pymglock')
+
+    os.environ['PYMG_WORKSPACE'] = WORKSPACE.__str__()
+
+    return WORKSPACE
+
+
+def rm_workspace(workspace: Path) -> None:
+    """
+    The task of this function is to remove a workspace and everything that was written in it.
+
+    :param workspace: The path of the workspace.
+    :return: None
+    """
+
+    shutil.rmtree(workspace, ignore_errors=True)
+
+
+def dump_file(file_path: Path, data: list|tuple|dict) -> None:
     """
-    The task of this function is to create a mirror file with the help of source and header.
+    The task of this function is to pickle data into a file atomically.
 
-    -What is a mirror file?
-    A mirror file is a file that contains a specific header and the content of the source file.
-    In short, the mirror file is a file that imitates the source file and is interpreted instead
-    so that pymg can receive possible exceptions.
+    -Note: The data is first written in a temporary file next to the target and then replaces it,
+    so a concurrent reader never sees a half-written file.
 
-    :param mirror_file: The path of the mirror file that is supposed to be interpreted instead of the original file.
-    :param source: The content of source file.
-    :param header: The header that is supposed to stick to the beginning of the mirror file.
+    :param file_path: The path of the file where the data is supposed to be stored.
+    :param data: The data to be stored.
     :return: None
     """
 
-    mirror_text: str = ''.join([*header, *source])
+    file_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(file=mirror_file, mode='w+') as mirror_file_:
-        mirror_file_.write(mirror_text)
+    with tempfile.NamedTemporaryFile(mode='wb', dir=file_path.parent, delete=False) as temp_file_:
+        pickle.dump(data, temp_file_)
+
+    os.replace(temp_file_.name, file_path)
 
 
 def write_recipe(recipe_file: Path, recipe_data: list[str]) -> None:
@@ -106,8 +389,7 @@ def write_recipe(recipe_file: Path, recipe_data: list[str]) -> None:
     :return: None
     """
 
-    with open(file=recipe_file, mode='wb') as recipe_file_:
-        pickle.dump(recipe_data, recipe_file_)
+    dump_file(file_path=recipe_file, data=recipe_data)
 
 
 def read_recipe(recipe_file: Path) -> list[str]:
@@ -131,8 +413,8 @@ def get_source_info(source_info_file: Path) -> list:
     """
     The task of this function is to read information about the source file.
 
-    -Note: In order to preserve the information of the main file (source) while the mirror file is being
-    interpreted, when an exception occurs, this information replaces the information of the mirror file.
+    -Note: The information of the main file (source) is kept in the workspace of the run, so that when an
+    exception occurs, the functions that generate the templates can find out which frames belong to the source.
 
     :param source_info_file: The path of the file that contains the information of the main file (source).
     :return: list
@@ -151,16 +433,45 @@ def write_source_info(source_info_file: Path, source_info: tuple) -> None:
     """
     The task of this function is to write the information of the main file (source) in a file.
 
-    -Note: This is done so that the information of the original file (source) is replaced by the
-    information of the mirror file during the creation of the template to display the error.
+    -Note: This is done so that the information of the original file (source) is available
+    during the creation of the template to display the error.
 
     :param source_info_file: The path of the file that is supposed to keep the information of the main file (source).
     :param source_info: Main file information (source) such as: file name and arguments.
     :return: None
     """
 
-    with open(file=source_info_file, mode='wb') as source_info_file_:
-        pickle.dump(source_info, source_info_file_)
+    dump_file(file_path=source_info_file, data=source_info)
+
+
+def get_settings(settings_file: Path) -> dict:
+    """
+    The task of this function is to read the settings of the templates, such as the limits for
+    displaying the local variables. If there are no settings, an empty dictionary is returned.
+
+    :param settings_file: The path of the file that contains the settings.
+    :return: dict
+    """
+
+    if settings_file.exists():
+        with open(file=settings_file, mode='rb') as settings_file_:
+            settings: dict = pickle.load(settings_file_)
+
+        return settings
+
+    return {}
+
+
+def write_settings(settings_file: Path, settings: dict) -> None:
+    """
+    The task of this function is to write the settings of the templates in a file.
+
+    :param settings_file: The path of the file that is supposed to keep the settings.
+    :param settings: The settings of the templates (options that are not part of the recipe).
+    :return: None
+    """
+
+    dump_file(file_path=settings_file, data=settings)
 
 
 def pyfile_path_validator(py_file: Path) -> tuple[bool, str]:
@@ -181,62 +492,82 @@ def pyfile_path_validator(py_file: Path) -> tuple[bool, str]:
     return False, f'[bold red]Error:[/] This file does not exist -> [yellow]{py_file.__str__()}[/]'
 
 
-def check_syntax(source_file: Path, python_interpreter: str) -> tuple[bool, str]:
+def check_syntax(source_file: Path, source: list[str]|None=None) -> tuple[bool, CodeType|SyntaxError]:
     """
     The task of this function is to check the syntax of a Python file and return the check result.
 
+    -Note: The check is done by compiling the source inside the pymg process. If the compilation is successful,
+    the code object is returned so that the source does not need to be read and compiled again for interpretation,
+    otherwise the SyntaxError (IndentationError, TabError) itself is returned.
+
+    -Note: If the source is not passed, it is read here. A file with an invalid encoding declaration or bytes that
+    can not be decoded is compiled as bytes instead, so the interpreter reports it as a SyntaxError (with the line).
+
     :param source_file: The path of the python file that the user introduced to pymg.
-    :param python_interpreter: A Python interpreter that is supposed to do syntax checking.
-    :return: tuple[bool, str]
+    :param source: The content of source file (optional).
+    :return: tuple[bool, CodeType|SyntaxError]
     """
 
-    syntax_err: str = subprocess.run(
-        [python_interpreter, '-m', 'py_compile', source_file.__str__()],
-        capture_output=True
-    ).stderr.decode()
+    if source is None:
+        try:
+            source = read_source(source_file=source_file)
+        except (SyntaxError, UnicodeDecodeError) as error:
+            try:
+                compile(source_file.read_bytes(), source_file.__str__(), 'exec', dont_inherit=True)
+            except (SyntaxError, ValueError) as syntax_err:
+                error = syntax_err
+
+            return False, error if isinstance(error, SyntaxError) \
+                else SyntaxError(error.__str__(), (source_file.__str__(), 1, 1, None, 1, 1))
 
-    return (False, syntax_err) if syntax_err else (True, 'INTACT')
+    try:
+        code: CodeType = compile(''.join(source), source_file.__str__(), 'exec', dont_inherit=True)
+    except SyntaxError as syntax_err:
+        return False, syntax_err
+
+    return True, code
 
 
-def display_syntax_error(source_file: Path, syntax_err: str) -> None:
+def display_syntax_error(source_file: Path, syntax_err: SyntaxError, show_file: bool=False) -> None:
     """
     The task of this function is to create and finally display
     the error template that shows the syntax error message.
 
     :param source_file: The path of the python file that the user introduced to pymg.
-    :param syntax_err: The syntax error message generated by the Python interpreter.
+    :param syntax_err: The SyntaxError (IndentationError, TabError) raised by compiling the source.
+    :param show_file: Display the path of the python file as well (when many files are checked).
     :return: None
     """
 
-    extract_digits = lambda string: int(''.join([char for char in string if char.isdigit()]))
+    title: str = syntax_err.__class__.__name__
+    lineno: int = syntax_err.lineno or 1
 
-    if syntax_err.startswith("Sorry: TabError:"):
-        title: str = "TabError"
-        splitted_message: list = syntax_err.split("(")
-        lineno: int = extract_digits(splitted_message[-1].split(",")[-1])
-        code: str = read_source(source_file=source_file)[lineno - 1].strip()
-        pointer, message = "    ^", splitted_message[0][16:].strip()
+    if (line := syntax_err.text) is None:
+        try:
+            line: str = read_source(source_file=source_file)[lineno - 1]
+        except (SyntaxError, UnicodeDecodeError, IndexError):
+            line: str = ''
 
-    elif not syntax_err.startswith("Sorry: IndentationError:"):
-        title: str = "SyntaxError"
-        splitted_message: list = syntax_err[syntax_err.index(',') + 2:].split('\n')
-        lineno, code = extract_digits(splitted_message[0].split()[-1]), splitted_message[1].strip()
-        pointer, message = splitted_message[2], splitted_message[3][13:]
+    code: str = line.strip()
+    column: int = max((syntax_err.offset or 1) - 1 - (len(line) - len(line.lstrip())), 0)
 
+    if syntax_err.end_lineno == lineno and (syntax_err.end_offset or 0) > (syntax_err.offset or 1):
+        width: int = syntax_err.end_offset - syntax_err.offset
     else:
-        title: str = "IndentationError"
-        lineno: int = extract_digits(syntax_err.split(',')[-1][:-1].split()[-1])
-        code: str = read_source(source_file=source_file)[lineno - 1].strip()
-        pointer, message = "    ^", syntax_err.split(":")[2].split("(")[0].strip()
+        width: int = 1
+
+    pointer, message = " " * (column + 4) + "^" * width, syntax_err.msg
 
     main_group = Group(
+        *([f"File: [bold default]{escape(source_file.__str__())}[/]", ''] if show_file else []),
+
         Syntax(code=code, lexer='python', line_numbers=True,
                start_line=lineno, highlight_lines={lineno},
                indent_guides=True, background_color='default', theme='gruvbox-dark'),
 
         pointer if len(str(lineno)) < 2 else " " * (len(str(lineno)) - 1) + pointer,
 
-        '\n' + f'Message: [default]{message.capitalize()}[/]'
+        '\n' + f'Message: [default]{message[:1].upper() + message[1:]}[/]'
     )
 
     cprint(Panel(
@@ -248,708 +579,4027 @@ def display_syntax_error(source_file: Path, syntax_err: str) -> None:
     ))
 
 
-def gen_type(**exc_info: type|Exception|TracebackType) -> list:
+def check_file_syntax(source_file: Path, digest: str|None=None) -> tuple[Path, int, int, str, SyntaxError|None]:
     """
-    The task of this function is to generate the exception type template.
-    Every exception that occurs has a type that helps the programmer to classify the error.
+    The task of this function is to check the syntax of one Python file of a project (--syntax option).
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
-    :return: list
+    -Note: The modification time and size are taken before the file is read, and the content is hashed. If the hash
+    is the same as the digest of the cache (the file was touched but not changed), the file is not compiled again.
+    The result contains the SyntaxError (or None), which is picklable, so this function can run in a process pool.
+
+    :param source_file: The absolute path of the Python file.
+    :param digest: The content hash of the file from the syntax cache (optional).
+    :return: tuple[Path, int, int, str, SyntaxError|None]
     """
 
-    return [
-        f"[yellow]Exception Type ❱[/] [bold default]{exc_info.get('exc_type').__name__}[/]"
-    ]
+    try:
+        stat: os.stat_result = source_file.stat()
+        data: bytes = source_file.read_bytes()
+    except OSError as error:
+        return source_file, 0, 0, '', SyntaxError(error.strerror or error.__str__(), (source_file.__str__(), 1, 1, '', 1, 1))
+
+    file_digest: str = hashlib.sha1(data).hexdigest()
+
+    if file_digest != digest:
+        try:
+            compile(data, source_file.__str__(), 'exec', dont_inherit=True)
+        except SyntaxError as syntax_err:
+            return source_file, stat.st_mtime_ns, stat.st_size, file_digest, syntax_err
+        except ValueError as error:
+            return source_file, stat.st_mtime_ns, stat.st_size, file_digest, SyntaxError(
+                error.__str__(), (source_file.__str__(), 1, 1, '', 1, 1)
+            )
 
+    return source_file, stat.st_mtime_ns, stat.st_size, file_digest, None
 
-def gen_message(**exc_info: type|Exception|TracebackType) -> list:
-    """
-    The task of this function is to generate the exception message template.
-    Every exception that occurs has a message that helps the programmer to identify and fix the error.
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
-    :return: list
+def check_project_syntax(patterns: list[str], jobs: int, cache_file: Path) -> int:
+    """
+    The task of this function is to check the syntax of all Python files of directories, glob patterns
+    and files (--syntax option), display the errors and a summary, and return the exit code
+    (0 if all files are intact, 1 if any file has a syntax error and 2 if no Python files were found).
+
+    -Note: The syntax cache keeps the modification time, size and content hash of every intact file (for the version
+    of the Python interpreter), so the files whose time and size did not change are skipped without being read.
+    The other files are checked in a process pool of jobs workers (or in this process, if they are only a few).
+
+    :param patterns: The directories, glob patterns and files.
+    :param jobs: The number of worker processes.
+    :param cache_file: The path of the syntax cache file.
+    :return: int
     """
 
-    return [
-        f"[yellow]Exception Message ❱[/] [bold default]{exc_info.get('exc_message').__str__()}[/]"
-    ]
+    if not (files := list(dict.fromkeys(file for pattern in patterns for file in find_scripts(pattern=pattern)))):
+        cprint("[bold red]Error:[/] No Python files were found!")
+        return 2
 
+    start: float = time.perf_counter()
 
-def gen_file(**exc_info: type|Exception|TracebackType) -> list:
-    """
-    The task of this function is to generate a file template, which displays
-    the path of the file where the exception occurred.
+    try:
+        with open(file=cache_file, mode='rb') as cache_file_:
+            cache: dict = pickle.load(cache_file_)
+    except (OSError, pickle.PickleError, EOFError):
+        cache: dict = {}
+
+    entries: dict = cache.get('files', {}) if cache.get('tag') == sys.implementation.cache_tag else {}
+
+    pending: list = []
+    for file in files:
+        try:
+            stat: os.stat_result = file.stat()
+        except OSError:
+            pending.append(file)
+            continue
+
+        if (entry := entries.get(file.__str__())) is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+            pending.append(file)
+
+    digests: list = [entries.get(file.__str__(), (None, None, None))[2] for file in pending]
+
+    if len(pending) > SYNTAX_POOL_SIZE and jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results: list = list(
+                executor.map(check_file_syntax, pending, digests, chunksize=max(len(pending) // (jobs * 8), 1))
+            )
+    else:
+        results: list = list(map(check_file_syntax, pending, digests))
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
-    :return: list
-    """
+    failures: list = []
+    for source_file, mtime, size, digest, syntax_err in results:
+        if syntax_err is None:
+            entries[source_file.__str__()] = (mtime, size, digest)
+        else:
+            entries.pop(source_file.__str__(), None)
+            failures.append((source_file, syntax_err))
 
-    source_path: str = get_source_info(source_info_file=SOURCE_INFO)[0]
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        dump_file(file_path=cache_file, data={'tag': sys.implementation.cache_tag, 'files': entries})
+    except OSError:
+        pass
+
+    for source_file, syntax_err in failures:
+        display_syntax_error(source_file=source_file, syntax_err=syntax_err, show_file=True)
+
+    cprint(
+        Panel(
+            f"[bold yellow]Files ❱[/] [bold default]{len(files)}[/]   "
+            f"[bold yellow]Checked ❱[/] [bold default]{len(pending)}[/]   "
+            f"[bold yellow]Cached ❱[/] [bold default]{len(files) - len(pending)}[/]   "
+            f"[bold red]Failed ❱[/] [bold default]{len(failures)}[/]   "
+            f"[bold yellow]Time ❱[/] [bold default]{time.perf_counter() - start:.2f}s[/]",
+            title='Syntax', style='red' if failures else 'green',
+            padding=(0, 1, 0, 1), highlight=False
+        )
+    )
 
-    return [
-        f"[yellow]File ❱[/] [bold default]{source_path}[/]"
-    ]
+    return 1 if failures else 0
 
 
-def gen_scope(**exc_info: type|Exception|TracebackType) -> list:
+class Highlighter:
     """
-    The task of this function is to generate the scope template, which displays
-    the name of the scope in which the exception occurred.
+    The syntax highlighter of the code that the templates display.
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
-    :return: list
+    -Note: The lexer and the theme are created only once (at the first use) and the style of each token type is
+    computed only once, so every file is lexed in one pass with a warm lexer instead of creating a Syntax (and
+    looking up its lexer) for every line. The code is split into one highlighted Text per line, which can be sliced.
     """
 
-    extracted_tb: list[traceback.FrameSummary] = traceback.extract_tb(exc_info.get('traceback_'))
+    __slots__ = ('theme', '_lexer', '_styles')
 
-    for index in range(len(extracted_tb) - 1, -1, -1):
-        if extracted_tb[index].filename == MIRROR_FILE.__str__():
-            scope: str = extracted_tb[index].name
-            break
+    def __init__(self, theme: str) -> None:
+        """
+        :param theme: The name of the pygments theme.
+        """
 
-    return [
-        f"[yellow]Scope ❱[/] [bold default]{scope}[/]"
-    ]
+        self.theme: str = theme
+        self._lexer = None
+        self._styles: dict = {}
 
+    def highlight(self, code: str) -> list[Text]:
+        """
+        The task of this method is to highlight the code and return one Text for each of its lines.
 
-def gen_line(**exc_info: type|Exception|TracebackType) -> list:
-    """
-    The task of this function is to generate the line template, which displays
-    the line number where the exception occurred.
+        :param code: The code (one or more lines).
+        :return: list[Text]
+        """
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
-    :return: list
-    """
+        if self._lexer is None:
+            self._lexer = Syntax(code='', lexer='python').lexer
+            self._styles['theme'] = Syntax.get_theme(self.theme)
 
-    extracted_tb: list[traceback.FrameSummary] = traceback.extract_tb(exc_info.get('traceback_'))
+        lines: list = [Text(no_wrap=True, overflow='crop')]
 
-    for index in range(len(extracted_tb) - 1, -1, -1):
-        if extracted_tb[index].filename == MIRROR_FILE.__str__():
-            lineno: str = str(extracted_tb[index].lineno - 5)
-            break
+        for token_type, value in self._lexer.get_tokens(code):
+            if (style := self._styles.get(token_type)) is None:
+                style = self._styles[token_type] = \
+                    self._styles['theme'].get_style_for_token(token_type) + Style(bgcolor='default')
 
-    return [
-        f"[yellow]Line ❱[/] [bold default]{lineno}[/]"
-    ]
+            first, *rest = value.split('\n')
+            if first:
+                lines[-1].append(first, style)
+
+            for part in rest:
+                lines.append(Text(part, style, no_wrap=True, overflow='crop'))
 
+        return lines[:-1] if len(lines) > 1 and not lines[-1] else lines
 
-def gen_pointer(tb: traceback.FrameSummary, with_line_number: bool=False) -> str:
+
+# The highlighter of the templates and the number of unrequested lines between two requested ranges of a
+# file that are still lexed (in one pass) together with them, instead of lexing each range separately.
+HIGHLIGHTER: Highlighter = Highlighter(theme='gruvbox-dark')
+HIGHLIGHT_GAP: int = 20
+
+
+class SourceCache:
     """
-    The task of this function is to generate a pointer to the broken part of the code.
+    A per-exception cache of the files that appear in the traceback and of the source information.
 
-    :param tb: A frame from Traceback.
-    :param with_line_number: Generating pointer according to line number or not.
-    :return: str
+    -Note: Each file is read once and indexed by the offsets of its lines (the index is extended only as far as
+    the requested line), so after the first access, every line lookup costs O(1) no matter how large the file is.
+    The lines are taken from the bytes that were read, so a file that changes on disk (or is truncated) meanwhile
+    does not affect the templates. Files that can not be read (frozen modules, zip imports, ...) are read by
+    linecache.
     """
 
-    def count_space(string: str) -> int:
-        return re.search('\S', string).start()
+    __slots__ = ('source_info_file', '_source_info', '_files', '_highlights')
 
-    lineno, start, end = tb.lineno - 4, tb.colno, tb.end_colno
+    def __init__(self, source_info_file: Path|None, source_info: list|None=None) -> None:
+        """
+        :param source_info_file: The path of the file that contains the information of the main file (source).
+        :param source_info: The information of the main file (source), if it is already known (optional).
+        """
 
-    inner = True
-    if with_line_number:
-        if tb.filename == MIRROR_FILE.__str__():
-            space: str = " " * (start - count_space(
-                string=read_source(source_file=MIRROR_FILE)[lineno]) + 4)
-        else:
-            space: str = " " * 4
-            inner = False
+        self.source_info_file: Path|None = source_info_file
+        self._source_info: list|None = source_info
+        self._files: dict = {}
+        self._highlights: dict = {}
 
-        if len(str(lineno)) >= 2:
-            space_for_rich_syntax: str = " " * (len(str(lineno)) - 1)
-            space = space_for_rich_syntax + space
-    else:
-        if tb.filename == MIRROR_FILE.__str__():
-            space: str = " " * (start - count_space(
-                string=read_source(source_file=MIRROR_FILE)[lineno]))
-        else:
-            space, inner = "", False
+    @property
+    def source_info(self) -> list:
+        """
+        The information of the main file (source), which is read only once.
 
-    if inner:
-        pointer: str = f"{space}[red]{'^' * (end - start)}[/]"
-    else:
-        pointer: str = f"{space}[red]{'^' * len(tb.line)}[/]"
+        :return: list
+        """
 
-    return pointer
+        if self._source_info is None:
+            self._source_info = get_source_info(source_info_file=self.source_info_file)
 
+        return self._source_info
 
-def gen_code(**exc_info: type|Exception|TracebackType) -> list:
-    """
-    The task of this function is to generate a code template, which displays
-    the code that generated the exception.
+    def getline(self, filename: str, lineno: int) -> str:
+        """
+        The task of this method is to return a line of a file (including its indentation).
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
-    :return: list
-    """
+        :param filename: The path of the file.
+        :param lineno: The line number.
+        :return: str
+        """
 
-    extracted_tb: list[traceback.FrameSummary] = traceback.extract_tb(exc_info.get('traceback_'))
+        if filename not in self._files:
+            self._files[filename] = self._read(filename=filename)
 
-    for index in range(len(extracted_tb) - 1, -1, -1):
-        if extracted_tb[index].filename == MIRROR_FILE.__str__():
-            code: str = extracted_tb[index].line
-            tb: traceback.FrameSummary = extracted_tb[index]
-            break
+        if (file_ := self._files[filename]) is None:
+            return linecache.getline(filename, lineno)
 
-    return [
-        Syntax(
-            code=code, lexer='python', background_color='default', theme='gruvbox-dark'
-        ),
-        gen_pointer(tb=tb)
-    ]
+        content, offsets, encoding = file_
 
+        position: int = offsets[-1]
+        while len(offsets) <= lineno and position < len(content):
+            position = content.find(b'\n', position) + 1 or len(content)
+            offsets.append(position)
 
-def gen_trace(**exc_info: type|Exception|TracebackType) -> list:
-    """
-    The task of this function is to generate a follow-up template.
-    In this format, the occurrence of the exception is tracked, and the information related
-    to each part that was influential in the occurrence of the exception will be displayed separately.
+        if not 1 <= lineno < len(offsets):
+            return ''
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
-    :return: list
-    """
+        return content[offsets[lineno - 1]:offsets[lineno]].decode(encoding, errors='replace')
 
-    extracted_tb: list[traceback.FrameSummary] = traceback.extract_tb(exc_info.get('traceback_'))
+    def highlight(self, filename: str, first: int, last: int) -> list[Text]:
+        """
+        The task of this method is to return the highlighted lines of a file from first to last (or to the end
+        of the file). The lines that were not highlighted before are lexed together in one pass.
 
-    template, counter = [], 0
+        :param filename: The path of the file.
+        :param first: The number of the first line.
+        :param last: The number of the last line.
+        :return: list[Text]
+        """
 
-    template.extend(
-        [
-            f"[bold yellow]Exception Type ❱[/] [bold default]{exc_info['exc_type'].__name__}[/]",
-            f"[bold yellow]Exception Message ❱[/] [bold default]{exc_info['exc_message'].__str__()}[/]"
-        ]
-    )
+        highlights: dict = self._highlights.setdefault(filename, {})
 
-    while exc_info['traceback_']:
-        trace = Group(
-            Panel(
-                Group(
-                    f"File: [bold default]{get_source_info(source_info_file=SOURCE_INFO)[0]}[/]"
-                    if exc_info['traceback_'].tb_frame.f_code.co_filename == MIRROR_FILE.__str__()
-                    else f"File: [bold default]{exc_info['traceback_'].tb_frame.f_code.co_filename}[/]",
-                    '',
+        if missing := [lineno for lineno in range(first, last + 1) if lineno not in highlights]:
+            code: list = []
+            for lineno in range(missing[0], missing[-1] + 1):
+                if not (line := self.getline(filename, lineno)):
+                    break
+                code.append(line if line.endswith('\n') else line + '\n')
 
-                    Syntax(
-                        code=extracted_tb[counter].line, lexer='python',
-                        line_numbers=True, start_line=extracted_tb[counter].lineno - 5
-                        if extracted_tb[counter].filename == MIRROR_FILE.__str__()
-                        else extracted_tb[counter].lineno,
+            if code:
+                highlights.update(enumerate(HIGHLIGHTER.highlight(code=''.join(code)), start=missing[0]))
 
-                        highlight_lines={extracted_tb[counter].lineno - 5}
-                        if extracted_tb[counter].filename == MIRROR_FILE.__str__()
-                        else {extracted_tb[counter].lineno},
+        lines: list = []
+        for lineno in range(first, last + 1):
+            if (line := highlights.get(lineno)) is None:
+                break
+            lines.append(line)
 
-                        background_color='default', theme='gruvbox-dark'
-                    ),
-                    gen_pointer(tb=extracted_tb[counter], with_line_number=True)
-                )
-            , title=f'[bold]Trace[{counter + 1}] - {extracted_tb[counter].name}[/]', title_align='left',
-            padding=(1, 1, 0, 1), style='color(172)')
-        )
+        return lines
 
-        counter += 1
+    def prefetch(self, frames: list, context: int) -> None:
+        """
+        The task of this method is to highlight the lines (and the context lines) of the frames that are displayed,
+        before their panels are generated. The ranges of each file that are close to each other are merged,
+        so each file is lexed once (or once per distant part of it), no matter how many frames it has.
 
-        exc_info['traceback_'] = exc_info['traceback_'].tb_next
+        :param frames: The frames that are displayed (the frames of stored snapshots are skipped).
+        :param context: The number of lines displayed before and after the line of each frame.
+        :return: None
+        """
 
-        template.extend(['', trace])
+        ranges: dict = {}
+        for frame in frames:
+            if isinstance(frame, Frame):
+                ranges.setdefault(frame.filename, []).append((max(frame.lineno - context, 1), frame.lineno + context))
 
-    return template
+        for filename, file_ranges in ranges.items():
+            file_ranges.sort()
+
+            merged: list = [list(file_ranges[0])]
+            for first, last in file_ranges[1:]:
+                if first <= merged[-1][1] + HIGHLIGHT_GAP:
+                    merged[-1][1] = max(merged[-1][1], last)
+                else:
+                    merged.append([first, last])
+
+            for first, last in merged:
+                self.highlight(filename=filename, first=first, last=last)
+
+    @staticmethod
+    def _read(filename: str) -> tuple[bytes, array, str]|None:
+        """
+        The task of this method is to read a file and prepare its (empty) line-offset index.
+
+        :param filename: The path of the file.
+        :return: tuple[bytes, array, str]|None
+        """
 
+        try:
+            content: bytes = Path(filename).read_bytes()
+            encoding: str = tokenize.detect_encoding(BytesIO(content[:1024]).readline)[0]
+        except (OSError, ValueError, SyntaxError):
+            return None
 
-def gen_trace_with_locals(**exc_info: type|Exception|TracebackType) -> list:
+        return content, array('Q', [0]), encoding
+
+
+class Frame:
     """
-    The task of this function is to generate the trace template with local variables.
-    In this format, the occurrence of the exception is tracked and the information related to each part that affected
-    the occurrence of the exception will be displayed separately along with the local variables of each scope.
+    A compact model of one frame of the traceback.
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
-    :return: list
+    -Note: When an exception occurs, the traceback is walked only once to build these models and then
+    every function that generates a template reads them, without extracting or changing the traceback again.
+    The local variables of the frame are captured only if a template asks for them.
     """
 
-    extracted_tb: list[traceback.FrameSummary] = traceback.extract_tb(exc_info.get('traceback_'))
+    __slots__ = (
+        'filename', 'lineno', 'colno', 'end_colno', 'scope', 'inner', 'omitted', '_sources', '_frame', '_locals', '_texts'
+    )
 
-    template, locals_, counter = [], {}, 0
+    def __init__(self, traceback_: TracebackType, inner: bool, sources: SourceCache) -> None:
+        """
+        :param traceback_: The traceback entry of the frame.
+        :param inner: Whether the frame belongs to the main file (source) or not.
+        :param sources: The source cache of the exception.
+        """
 
-    template.extend(
-        [
-            f"[bold yellow]Exception Type ❱[/] [bold default]{exc_info['exc_type'].__name__}[/]",
-            f"[bold yellow]Exception Message ❱[/] [bold default]{exc_info['exc_message'].__str__()}[/]"
-        ]
-    )
+        code: CodeType = traceback_.tb_frame.f_code
 
-    while exc_info['traceback_']:
-        locals_[exc_info['traceback_'].tb_frame.f_code.co_name] = {
-            var: value for var, value in exc_info['traceback_'].tb_frame.f_locals.items()
-            if not var.startswith('__') and not var.endswith('__') and \
-               var not in ['display_error_message'] and not isinstance(value, ModuleType)
-        }
+        self.filename: str = code.co_filename
+        self.lineno: int = traceback_.tb_lineno
+        self.scope: str = code.co_name
+        self.inner: bool = inner
 
-        trace = Group(
-            Panel(
-                Group(
-                    f"File: [bold default]{get_source_info(source_info_file=SOURCE_INFO)[0]}[/]"
-                    if exc_info['traceback_'].tb_frame.f_code.co_filename == MIRROR_FILE.__str__()
-                    else f"File: [bold default]{exc_info['traceback_'].tb_frame.f_code.co_filename}[/]",
-                    '',
+        positions: tuple = next(
+            islice(code.co_positions(), traceback_.tb_lasti // 2, None), (None, None, None, None)
+        ) if traceback_.tb_lasti >= 0 else (None, None, None, None)
 
-                    Syntax(
-                        code=extracted_tb[counter].line, lexer='python',
-                        line_numbers=True, start_line=extracted_tb[counter].lineno - 5
-                        if extracted_tb[counter].filename == MIRROR_FILE.__str__()
-                        else extracted_tb[counter].lineno,
+        self.colno: int|None = positions[2]
+        self.end_colno: int|None = positions[3]
+        self.omitted: int = 0
 
-                        highlight_lines={extracted_tb[counter].lineno - 5}
-                        if extracted_tb[counter].filename == MIRROR_FILE.__str__()
-                        else {extracted_tb[counter].lineno},
+        self._sources: SourceCache = sources
+        self._frame: FrameType = traceback_.tb_frame
+        self._locals: dict|None = None
+        self._texts: dict|None = None
 
-                        background_color='default', theme='gruvbox-dark'
-                    ),
-                    gen_pointer(tb=extracted_tb[counter], with_line_number=True),
-                    '',
+    @property
+    def line(self) -> str:
+        """
+        The code of the frame (without indentation).
 
-                    Panel(
-                        '\n'.join([f"[bold color(125)]{var}[/] = [italic default]{value}[/]"
-                        for var, value in locals_[extracted_tb[counter].name].items()]),
-                        expand=False, title='locals', style='yellow'
-                    )
-                    if extracted_tb[counter].filename == MIRROR_FILE.__str__()
-                    else '[bold underline yellow]NO LOCALS WERE FOUND IN THIS TRACE[/]'
-                )
+        :return: str
+        """
 
-            , title=f'[bold]Trace[{counter + 1}] - {extracted_tb[counter].name}[/]', title_align='left',
-            padding=(1,1,0,1), style='color(172)')
-        )
+        return self._sources.getline(self.filename, self.lineno).strip()
 
-        counter += 1
+    @property
+    def indent(self) -> int:
+        """
+        The indentation of the code of the frame.
 
-        exc_info['traceback_'] = exc_info['traceback_'].tb_next
+        :return: int
+        """
 
-        template.extend(['', trace])
+        line: str = self._sources.getline(self.filename, self.lineno)
 
-    return template
+        return len(line) - len(line.lstrip())
 
+    @property
+    def locals(self) -> dict:
+        """
+        The local variables of the frame, except dunder names and modules.
 
-def gen_inner(**exc_info: type|Exception|TracebackType) -> list:
-    """
-    The task of this function is to generate the inner trace template.
-    In this format, the exception occurred, limited to the internal space of the main file (source), is tracked, and the
-    information related to each part that had an effect on the occurrence of the exception will be displayed separately.
+        :return: dict
+        """
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
-    :return: list
-    """
+        if self._locals is None:
+            self._locals = {
+                var: value for var, value in self._frame.f_locals.items()
+                if not var.startswith('__') and not var.endswith('__') and not isinstance(value, ModuleType)
+            }
 
-    extracted_tb: list[traceback.FrameSummary] = traceback.extract_tb(exc_info.get('traceback_'))
+        return self._locals
 
-    template, counter = [], 0
+    def locals_texts(self, locals_repr: reprlib.Repr) -> dict:
+        """
+        The task of this method is to return the local variables of the frame displayed by the LocalsRepr
+        of the exception. Each frame is displayed only once, no matter how many templates (or the snapshot) use it.
 
-    template.extend(
-        [
-            f"[bold yellow]Exception Type ❱[/] [bold default]{exc_info['exc_type'].__name__}[/]",
-            f"[bold yellow]Exception Message ❱[/] [bold default]{exc_info['exc_message'].__str__()}[/]"
-        ]
-    )
+        -Note: Once the budget of the LocalsRepr is exhausted, the remaining local variables are not displayed
+        and only their number is kept (the omitted attribute).
 
-    while exc_info['traceback_']:
-        if extracted_tb[counter].filename == MIRROR_FILE.__str__():
-            trace = Group(
-                Panel(
-                    Group(
-                        f"File: [bold default]{get_source_info(source_info_file=SOURCE_INFO)[0]}[/]\n",
-
-                        Syntax(
-                            code=extracted_tb[counter].line, lexer='python',
-                            line_numbers=True, start_line=extracted_tb[counter].lineno - 5,
-                            highlight_lines={extracted_tb[counter].lineno - 5},
-                            background_color='default', theme='gruvbox-dark'
-                        ),
-                        gen_pointer(tb=extracted_tb[counter], with_line_number=True)
-                    )
+        :param locals_repr: The LocalsRepr of the exception.
+        :return: dict
+        """
 
-                , title=f'[bold]Trace[{counter + 1}] - {extracted_tb[counter].name}[/]', title_align='left',
-                padding=(1, 1, 0, 1), style='color(172)')
-            )
+        if self._texts is None:
+            self._texts = {}
 
-            template.extend(['', trace])
+            for var, value in self.locals.items():
+                if locals_repr.exhausted:
+                    self.omitted = len(self.locals) - len(self._texts)
+                    break
 
-        counter += 1
+                self._texts[var] = locals_repr.render(value)
 
-        exc_info['traceback_'] = exc_info['traceback_'].tb_next
+        return self._texts
 
-    return template
+    def highlighted(self, context: int) -> tuple[int, list[Text]]:
+        """
+        The task of this method is to return the highlighted line of the frame (with its indentation) and
+        context lines before and after it, sliced from the highlighted lines of the source cache.
+
+        :param context: The number of lines before and after the line of the frame.
+        :return: tuple[int, list[Text]] (the number of the first line and the lines)
+        """
+
+        first: int = max(self.lineno - context, 1)
+        lines: list = self._sources.highlight(filename=self.filename, first=first, last=self.lineno + context)
 
+        if len(lines) <= self.lineno - first:
+            return self.lineno, [Text(no_wrap=True, overflow='crop')]
 
-def gen_inner_with_locals(**exc_info: type|Exception|TracebackType) -> list:
+        return first, lines
+
+
+class FrameSnapshot:
     """
-    The task of this function is to generate the inner trace template with local variables.
-    In this format, the exception occurred, limited to the internal space of the main file (source), is tracked, and the
-    information related to each part that had an effect on the occurrence of the exception will be displayed separately
-    along with the local variables of each scope.
+    A frame of a stored snapshot of an exception (--recent and --show options).
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
-    :return: list
+    -Note: It has the same attributes as Frame, but instead of the frame itself, it holds the code of the frame and
+    its local variables as they were displayed when the exception occurred, so the templates can be generated again
+    without the source file, the traceback or executing anything.
     """
 
-    extracted_tb: list[traceback.FrameSummary] = traceback.extract_tb(exc_info.get('traceback_'))
+    __slots__ = ('filename', 'lineno', 'colno', 'end_colno', 'scope', 'inner', 'line', 'indent', 'omitted', '_texts')
 
-    template, locals_, counter = [], {}, 0
+    def __init__(self, frame: dict) -> None:
+        """
+        :param frame: The frame from the snapshot.
+        """
 
-    template.extend(
-        [
-            f"[bold yellow]Exception Type ❱[/] [bold default]{exc_info['exc_type'].__name__}[/]",
-            f"[bold yellow]Exception Message ❱[/] [bold default]{exc_info['exc_message'].__str__()}[/]"
-        ]
-    )
+        self.filename: str = frame['filename']
+        self.lineno: int = frame['lineno']
+        self.colno: int|None = frame['colno']
+        self.end_colno: int|None = frame['end_colno']
+        self.scope: str = frame['scope']
+        self.inner: bool = frame['inner']
+        self.line: str = frame['line']
+        self.indent: int = frame['indent']
+        self.omitted: int = frame.get('omitted', 0)
 
-    while exc_info['traceback_']:
-        locals_[exc_info['traceback_'].tb_frame.f_code.co_name] = {
-            var: value for var, value in exc_info['traceback_'].tb_frame.f_locals.items()
-            if not var.startswith('__') and not var.endswith('__') and \
-                var not in ['display_error_message'] and not isinstance(value, ModuleType)
-        }
+        self._texts: dict = frame['locals']
 
-        if extracted_tb[counter].filename == MIRROR_FILE.__str__():
-            trace = Group(
-                Panel(
-                    Group(
-                        f"File: [bold default]{get_source_info(source_info_file=SOURCE_INFO)[0]}[/]\n",
-
-                        Syntax(
-                            code=extracted_tb[counter].line, lexer='python',
-                            line_numbers=True, start_line=extracted_tb[counter].lineno - 5,
-                            highlight_lines={extracted_tb[counter].lineno - 5},
-                            background_color='default', theme='gruvbox-dark'
-                        ),
-                        gen_pointer(tb=extracted_tb[counter], with_line_number=True),
-                        '',
-
-                        Panel(
-                            '\n'.join([f"[bold color(125)]{var}[/] = [italic default]{value}[/]"
-                            for var, value in locals_[extracted_tb[counter].name].items()]),
-                            expand=False, title='locals', style='yellow'
-                        )
-                    )
+    def locals_texts(self, locals_repr: reprlib.Repr) -> dict:
+        """
+        The task of this method is to return the local variables of the frame as they were displayed
+        when the exception occurred.
 
-                , title=f'[bold]Trace[{counter + 1}] - {extracted_tb[counter].name}[/]', title_align='left',
-                padding=(1, 1, 0, 1), style='color(172)')
-            )
+        :param locals_repr: The LocalsRepr of the exception (not used).
+        :return: dict
+        """
 
-            template.extend(['', trace])
+        return self._texts
 
-        counter += 1
+    def highlighted(self, context: int) -> tuple[int, list[Text]]:
+        """
+        The task of this method is to return the highlighted line of the frame (with its indentation).
+        The snapshot only holds the line of the frame, so no context lines are returned.
 
-        exc_info['traceback_'] = exc_info['traceback_'].tb_next
+        :param context: The number of lines before and after the line of the frame (not used).
+        :return: tuple[int, list[Text]] (the number of the first line and the lines)
+        """
 
-    return template
+        return self.lineno, HIGHLIGHTER.highlight(code=' ' * self.indent + self.line)[:1]
 
 
-def gen_locals(**exc_info: type|Exception|TracebackType) -> list:
+def gen_frames(traceback_: TracebackType, sources: SourceCache) -> list[Frame]:
     """
-    The task of this function is to generate the template of local variables.
-    Any exception that occurs can also refer to the last value of variables. This template
-    display the last value of each scope variable before the exception occurred.
+    The task of this function is to walk the traceback once and build the frame model of it.
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
-    :return: list
+    :param traceback_: A traceback that contains full information about the file where the exception occurred.
+    :param sources: The source cache of the exception.
+    :return: list[Frame]
+    """
+
+    frames, source_file = [], Path(sources.source_info[0]).__str__()
+
+    while traceback_ is not None:
+        frames.append(
+            Frame(
+                traceback_=traceback_,
+                inner=traceback_.tb_frame.f_code.co_filename == source_file,
+                sources=sources
+            )
+        )
+        traceback_ = traceback_.tb_next
+
+    return frames
+
+
+class ReprTimeout(BaseException):
+    """
+    The exception that interrupts displaying a local variable that takes longer than its time limit.
+
+    -Note: It is not an Exception (just like KeyboardInterrupt), so the 'except Exception' of a __repr__ or __str__
+    of the user can not swallow it.
+    """
+
+
+class LocalsRepr(reprlib.Repr):
+    """
+    A reprlib.Repr that displays the local variables within limits and budgets.
+
+    -Note: Containers are displayed with the length, item count and depth limits of reprlib, binary data (bytes,
+    bytearray and memoryview) is sliced before it is displayed, and other values are displayed with str
+    (just like before) and truncated. Each value has a time limit (a SIGALRM timer on the main
+    thread, a worker thread elsewhere), and all values of an exception share a total time and size budget. Values
+    that exceed the time limit are displayed as a short summary, and once the budget is exhausted the remaining
+    local variables are not displayed at all, so large or slow objects can not stall the exceptionhook.
+    """
+
+    def __init__(self, locals_length: int, locals_items: int, locals_depth: int,
+                 locals_size: int, locals_timeout: float, locals_budget: float) -> None:
+        """
+        :param locals_length: The maximum length of each value.
+        :param locals_items: The maximum number of items displayed from each container.
+        :param locals_depth: The maximum depth of nested containers.
+        :param locals_size: The total size budget (characters) of all values.
+        :param locals_timeout: The time limit (seconds) of each value.
+        :param locals_budget: The total time budget (seconds) of all values.
+        """
+
+        super().__init__()
+
+        self.maxlevel = locals_depth
+        self.maxtuple = self.maxlist = self.maxarray = self.maxdict = locals_items
+        self.maxset = self.maxfrozenset = self.maxdeque = locals_items
+        self.maxstring = self.maxlong = self.maxother = locals_length
+
+        self.size_budget, self.timeout, self.time_budget = locals_size, locals_timeout, locals_budget
+        self.used_size, self.used_time = 0, 0.0
+
+    @property
+    def exhausted(self) -> bool:
+        """
+        Whether the size or time budget of displaying the local variables is exhausted.
+
+        :return: bool
+        """
+
+        return self.used_size >= self.size_budget or self.used_time >= self.time_budget
+
+    def render(self, value: object) -> str:
+        """
+        The task of this method is to display a local variable within the limits and budgets.
+
+        :param value: The value of the local variable.
+        :return: str
+        """
+
+        type_name: str = value.__class__.__name__
+
+        if self.exhausted:
+            return f'<{type_name}: skipped, the budget for displaying locals is exhausted>'
+
+        start: float = time.perf_counter()
+        seconds: float = min(self.timeout, self.time_budget - self.used_time)
+
+        try:
+            with time_limit(seconds=seconds) as interruptible:
+                text: str = self.display(value) if interruptible \
+                    else call_with_timeout(function=self.display, argument=value, seconds=seconds)
+
+        except ReprTimeout:
+            text: str = f'<{type_name}: truncated, displaying it took longer than {self.timeout}s>'
+
+        except Exception as error:
+            text: str = f'<{type_name}: can not be displayed ({error.__class__.__name__})>'
+
+        finally:
+            self.used_time += time.perf_counter() - start
+
+        self.used_size += len(text)
+
+        return text
+
+    def display(self, value: object) -> str:
+        """
+        The task of this method is to display a local variable within the length, item and depth limits.
+
+        :param value: The value of the local variable.
+        :return: str
+        """
+
+        if isinstance(value, str):
+            return value if len(value) <= self.maxstring else f'{value[:self.maxstring]}... ({len(value)} characters)'
+
+        if hasattr(self, f'repr_{value.__class__.__name__}'):
+            return self.repr(value)
+
+        text: str = str(value)
+
+        return text if len(text) <= self.maxother else f'{text[:self.maxother]}... ({len(text)} characters)'
+
+    def message(self, exc_message: BaseException) -> str:
+        """
+        The task of this method is to display the message of an exception (in the records and the snapshots)
+        within the length limit.
+
+        :param exc_message: The message of exception that occurred.
+        :return: str
+        """
+
+        text: str = exception_message(exc_message=exc_message)
+
+        return text if len(text) <= self.maxstring else f'{text[:self.maxstring]}... ({len(text)} characters)'
+
+    def repr_bytes(self, value: bytes|bytearray, level: int) -> str:
+        """
+        The task of this method is to display binary data (bytes or bytearray) within the length limit.
+
+        -Note: Only the beginning of the data is converted (a slice of maxother bytes), because converting all of it
+        can not be interrupted (it happens in C) and needs several times its size in memory.
+
+        :param value: The binary data.
+        :param level: The remaining depth (reprlib).
+        :return: str
+        """
+
+        text: str = repr(value[:self.maxother])
+
+        if len(value) <= self.maxother and len(text) <= self.maxother:
+            return text
+
+        return f'{text[:self.maxother]}... ({len(value)} bytes)'
+
+    repr_bytearray = repr_bytes
+
+    def repr_memoryview(self, value: memoryview, level: int) -> str:
+        """
+        The task of this method is to display a memoryview with the beginning of its data within the length limit.
+
+        :param value: The memoryview.
+        :param level: The remaining depth (reprlib).
+        :return: str
+        """
+
+        if not value.contiguous:
+            return f'<memoryview: {value.nbytes} bytes, format {value.format!r}, shape {value.shape}>'
+
+        text: str = repr(value.cast('B')[:self.maxother].tobytes())
+
+        if value.nbytes <= self.maxother and len(text) <= self.maxother:
+            return f'<memoryview: {text}>'
+
+        return f'<memoryview: {text[:self.maxother]}... ({value.nbytes} bytes)>'
+
+
+@contextmanager
+def time_limit(seconds: float):
+    """
+    The task of this function is to interrupt the code of the with statement (by raising ReprTimeout)
+    if it takes longer than the time limit. It yields whether the code can be interrupted, because SIGALRM
+    is not available on every platform and only works on the main thread (see call_with_timeout).
+
+    :param seconds: The time limit.
+    :return: ContextManager
+    """
+
+    def handler(signum: int, frame: FrameType) -> None:
+        raise ReprTimeout
+
+    try:
+        previous_handler = signal.signal(signal.SIGALRM, handler)
+    except (AttributeError, ValueError):
+        yield False
+        return
+
+    previous_timer: tuple = signal.setitimer(signal.ITIMER_REAL, max(seconds, 0.001))
+
+    try:
+        yield True
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, *previous_timer)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def call_with_timeout(function: callable, argument: object, seconds: float) -> object:
+    """
+    The task of this function is to call a function in a worker thread and to raise ReprTimeout
+    if it does not return within the time limit (where time_limit can not interrupt it).
+
+    -Note: A thread can not be interrupted, so the worker is a daemon thread that is abandoned when
+    the time is up. It finishes on its own (or with the interpreter), and its result is ignored.
+
+    :param function: The function.
+    :param argument: The argument of the function.
+    :param seconds: The time limit.
+    :return: object
+    """
+
+    result: list = []
+
+    def target() -> None:
+        try:
+            result.append((True, function(argument)))
+        except BaseException as error:
+            result.append((False, error))
+
+    worker = threading.Thread(target=target, name='pymg-locals', daemon=True)
+    worker.start()
+    worker.join(max(seconds, 0.001))
+
+    if not result:
+        raise ReprTimeout
+
+    succeeded, value = result[0]
+    if not succeeded:
+        raise value
+
+    return value
+
+
+def gen_locals_text(frame: Frame, locals_repr: LocalsRepr) -> str:
+    """
+    The task of this function is to generate the text of the local variables of a frame.
+
+    :param frame: A frame from the frame model of the traceback.
+    :param locals_repr: The LocalsRepr of the exception.
+    :return: str
+    """
+
+    lines: list = [f"[bold color(125)]{var}[/] = [italic default]{escape(text)}[/]"
+                   for var, text in frame.locals_texts(locals_repr=locals_repr).items()]
+
+    if frame.omitted:
+        lines.append(f"[italic default]... {frame.omitted} more locals omitted[/]")
+
+    return '\n'.join(lines)
+
+
+def get_inner_frame(frames: list[Frame]) -> Frame:
+    """
+    The task of this function is to find the last frame of the traceback that belongs to the main file (source),
+    which is the frame where the exception occurred inside the source.
+
+    :param frames: The frame model of the traceback.
+    :return: Frame
+    """
+
+    for frame in reversed(frames):
+        if frame.inner:
+            return frame
+
+    return frames[-1]
+
+
+def gen_type(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> list:
+    """
+    The task of this function is to generate the exception type template.
+    Every exception that occurs has a type that helps the programmer to classify the error.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: list
+    """
+
+    return [
+        f"[yellow]Exception Type ❱[/] [bold default]{exc_info.get('exc_type').__name__}[/]"
+    ]
+
+
+def gen_message(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> list:
+    """
+    The task of this function is to generate the exception message template.
+    Every exception that occurs has a message that helps the programmer to identify and fix the error.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: list
+    """
+
+    return [
+        f"[yellow]Exception Message ❱[/] [bold default]{exception_message(exc_message=exc_info.get('exc_message'))}[/]"
+    ]
+
+
+def gen_file(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> list:
+    """
+    The task of this function is to generate a file template, which displays
+    the path of the file where the exception occurred.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: list
+    """
+
+    return [
+        f"[yellow]File ❱[/] [bold default]{exc_info['sources'].source_info[0]}[/]"
+    ]
+
+
+def gen_scope(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> list:
+    """
+    The task of this function is to generate the scope template, which displays
+    the name of the scope in which the exception occurred.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: list
+    """
+
+    return [
+        f"[yellow]Scope ❱[/] [bold default]{get_inner_frame(frames=exc_info['frames']).scope}[/]"
+    ]
+
+
+def gen_line(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> list:
+    """
+    The task of this function is to generate the line template, which displays
+    the line number where the exception occurred.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: list
+    """
+
+    return [
+        f"[yellow]Line ❱[/] [bold default]{get_inner_frame(frames=exc_info['frames']).lineno}[/]"
+    ]
+
+
+def gen_pointer(frame: Frame, with_line_number: bool=False, dedent: int|None=None, number_width: int|None=None) -> str:
+    """
+    The task of this function is to generate a pointer to the broken part of the code.
+
+    :param frame: A frame from the frame model of the traceback.
+    :param with_line_number: Generating pointer according to line number or not.
+    :param dedent: The indentation that was removed from the displayed lines (the indentation of the frame by default).
+    :param number_width: The width of the displayed line numbers (the width of the line number of the frame by default).
+    :return: str
+    """
+
+    start, end = frame.colno, frame.end_colno
+    dedent = frame.indent if dedent is None else dedent
+    number_width = len(str(frame.lineno)) if number_width is None else number_width
+
+    margin: int = number_width + 3 if with_line_number else 0
+
+    inner = frame.inner and start is not None and end is not None
+    if inner:
+        space: str = " " * (margin + start - dedent)
+        pointer: str = f"{space}[red]{'^' * (end - start)}[/]"
+    else:
+        space: str = " " * (margin + frame.indent - dedent)
+        pointer: str = f"{space}[red]{'^' * len(frame.line)}[/]"
+
+    return pointer
+
+
+def gen_code_lines(frame: Frame, context: int, with_line_number: bool=False) -> list:
+    """
+    The task of this function is to generate the highlighted code of a frame with context lines before and
+    after it (the context setting) and the pointer under the line of the frame. The common indentation of the
+    displayed lines is removed and the line of the frame is marked like the highlighted lines of rich.
+
+    :param frame: A frame from the frame model of the traceback.
+    :param context: The number of lines displayed before and after the line of the frame.
+    :param with_line_number: Displaying the line numbers or not.
+    :return: list
+    """
+
+    first, lines = frame.highlighted(context=context)
+
+    dedent: int = min(
+        (len(line.plain) - len(line.plain.lstrip()) for line in lines if line.plain.strip()), default=0
+    )
+    number_width: int = len(str(first + len(lines) - 1))
+
+    before, after = [], []
+
+    for lineno, line in enumerate(lines, start=first):
+        text: Text = Text(no_wrap=True, overflow='crop')
+
+        if with_line_number:
+            if lineno == frame.lineno:
+                text.append('❱ ', 'red')
+                text.append(f'{lineno:>{number_width}} ')
+            else:
+                text.append(f'  {lineno:>{number_width}} ', 'dim')
+
+        text.append_text(line[dedent:])
+        (before if lineno <= frame.lineno else after).append(text)
+
+    return [
+        Text('\n', no_wrap=True, overflow='crop').join(before),
+        gen_pointer(frame=frame, with_line_number=with_line_number, dedent=dedent, number_width=number_width),
+        *([Text('\n', no_wrap=True, overflow='crop').join(after)] if after else [])
+    ]
+
+
+def gen_code(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> list:
+    """
+    The task of this function is to generate a code template, which displays
+    the code that generated the exception.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: list
+    """
+
+    frame: Frame = get_inner_frame(frames=exc_info['frames'])
+
+    return gen_code_lines(frame=frame, context=exc_info['settings']['context'])
+
+
+def gen_trace_panel(frame: Frame, counter: int, context: int=0, locals_repr: LocalsRepr|None=None) -> Group:
+    """
+    The task of this function is to generate the panel of one frame (trace) for the trace and inner templates.
+
+    :param frame: A frame from the frame model of the traceback.
+    :param counter: The number of the frame in the traceback.
+    :param context: The number of lines displayed before and after the line of the frame.
+    :param locals_repr: The LocalsRepr of the exception, if the local variables of the frame are to be displayed.
+    :return: Group
+    """
+
+    renderables: list = [
+        f"File: [bold default]{frame.filename}[/]",
+        '',
+
+        *gen_code_lines(frame=frame, context=context, with_line_number=True)
+    ]
+
+    if locals_repr is not None:
+        renderables.extend(
+            [
+                '',
+
+                Panel(
+                    gen_locals_text(frame=frame, locals_repr=locals_repr),
+                    expand=False, title='locals', style='yellow'
+                )
+                if frame.inner
+                else '[bold underline yellow]NO LOCALS WERE FOUND IN THIS TRACE[/]'
+            ]
+        )
+
+    return Group(
+        Panel(
+            Group(*renderables),
+            title=f'[bold]Trace[{counter}] - {frame.scope}[/]', title_align='left',
+            padding=(1, 1, 0, 1), style='color(172)'
+        )
+    )
+
+
+def collapse_frames(frames: list[tuple[int, Frame]], head: int, tail: int) -> list[tuple[int, Frame|None, int]]:
+    """
+    The task of this function is to collapse the frames that are displayed by the trace and inner templates.
+
+    -Note: Runs of identical frames (same file, line and scope, like the frames of a recursion) are collapsed into
+    their first frame and the number of times it was repeated (just like the traceback of CPython). Then, if more
+    than head + tail entries remain, only the first head and the last tail entries are kept and the rest are
+    replaced by one entry (with frame None) that holds the number of omitted frames. So the work of rendering is
+    proportional to the number of distinct frames, not the depth of the stack.
+
+    :param frames: The frames with their numbers in the traceback.
+    :param head: The number of the first entries that are kept.
+    :param tail: The number of the last entries that are kept.
+    :return: list[tuple[int, Frame|None, int]]
+    """
+
+    entries: list = []
+
+    for counter, frame in frames:
+        if entries and entries[-1][1].filename == frame.filename \
+                and entries[-1][1].lineno == frame.lineno and entries[-1][1].scope == frame.scope:
+            entries[-1][2] += 1
+        else:
+            entries.append([counter, frame, 0])
+
+    if len(entries) > head + tail:
+        omitted: list = entries[head:len(entries) - tail]
+        entries = [
+            *entries[:head],
+            [omitted[0][0], None, sum(repeated + 1 for _, _, repeated in omitted)],
+            *entries[len(entries) - tail:]
+        ]
+
+    return [tuple(entry) for entry in entries]
+
+
+def gen_trace_panels(frames: list[tuple[int, Frame]], settings: dict, sources: SourceCache,
+                     locals_repr: LocalsRepr|None=None) -> list:
+    """
+    The task of this function is to generate the panels of the frames (traces) for the trace and inner templates,
+    with the repeated frames collapsed and the number of frames limited by the trace_head and trace_tail settings.
+
+    -Note: The code of all displayed frames is highlighted (prefetched) before the panels are generated,
+    so each file is lexed once instead of once per frame.
+
+    :param frames: The frames with their numbers in the traceback.
+    :param settings: The settings of the templates.
+    :param sources: The source cache of the exception.
+    :param locals_repr: The LocalsRepr of the exception, if the local variables of the frames are to be displayed.
+    :return: list
+    """
+
+    template: list = []
+
+    entries: list = collapse_frames(frames=frames, head=settings['trace_head'], tail=settings['trace_tail'])
+    sources.prefetch(frames=[frame for _, frame, _ in entries if frame is not None], context=settings['context'])
+
+    for counter, frame, count in entries:
+        if frame is None:
+            template.extend(['', f'[bold color(172)]... {count} more frames (from Trace[{counter}]) were omitted ...[/]'])
+            continue
+
+        template.extend(
+            ['', gen_trace_panel(frame=frame, counter=counter, context=settings['context'], locals_repr=locals_repr)]
+        )
+
+        if count:
+            template.append(f'[bold color(172)]❱ The frame above was repeated {count} more times[/]')
+
+    return template
+
+
+def gen_trace(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> list:
+    """
+    The task of this function is to generate a follow-up template.
+    In this format, the occurrence of the exception is tracked, and the information related
+    to each part that was influential in the occurrence of the exception will be displayed separately.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: list
+    """
+
+    template: list = [
+        f"[bold yellow]Exception Type ❱[/] [bold default]{exc_info['exc_type'].__name__}[/]",
+        f"[bold yellow]Exception Message ❱[/] [bold default]{exception_message(exc_message=exc_info['exc_message'])}[/]"
+    ]
+
+    template.extend(
+        gen_trace_panels(
+            frames=list(enumerate(exc_info['frames'], start=1)), settings=exc_info['settings'], sources=exc_info['sources']
+        )
+    )
+
+    return template
+
+
+def gen_trace_with_locals(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> list:
+    """
+    The task of this function is to generate the trace template with local variables.
+    In this format, the occurrence of the exception is tracked and the information related to each part that affected
+    the occurrence of the exception will be displayed separately along with the local variables of each scope.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: list
+    """
+
+    template: list = [
+        f"[bold yellow]Exception Type ❱[/] [bold default]{exc_info['exc_type'].__name__}[/]",
+        f"[bold yellow]Exception Message ❱[/] [bold default]{exception_message(exc_message=exc_info['exc_message'])}[/]"
+    ]
+
+    template.extend(
+        gen_trace_panels(
+            frames=list(enumerate(exc_info['frames'], start=1)), settings=exc_info['settings'],
+            sources=exc_info['sources'], locals_repr=exc_info['locals_repr']
+        )
+    )
+
+    return template
+
+
+def gen_inner(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> list:
+    """
+    The task of this function is to generate the inner trace template.
+    In this format, the exception occurred, limited to the internal space of the main file (source), is tracked, and the
+    information related to each part that had an effect on the occurrence of the exception will be displayed separately.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: list
+    """
+
+    template: list = [
+        f"[bold yellow]Exception Type ❱[/] [bold default]{exc_info['exc_type'].__name__}[/]",
+        f"[bold yellow]Exception Message ❱[/] [bold default]{exception_message(exc_message=exc_info['exc_message'])}[/]"
+    ]
+
+    template.extend(
+        gen_trace_panels(
+            frames=[(counter, frame) for counter, frame in enumerate(exc_info['frames'], start=1) if frame.inner],
+            settings=exc_info['settings'], sources=exc_info['sources']
+        )
+    )
+
+    return template
+
+
+def gen_inner_with_locals(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> list:
+    """
+    The task of this function is to generate the inner trace template with local variables.
+    In this format, the exception occurred, limited to the internal space of the main file (source), is tracked, and the
+    information related to each part that had an effect on the occurrence of the exception will be displayed separately
+    along with the local variables of each scope.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: list
+    """
+
+    template: list = [
+        f"[bold yellow]Exception Type ❱[/] [bold default]{exc_info['exc_type'].__name__}[/]",
+        f"[bold yellow]Exception Message ❱[/] [bold default]{exception_message(exc_message=exc_info['exc_message'])}[/]"
+    ]
+
+    template.extend(
+        gen_trace_panels(
+            frames=[(counter, frame) for counter, frame in enumerate(exc_info['frames'], start=1) if frame.inner],
+            settings=exc_info['settings'], sources=exc_info['sources'], locals_repr=exc_info['locals_repr']
+        )
+    )
+
+    return template
+
+
+def gen_locals(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> list:
+    """
+    The task of this function is to generate the template of local variables.
+    Any exception that occurs can also refer to the last value of variables. This template
+    display the last value of each scope variable before the exception occurred.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: list
+    """
+
+    template: list = []
+
+    for _, frame, count in collapse_frames(
+        frames=[(counter, frame) for counter, frame in enumerate(exc_info['frames'], start=1) if frame.inner],
+        head=exc_info['settings']['trace_head'], tail=exc_info['settings']['trace_tail']
+    ):
+        if frame is None:
+            template.extend(['', f'[bold color(172)]... the locals of {count} more frames were omitted ...[/]'])
+
+        else:
+            local = Group(
+                Panel(
+                    Group(
+                        gen_locals_text(frame=frame, locals_repr=exc_info['locals_repr']),
+                    )
+
+                , title=f'[bold]{frame.scope} locals[/]' + (f' [bold](repeated {count} more times)[/]' if count else ''),
+                title_align='left', padding=(1, 1, 0, 1), style='color(172)')
+            )
+
+            template.extend(['', local])
+
+    return template
+
+
+def exception_message(exc_message: BaseException) -> str:
+    """
+    The task of this function is to convert the message of the exception to str.
+
+    -Note: Just like CPython, a message that can not be converted (its __str__ fails or does not return a str)
+    is displayed as <exception str() failed>, so it can not break the exceptionhook.
+
+    :param exc_message: The message of exception that occurred.
+    :return: str
+    """
+
+    try:
+        return str(exc_message)
+    except Exception:
+        return '<exception str() failed>'
+
+
+def normalize_message(exc_type: type, exc_message: Exception) -> str:
+    """
+    The task of this function is to normalize the message of the exception for searching, so that the same
+    error with different names and values produces the same query. Quoted names, object representations,
+    memory addresses and numbers are removed from the message. If nothing remains, the name of the
+    exception type is used.
+
+    :param exc_type: The type of exception that occurred.
+    :param exc_message: The message of exception that occurred.
+    :return: str
+    """
+
+    message: str = exception_message(exc_message=exc_message)
+
+    for pattern in (r"'[^']*'", r'"[^"]*"', r'<[^<>]*>', r'\b0x[0-9a-fA-F]+\b', r'\b\d+(\.\d+)?\b'):
+        message = re.sub(pattern, ' ', message)
+
+    message = ' '.join(re.sub(r'\s+[:,.;]|[:,.;]\s*$', ' ', message).split())
+
+    return message or exc_type.__name__
+
+
+def get_cached_posts(query: str, cache_file: Path) -> list[tuple[str, str]]|None:
+    """
+    The task of this function is to return the cached search result of a query,
+    or None if it is not cached or is older than SEARCH_CACHE_TTL.
+
+    :param query: The normalized search query.
+    :param cache_file: The path of the search cache file.
+    :return: list[tuple[str, str]]|None
+    """
+
+    try:
+        with open(file=cache_file, mode='rb') as cache_file_:
+            cache: dict = pickle.load(cache_file_)
+    except (OSError, pickle.PickleError, EOFError):
+        return None
+
+    if (entry := cache.get(query)) is not None and time.time() - entry[0] < SEARCH_CACHE_TTL:
+        return entry[1]
+
+    return None
+
+
+def cache_posts(query: str, posts: list[tuple[str, str]], cache_file: Path) -> None:
+    """
+    The task of this function is to store the search result of a query in the search cache.
+
+    -Note: Expired entries are dropped, and if there are more than SEARCH_CACHE_SIZE entries,
+    the oldest ones are evicted.
+
+    :param query: The normalized search query.
+    :param posts: The titles and links of the answered posts.
+    :param cache_file: The path of the search cache file.
+    :return: None
+    """
+
+    try:
+        with open(file=cache_file, mode='rb') as cache_file_:
+            cache: dict = pickle.load(cache_file_)
+    except (OSError, pickle.PickleError, EOFError):
+        cache: dict = {}
+
+    now: float = time.time()
+    cache[query] = (now, posts)
+
+    entries: list = sorted(
+        [(query_, entry) for query_, entry in cache.items() if now - entry[0] < SEARCH_CACHE_TTL],
+        key=lambda item: item[1][0]
+    )[-SEARCH_CACHE_SIZE:]
+
+    try:
+        dump_file(file_path=cache_file, data=dict(entries))
+    except OSError:
+        pass
+
+
+def read_corpus(corpus_file: Path):
+    """
+    The task of this function is to read the exception/solution pairs of a corpus for the local solution index.
+
+    -Note: The corpus is either a JSON file that contains a list of objects with the keys exception, message,
+    title and link, or the Posts.xml file of a StackExchange dump. From the dump, only the answered questions
+    that are tagged with python are read, and the exception type is extracted from the title.
+
+    :param corpus_file: The path of the corpus.
+    :return: Iterator[tuple[str, str, str, str]]
+    """
+
+    if corpus_file.suffix.lower() == '.xml':
+        for _, element in ElementTree.iterparse(corpus_file):
+            if element.tag == 'row' and element.get('PostTypeId') == '1' and 'python' in element.get('Tags', '') \
+                    and (element.get('AcceptedAnswerId') or int(element.get('AnswerCount', 0))):
+                title: str = element.get('Title', '')
+                exception = re.search(r'\b([A-Z]\w*(Error|Exception|Warning|Exit|Interrupt))\b', title)
+
+                yield (
+                    exception.group(1) if exception else '',
+                    normalize_message(exc_type=Exception, exc_message=title),
+                    title,
+                    f"https://stackoverflow.com/questions/{element.get('Id')}"
+                )
+
+            element.clear()
+
+    else:
+        with open(file=corpus_file, mode='r', encoding='utf-8') as corpus_file_:
+            for item in json.load(corpus_file_):
+                yield (
+                    item.get('exception', ''),
+                    normalize_message(exc_type=Exception, exc_message=item.get('message', '')),
+                    item.get('title', ''),
+                    item.get('link', '')
+                )
+
+
+def build_index(corpus_file: Path, index_file: Path) -> int:
+    """
+    The task of this function is to build the local solution index (an SQLite FTS5 table) from a corpus.
+
+    -Note: The index is built in a temporary file next to the target and then replaces it,
+    so a running search never sees a half-built index.
+
+    :param corpus_file: The path of the corpus (a JSON file or the Posts.xml file of a StackExchange dump).
+    :param index_file: The path of the local solution index.
+    :return: int
+    """
+
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temp_name = tempfile.mkstemp(dir=index_file.parent, suffix='.db')
+    os.close(descriptor)
+    temp_file: Path = Path(temp_name)
+
+    try:
+        with sqlite3.connect(temp_file) as connection:
+            connection.execute('CREATE VIRTUAL TABLE solutions USING fts5(exception, message, title, link UNINDEXED)')
+            connection.executemany(
+                'INSERT INTO solutions VALUES (?, ?, ?, ?)', read_corpus(corpus_file=corpus_file)
+            )
+            count: int = connection.execute('SELECT count(*) FROM solutions').fetchone()[0]
+
+        connection.close()
+        os.replace(temp_file, index_file)
+
+    finally:
+        temp_file.unlink(missing_ok=True)
+
+    return count
+
+
+def search_index(exc_type: type, query: str, index_file: Path, limit: int=10) -> list[tuple[str, str]]|None:
+    """
+    The task of this function is to search the local solution index for the exception that occurred.
+    The posts are ranked by the exception type first, then by the normalized message and the title
+    (posts with the same title are all kept). If there is no index, None is returned.
+
+    :param exc_type: The type of exception that occurred.
+    :param query: The normalized message of the exception.
+    :param index_file: The path of the local solution index.
+    :param limit: The maximum number of posts.
+    :return: list[tuple[str, str]]|None
+    """
+
+    if not index_file.exists():
+        return None
+
+    terms: str = ' OR '.join(f'"{term}"' for term in dict.fromkeys([exc_type.__name__, *re.findall(r'\w+', query)]))
+
+    try:
+        connection = sqlite3.connect(f'{index_file.as_uri()}?mode=ro', uri=True)
+
+        try:
+            rows: list = connection.execute(
+                'SELECT title, link FROM solutions WHERE solutions MATCH ? '
+                'ORDER BY bm25(solutions, 10.0, 5.0, 1.0) LIMIT ?',
+                (terms, limit)
+            ).fetchall()
+        finally:
+            connection.close()
+
+    except sqlite3.Error:
+        return None
+
+    return rows
+
+
+class Search:
+    """
+    A search for the exception that occurred on stackoverflow, which runs in a background thread.
+
+    -Note: The search is started as soon as the exception arrives, so the request overlaps with generating
+    the templates. The local solution index is searched first, then the cached result of the query is used if
+    there is one, otherwise the stackoverflow api is requested with a strict timeout (if online searching is
+    allowed) and the result is cached.
+    """
+
+    __slots__ = ('query', 'timeout', 'cache_file', 'posts', 'error', '_thread', '_deadline')
+
+    def __init__(self, exc_type: type, exc_message: Exception, timeout: float,
+                 cache_file: Path, index_file: Path, online: bool=True) -> None:
+        """
+        :param exc_type: The type of exception that occurred.
+        :param exc_message: The message of exception that occurred.
+        :param timeout: The time limit (seconds) of the search.
+        :param cache_file: The path of the search cache file.
+        :param index_file: The path of the local solution index.
+        :param online: Request the stackoverflow api if there is no local or cached result.
+        """
+
+        self.query: str = normalize_message(exc_type=exc_type, exc_message=exc_message)
+        self.timeout, self.cache_file = timeout, cache_file
+        self.posts: list[tuple[str, str]]|None = search_index(exc_type=exc_type, query=self.query, index_file=index_file) \
+            or get_cached_posts(query=self.query, cache_file=cache_file)
+        self.error: str|None = None
+
+        self._deadline: float = time.monotonic() + timeout
+        self._thread: threading.Thread|None = None
+
+        if self.posts is None and not online:
+            self.error = 'No solution was found in the local index!'
+
+        elif self.posts is None:
+            self._thread = threading.Thread(target=self._request, name='pymg-search', daemon=True)
+            self._thread.start()
+
+    def _request(self) -> None:
+        """
+        The task of this method is to request the stackoverflow api and to cache the answered posts.
+
+        :return: None
+        """
+
+        try:
+            response = requests.get(
+                SEARCH_API,
+                params={
+                    'order': 'desc', 'sort': 'activity', 'tagged': 'python',
+                    'intitle': self.query, 'site': 'stackoverflow'
+                },
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+
+            posts: list[tuple[str, str]] = [
+                (item.get('title'), item.get('link'))
+                for item in response.json().get('items', [])
+                if item.get('is_answered')
+            ]
+
+        except requests.Timeout:
+            self.error = 'The search timed out!'
+
+        except (requests.RequestException, ValueError):
+            self.error = 'No internet connection!'
+
+        else:
+            cache_posts(query=self.query, posts=posts, cache_file=self.cache_file)
+            self.posts = posts
+
+    def result(self) -> list[tuple[str, str]]|None:
+        """
+        The task of this method is to wait for the search (until its deadline) and to return the answered posts,
+        or None if the search failed or timed out (the reason is kept in the error attribute).
+
+        :return: list[tuple[str, str]]|None
+        """
+
+        if self._thread is not None:
+            self._thread.join(timeout=max(self._deadline - time.monotonic(), 0))
+
+            if self._thread.is_alive():
+                self.error = 'The search timed out!'
+
+        return self.posts if self.error is None else None
+
+
+def gen_search(**exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr|Search) -> str:
+    """
+    The task of this function is to find and search for a solution in stackoverflow for the exception that occurred with the
+    help of this site's APIs. Finally, the title and link of the related posts that received the answer will be displayed.
+
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+                     The search key contains the Search that was started when the exception arrived (optional).
+    :return: str (the text of the displayed result)
+    """
+
+    search: Search = exc_info.get('search') or Search(
+        exc_type=exc_info['exc_type'], exc_message=exc_info['exc_message'],
+        timeout=SEARCH_TIMEOUT, cache_file=get_search_cache(), index_file=get_index_file()
+    )
+
+    if (posts := search.result()) is None:
+        return write_renderables(f"[bold red]Error:[/] [default]{search.error}[/]")
+
+    else:
+        search_box = Panel(
+            Group(
+                '\n'.join(
+                    [
+                        f'[bold]{escape(title)}[/]\n[underline color(33)]{link}[/]\n'
+                        for title, link in posts
+                    ]
+                )
+            ),
+            title='[bold]Search Result[/]',
+            title_align='center',
+            padding=(1, 1, 0, 1),
+            style='color(29)',
+        )
+
+        return write_renderables(search_box)
+
+
+def gen_record(exc_type: type, exc_message: BaseException, traceback_: TracebackType|None,
+               sources: SourceCache, locals_repr: LocalsRepr, chain: int=0,
+               frames: list[Frame|FrameSnapshot]|None=None) -> dict:
+    """
+    The task of this function is to generate a machine-readable record of the exception
+    (for the --format json|ndjson option).
+
+    -Note: The record is bounded in size: at most RECORD_FRAMES frames are kept (the first and the last half, the
+    number of the omitted frames is recorded), the message and the local variables (of the inner frames) are
+    displayed by the LocalsRepr within its limits and budgets, and at most RECORD_CHAIN chained exceptions are followed.
+
+    :param exc_type: The type of exception that occurred.
+    :param exc_message: The message of exception that occurred.
+    :param traceback_: A traceback that contains full information about the file where the exception occurred.
+    :param sources: The source cache of the exception.
+    :param locals_repr: The LocalsRepr of the exception.
+    :param chain: The number of chained exceptions that were followed to reach this exception.
+    :param frames: The frame model of the traceback, if it is already built (optional). It is reused, so the frames
+                   of a worker process are recorded too and the local variables are not displayed again.
+    :return: dict
+    """
+
+    if frames is None:
+        frames: list[Frame|FrameSnapshot] = gen_frames(traceback_=traceback_, sources=sources)
+
+    omitted: int = max(len(frames) - RECORD_FRAMES, 0)
+
+    if omitted:
+        frames = frames[:RECORD_FRAMES // 2] + frames[-(RECORD_FRAMES - RECORD_FRAMES // 2):]
+
+    record: dict = {
+        'type': exc_type.__qualname__,
+        'module': exc_type.__module__,
+        'message': locals_repr.message(exc_message=exc_message),
+        'frames': [
+            {
+                'file': frame.filename, 'line': frame.lineno, 'col': frame.colno, 'end_col': frame.end_colno,
+                'scope': frame.scope, 'inner': frame.inner,
+                **({'locals': frame.locals_texts(locals_repr=locals_repr), 'locals_omitted': frame.omitted}
+                   if frame.inner else {})
+            }
+            for frame in frames
+        ],
+        'frames_omitted': omitted,
+    }
+
+    for key, chained in (('cause', exc_message.__cause__), ('context', exc_message.__context__)):
+        if key == 'context' and (exc_message.__suppress_context__ or chained is exc_message.__cause__):
+            chained = None
+
+        record[key] = gen_record(
+            exc_type=type(chained), exc_message=chained, traceback_=chained.__traceback__,
+            sources=sources, locals_repr=locals_repr, chain=chain + 1
+        ) if chained is not None and chain < RECORD_CHAIN else None
+
+    if chain == 0:
+        record = {'time': time.time(), 'source': Path(sources.source_info[0]).__str__(), **record}
+
+    return record
+
+
+def export_record(record: dict, record_format: str, target: str) -> None:
+    """
+    The task of this function is to export the record of the exception to a file or a file descriptor.
+
+    -Note: With the ndjson format, the record is one compact line that is appended to the file, so the records
+    of many runs can be collected in one file. With the json format, the file is replaced by the record.
+
+    :param record: The record of the exception.
+    :param record_format: The format of the record (json or ndjson).
+    :param target: The path of the file, fd:N for a file descriptor or '-' for stdout.
+    :return: None
+    """
+
+    data: bytes = (
+        json.dumps(record, separators=(',', ':'), ensure_ascii=False, default=str) if record_format == 'ndjson'
+        else json.dumps(record, indent=2, ensure_ascii=False, default=str)
+    ).encode('utf-8') + b'\n'
+
+    if target == '-':
+        sys.stdout.flush()
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+    elif target.startswith('fd:'):
+        view, descriptor = memoryview(data), int(target[3:])
+        while view:
+            view = view[os.write(descriptor, view):]
+
+    else:
+        with open(target, 'ab' if record_format == 'ndjson' else 'wb') as target_:
+            target_.write(data)
+
+
+def gen_fingerprint(exc_type: type, frames: list[Frame]) -> tuple[str, str]:
+    """
+    The task of this function is to generate the fingerprint of an exception (a hash of its type and the normalized
+    signature of its frames) and the location (file and line) of it.
+
+    -Note: Each frame is normalized to the name of its file, its scope and its code (with collapsed whitespace),
+    so the fingerprint does not change when the lines are moved or when the project is checked out elsewhere.
+    Repeated frames (recursion) are counted once, so the depth of a recursion does not change it either.
+
+    :param exc_type: The type of exception that occurred.
+    :param frames: The frame model of the traceback.
+    :return: tuple[str, str]
+    """
+
+    signature: dict = dict.fromkeys(
+        [
+            f'{exc_type.__module__}.{exc_type.__qualname__}',
+            *(f"{Path(frame.filename).name}:{frame.scope}:{' '.join(frame.line.split())}" for frame in frames)
+        ]
+    )
+
+    location: str = f'{Path((frame := get_inner_frame(frames=frames)).filename).name}:{frame.lineno}' if frames else ''
+
+    return hashlib.sha1('\n'.join(signature).encode('utf-8')).hexdigest(), location
+
+
+def count_occurrences(fingerprint: str, db_file: Path, spool_file: Path) -> int:
+    """
+    The task of this function is to count the previous occurrences of a fingerprint
+    (in the fingerprint database and in the spool that has not been moved into it yet).
+
+    :param fingerprint: The fingerprint of the exception.
+    :param db_file: The path of the fingerprint database.
+    :param spool_file: The path of the spool of the fingerprint database.
+    :return: int
+    """
+
+    count: int = 0
+
+    try:
+        count += spool_file.read_bytes().count(fingerprint.encode('ascii'))
+    except OSError:
+        pass
+
+    if db_file.exists():
+        try:
+            connection = sqlite3.connect(f'{db_file.absolute().as_uri()}?mode=ro', uri=True)
+
+            try:
+                row = connection.execute(
+                    'SELECT count FROM fingerprints WHERE fingerprint = ?', (fingerprint,)
+                ).fetchone()
+            finally:
+                connection.close()
+
+        except sqlite3.Error:
+            row = None
+
+        count += row[0] if row else 0
+
+    return count
+
+
+def record_occurrence(occurrence: dict, db_file: Path, spool_file: Path) -> None:
+    """
+    The task of this function is to record an occurrence of a fingerprint.
+
+    -Note: The occurrence is appended to the spool (one line and one write call), which is all that happens on the
+    crash path. The write holds a shared lock of the spool, so a concurrent flush cannot move it away in between. Only when the spool grows beyond FINGERPRINT_SPOOL_SIZE bytes, it is moved into the fingerprint
+    database in one transaction.
+
+    :param occurrence: The fingerprint, type, message, location, time and rendered report (optional) of the exception.
+    :param db_file: The path of the fingerprint database.
+    :param spool_file: The path of the spool of the fingerprint database.
+    :return: None
+    """
+
+    if occurrence.get('report') is not None:
+        occurrence['report'] = occurrence['report'][:FINGERPRINT_REPORT_SIZE]
+
+    try:
+        spool_file.parent.mkdir(parents=True, exist_ok=True)
+        descriptor: int = open_spool(spool_file=spool_file, flags=os.O_WRONLY | os.O_APPEND | os.O_CREAT, exclusive=False)
+
+        try:
+            os.write(descriptor, json.dumps(occurrence, separators=(',', ':')).encode('utf-8') + b'\n')
+            size: int = os.fstat(descriptor).st_size
+        finally:
+            os.close(descriptor)
+
+        if size > FINGERPRINT_SPOOL_SIZE:
+            flush_fingerprints(db_file=db_file, spool_file=spool_file)
+
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def open_spool(spool_file: Path, flags: int, exclusive: bool) -> int:
+    """
+    The task of this function is to open the spool of the fingerprint database and to lock it
+    (shared to append an occurrence, exclusive to flush the spool).
+
+    -Note: When the spool was moved away by a flush while waiting for the lock, the descriptor points to the moved
+    spool, which has already been read, so the spool is opened again. Without fcntl (Windows) the spool is not locked.
+
+    :param spool_file: The path of the spool of the fingerprint database.
+    :param flags: The flags of os.open.
+    :param exclusive: Whether the lock is exclusive.
+    :return: int
+    """
+
+    while True:
+        descriptor: int = os.open(spool_file, flags, 0o600)
+
+        if fcntl is None:
+            return descriptor
+
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+            if os.fstat(descriptor).st_ino == os.stat(spool_file).st_ino:
+                return descriptor
+
+        except FileNotFoundError:
+            if not flags & os.O_CREAT:
+                os.close(descriptor)
+                raise
+
+        except BaseException:
+            os.close(descriptor)
+            raise
+
+        os.close(descriptor)
+
+
+def flush_fingerprints(db_file: Path, spool_file: Path) -> None:
+    """
+    The task of this function is to move the occurrences of the spool into the fingerprint database.
+
+    -Note: The spool is locked exclusively and renamed first (so new occurrences start a new spool), then its
+    occurrences are read before the lock is released and grouped by their fingerprint and written in one transaction, which keeps the first and last time, the number of occurrences
+    and the latest rendered report of each fingerprint.
+
+    :param db_file: The path of the fingerprint database.
+    :param spool_file: The path of the spool of the fingerprint database.
+    :return: None
+    """
+
+    flushing: Path = spool_file.with_name(f'{spool_file.name}.{os.getpid()}')
+
+    try:
+        descriptor: int = open_spool(spool_file=spool_file, flags=os.O_RDONLY, exclusive=True)
+    except FileNotFoundError:
+        return
+
+    groups: dict = {}
+
+    with open(file=descriptor, mode='r', encoding='utf-8', errors='replace') as flushing_:
+        os.replace(spool_file, flushing)
+
+        for line in flushing_:
+            try:
+                occurrence: dict = json.loads(line)
+            except ValueError:
+                continue
+
+            if (group := groups.get(occurrence['fingerprint'])) is None:
+                groups[occurrence['fingerprint']] = {**occurrence, 'first': occurrence['time'], 'count': 1}
+            else:
+                group.update(
+                    type=occurrence['type'], message=occurrence['message'], location=occurrence['location'],
+                    time=occurrence['time'], count=group['count'] + 1, report=occurrence.get('report') or group.get('report')
+                )
+
+    # The reports contain the local variables, so the database is private (like the spool and the crash history).
+    os.close(os.open(db_file, os.O_RDONLY | os.O_CREAT, 0o600))
+    if os.name != 'nt' and os.stat(db_file).st_mode & 0o077:
+        os.chmod(db_file, 0o600)
+
+    with sqlite3.connect(db_file, timeout=10) as connection:
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS fingerprints (fingerprint TEXT PRIMARY KEY, type TEXT, message TEXT, '
+            'location TEXT, first_seen REAL, last_seen REAL, count INTEGER, report TEXT)'
+        )
+        connection.executemany(
+            'INSERT INTO fingerprints VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(fingerprint) DO UPDATE SET '
+            'type = excluded.type, message = excluded.message, location = excluded.location, '
+            'first_seen = min(first_seen, excluded.first_seen), last_seen = max(last_seen, excluded.last_seen), '
+            'count = count + excluded.count, report = coalesce(excluded.report, report)',
+            [
+                (
+                    fingerprint, group['type'], group['message'], group['location'],
+                    group['first'], group['time'], group['count'], group.get('report')
+                )
+                for fingerprint, group in groups.items()
+            ]
+        )
+
+    connection.close()
+    flushing.unlink(missing_ok=True)
+
+
+def get_fingerprints(db_file: Path, spool_file: Path, limit: int) -> list[tuple]:
+    """
+    The task of this function is to return the most recurring fingerprints (--stats option),
+    after moving the spool into the fingerprint database.
+
+    :param db_file: The path of the fingerprint database.
+    :param spool_file: The path of the spool of the fingerprint database.
+    :param limit: The maximum number of fingerprints.
+    :return: list[tuple]
+    """
+
+    flush_fingerprints(db_file=db_file, spool_file=spool_file)
+
+    if not db_file.exists():
+        return []
+
+    with sqlite3.connect(db_file, timeout=10) as connection:
+        rows: list = connection.execute(
+            'SELECT fingerprint, type, message, location, first_seen, last_seen, count FROM fingerprints '
+            'ORDER BY count DESC, last_seen DESC LIMIT ?', (limit,)
+        ).fetchall()
+
+    connection.close()
+
+    return rows
+
+
+def get_report(fingerprint: str, db_file: Path, spool_file: Path) -> tuple[str, str|None]|None:
+    """
+    The task of this function is to return the fingerprint and the latest rendered report of a fingerprint
+    (--report option). The fingerprint can be abbreviated (a prefix of it), and if no fingerprint or
+    more than one fingerprint matches, None is returned.
+
+    :param fingerprint: The fingerprint (or a prefix of it).
+    :param db_file: The path of the fingerprint database.
+    :param spool_file: The path of the spool of the fingerprint database.
+    :return: tuple[str, str|None]|None
+    """
+
+    flush_fingerprints(db_file=db_file, spool_file=spool_file)
+
+    if not db_file.exists() or not re.fullmatch(r'[0-9a-f]+', fingerprint := fingerprint.lower()):
+        return None
+
+    with sqlite3.connect(db_file, timeout=10) as connection:
+        rows: list = connection.execute(
+            'SELECT fingerprint, report FROM fingerprints WHERE fingerprint LIKE ? LIMIT 2', (f'{fingerprint}%',)
+        ).fetchall()
+
+    connection.close()
+
+    return rows[0] if len(rows) == 1 else None
+
+
+def display_stats(rows: list[tuple]) -> None:
+    """
+    The task of this function is to display the most recurring fingerprints (--stats option): the number of
+    occurrences, type, message and location of each one, with its (abbreviated) fingerprint and its first and last time.
+
+    :param rows: The fingerprints from the fingerprint database.
+    :return: None
+    """
+
+    if not rows:
+        cprint("[bold yellow]No exceptions have been recorded yet.[/]")
+        return
+
+    width: int = len(str(rows[0][6]))
+    when = lambda timestamp: datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')
+
+    template: list = [
+        f"[bold default]{count:>{width}}×[/] [bold red]{escape(exc_type)}[/] [bold yellow]❱[/] "
+        f"{escape(message)}\n{' ' * (width + 2)}[color(33)]{fingerprint[:FINGERPRINT_LENGTH]}[/]  "
+        f"[bold default]{escape(location)}[/]  [default]first {when(first_seen)}  last {when(last_seen)}[/]"
+        for fingerprint, exc_type, message, location, first_seen, last_seen, count in rows
+    ]
+
+    cprint(
+        Panel(
+            '\n'.join(template),
+            title='Stats', style='color(29)',
+            padding=(0, 1, 0, 1), highlight=False
+        )
+    )
+
+
+def gen_snapshot(exc_type: type, exc_message: BaseException, frames: list[Frame], sources: SourceCache,
+                 locals_repr: LocalsRepr, recipe: list[str], fingerprint: str, origin: str|None=None) -> dict:
+    """
+    The task of this function is to generate a compact snapshot of the exception, from which the templates can be
+    generated again later (--recent and --show options) without executing the source file.
+
+    -Note: The snapshot only contains plain data: the type and message of the exception, the source information,
+    the frame model with the code of each frame and, if the recipe displayed them (--locals), at most HISTORY_LOCALS
+    local variables of each inner frame, displayed by the LocalsRepr of the exception within its limits (the frames
+    that were already displayed are not displayed again). At most RECORD_FRAMES frames are kept (the first and the
+    last half).
+
+    :param exc_type: The type of exception that occurred.
+    :param exc_message: The message of exception that occurred.
+    :param frames: The frame model of the traceback.
+    :param sources: The source cache of the exception.
+    :param locals_repr: The LocalsRepr of the exception.
+    :param recipe: The recipe of the templates that were displayed.
+    :param fingerprint: The fingerprint of the exception.
+    :param origin: The thread and/or child process where the exception occurred (optional).
+    :return: dict
+    """
+
+    if len(frames) > RECORD_FRAMES:
+        frames = frames[:RECORD_FRAMES // 2] + frames[-(RECORD_FRAMES - RECORD_FRAMES // 2):]
+
+    with_locals: bool = bool({'locals', 'trace_with_locals', 'inner_with_locals'} & set(recipe))
+    snapshot_frames: list = []
+
+    for frame in frames:
+        texts: dict = frame.locals_texts(locals_repr=locals_repr) if with_locals and frame.inner else {}
+
+        snapshot_frames.append({
+            'filename': frame.filename, 'lineno': frame.lineno, 'colno': frame.colno, 'end_colno': frame.end_colno,
+            'scope': frame.scope, 'inner': frame.inner, 'line': frame.line, 'indent': frame.indent,
+            'locals': dict(islice(texts.items(), HISTORY_LOCALS)),
+            'omitted': frame.omitted + max(len(texts) - HISTORY_LOCALS, 0) if with_locals and frame.inner else 0
+        })
+
+    return {
+        'time': time.time(),
+        'source_info': [Path(sources.source_info[0]).__str__(), *sources.source_info[1:]],
+        'type': exc_type.__name__,
+        'module': exc_type.__module__,
+        'message': locals_repr.message(exc_message=exc_message),
+        'recipe': recipe,
+        'fingerprint': fingerprint,
+        'origin': origin,
+        'frames': snapshot_frames
+    }
+
+
+def save_snapshot(snapshot: dict, history_dir: Path, history_size: int) -> None:
+    """
+    The task of this function is to store the snapshot of an exception in the crash history
+    and to remove the oldest snapshots, so that only the last history_size snapshots are kept.
+
+    -Note: Each snapshot is a compressed (zlib) pickle of plain data in its own file, whose name starts with
+    the time of the exception (in nanoseconds). Only the user can read it, because it may contain local variables.
+
+    :param snapshot: The snapshot of the exception.
+    :param history_dir: The directory of the crash history.
+    :param history_size: The number of snapshots that are kept.
+    :return: None
+    """
+
+    try:
+        history_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+        snapshot_file: Path = Path(history_dir, f'{time.time_ns()}-{os.getpid()}.pymgsnap')
+        descriptor: int = os.open(
+            Path(history_dir, f'{snapshot_file.name}.tmp'), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+        )
+        with open(descriptor, 'wb') as temporary_file:
+            temporary_file.write(zlib.compress(pickle.dumps(snapshot)))
+
+        os.replace(Path(history_dir, f'{snapshot_file.name}.tmp'), snapshot_file)
+
+        for old_snapshot in get_snapshot_files(history_dir=history_dir)[history_size:]:
+            old_snapshot.unlink(missing_ok=True)
+
+    except OSError:
+        pass
+
+
+def get_snapshot_files(history_dir: Path) -> list[Path]:
+    """
+    The task of this function is to return the files of the crash history, the most recent one first.
+
+    :param history_dir: The directory of the crash history.
+    :return: list[Path]
+    """
+
+    try:
+        return sorted(history_dir.glob('*.pymgsnap'), key=lambda snapshot_file: snapshot_file.name, reverse=True)
+    except OSError:
+        return []
+
+
+def read_snapshot(snapshot_file: Path) -> dict|None:
+    """
+    The task of this function is to read a snapshot from the crash history.
+    If the snapshot can not be read, None is returned.
+
+    :param snapshot_file: The path of the snapshot.
+    :return: dict|None
+    """
+
+    try:
+        return pickle.loads(zlib.decompress(snapshot_file.read_bytes()))
+    except (OSError, zlib.error, pickle.PickleError, EOFError, AttributeError, ValueError):
+        return None
+
+
+def display_history(history_dir: Path) -> None:
+    """
+    The task of this function is to display the crash history (--history option): the number of each snapshot
+    (for the --show option), its time, the source file and the type and message of its exception.
+
+    :param history_dir: The directory of the crash history.
+    :return: None
+    """
+
+    if not (snapshot_files := get_snapshot_files(history_dir=history_dir)):
+        cprint("[bold yellow]No exceptions have been stored yet.[/]")
+        return
+
+    template: list = []
+
+    for number, snapshot_file in enumerate(snapshot_files, start=1):
+        if (snapshot := read_snapshot(snapshot_file=snapshot_file)) is not None:
+            template.append(
+                f"[bold default]{number:>{len(str(len(snapshot_files)))}}[/] "
+                f"[default]{datetime.datetime.fromtimestamp(snapshot['time']).strftime('%Y-%m-%d %H:%M:%S')}[/] "
+                f"[bold default]{escape(Path(snapshot['source_info'][0]).name)}[/] [bold yellow]❱[/] "
+                f"[bold red]{escape(snapshot['type'])}[/][bold default]:[/] {escape(snapshot['message'])}"
+            )
+
+    cprint(
+        Panel(
+            '\n'.join(template),
+            title='History', style='color(29)',
+            padding=(0, 1, 0, 1), highlight=False
+        )
+    )
+
+
+def show_snapshot(number: int, history_dir: Path, recipe: list[str], settings: dict) -> None:
+    """
+    The task of this function is to generate the templates of a stored exception again (--recent and --show options),
+    with the recipe of the command line or, if there is none, the recipe that was used when the exception occurred.
+    Nothing is executed.
+
+    :param number: The number of the snapshot in the crash history (1 is the most recent one).
+    :param history_dir: The directory of the crash history.
+    :param recipe: A list containing recipe information in string format (can be empty).
+    :param settings: The settings of the templates.
+    :return: None
+    """
+
+    snapshot_files: list = get_snapshot_files(history_dir=history_dir)
+
+    if not 1 <= number <= len(snapshot_files):
+        cprint(f"[bold red]Error:[/] There is no exception number {number} in the crash history (see --history).")
+
+    elif (snapshot := read_snapshot(snapshot_file=snapshot_files[number - 1])) is None:
+        cprint("[bold red]Error:[/] The available information is corrupted.")
+
+    else:
+        exc_type: type = type(snapshot['type'], (Exception,), {'__module__': snapshot['module']})
+
+        display_templates(
+            recipe=recipe or snapshot['recipe'],
+            title=f"Exception in {escape(snapshot['origin'])}" if snapshot.get('origin') else 'Exception',
+            exc_type=exc_type,
+            exc_message=exc_type(snapshot['message']),
+            traceback_=None,
+            frames=[FrameSnapshot(frame=frame) for frame in snapshot['frames']],
+            sources=SourceCache(source_info_file=None, source_info=snapshot['source_info']),
+            locals_repr=LocalsRepr(**{option: settings[option] for option in LOCALS_LIMITS}),
+            settings=settings
+        )
+
+
+def output_path_validator(output_file: Path, append: bool=False) -> tuple[bool, str]:
+    """
+    The task of this function is to validate the path of the text file where the output is to be written.
+
+    :param output_file: The path of the text file where the output is to be written.
+    :param append: The output is appended to the text file if it already exists.
+    :return: tuple[bool, str]
+    """
+
+    if output_file.__str__().endswith('.txt') and not output_file.is_dir():
+        if append or not output_file.exists():
+            return True, 'VALID'
+
+        return False, "[bold red]Error:[/] Writing output to text file was not successful!\n" \
+                      "A file with this name already exists in this path! (use --append to append to it)"
+
+    return False, "[bold red]Error:[/] Writing output to text file was not successful!\n" \
+                  "The selected path must be the path of a file with a .txt suffix."
+
+
+def export_target_validator(target: str) -> tuple[bool, str]:
+    """
+    The task of this function is to validate the target where the record of the exception is to be exported.
+
+    :param target: The path of a file, fd:N for a file descriptor or '-' for stdout.
+    :return: tuple[bool, str]
+    """
+
+    if target == '-' or (target.startswith('fd:') and target[3:].isdigit()):
+        return True, 'VALID'
+
+    if target.startswith('fd:') or Path(target).is_dir() or not Path(target).absolute().parent.is_dir():
+        return False, "[bold red]Error:[/] Exporting the record was not successful!\n" \
+                      "The target must be the path of a file in an existing directory, fd:N or -."
+
+    return True, 'VALID'
+
+
+def strip_ansi(data: bytes) -> bytes:
+    """
+    The task of this function is to remove the ANSI escape sequences (colors, styles, links, ...) from the output.
+
+    :param data: The output.
+    :return: bytes
+    """
+
+    return re.sub(rb'\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(\x07|\x1b\\)|\x1b[@-Z\\-_]', b'', data)
+
+
+class OutputLog:
+    """
+    The text file where the output is written by the --output option, with size-based rotation.
+
+    -Note: When the file would grow beyond max_bytes, it is renamed to <name>.1 (the older backups are shifted
+    to <name>.2 ... <name>.<backups>) and a new file is started. The writes of stdout and stderr are serialized
+    by a lock and flushed immediately, so the crash report is never lost.
+    """
+
+    __slots__ = ('path', 'max_bytes', 'backups', '_file', '_lock')
+
+    def __init__(self, path: Path, append: bool=False, max_bytes: int=0, backups: int=5) -> None:
+        """
+        :param path: The path of the text file.
+        :param append: Append to the text file if it already exists.
+        :param max_bytes: The maximum size of the text file before it is rotated (0 means no rotation).
+        :param backups: The number of rotated files that are kept.
+        """
+
+        self.path, self.max_bytes, self.backups = path, max_bytes, backups
+        self._file = open(path, 'ab' if append else 'wb')
+        self._lock = threading.Lock()
+
+    def write(self, data: bytes) -> None:
+        """
+        The task of this method is to write the output (without ANSI escape sequences) in the text file.
+
+        :param data: The output.
+        :return: None
+        """
+
+        data = strip_ansi(data)
+
+        with self._lock:
+            if self.max_bytes and self._file.tell() and self._file.tell() + len(data) > self.max_bytes:
+                self._rotate()
+
+            self._file.write(data)
+            self._file.flush()
+
+    def _rotate(self) -> None:
+        """
+        The task of this method is to rotate the text file.
+
+        :return: None
+        """
+
+        self._file.close()
+
+        for number in range(self.backups - 1, 0, -1):
+            if (backup := Path(f'{self.path}.{number}')).exists():
+                os.replace(backup, f'{self.path}.{number + 1}')
+
+        if self.backups:
+            os.replace(self.path, f'{self.path}.1')
+
+        self._file = open(self.path, 'wb')
+
+    def close(self) -> None:
+        """
+        The task of this method is to close the text file.
+
+        :return: None
+        """
+
+        with self._lock:
+            self._file.close()
+
+
+def pump_output(pipe: BufferedReader, stream: BufferedWriter, log: OutputLog) -> None:
+    """
+    The task of this function is to copy the output of the child Python interpreter (or of the source file
+    interpreted inside the pymg process) to the terminal and to the OutputLog as soon as it arrives, in chunks of at most 64 KiB (so the output is never held in memory).
+
+    :param pipe: The pipe of the output of the child Python interpreter (stdout or stderr).
+    :param stream: The binary stream of the terminal.
+    :param log: The OutputLog.
+    :return: None
+    """
+
+    pending: bytes = b''
+
+    while chunk := os.read(pipe.fileno(), 65536):
+        stream.write(chunk)
+        stream.flush()
+
+        # An escape sequence that is split between two chunks is stripped when the rest of it arrives.
+        data, pending = split_partial_escape(data=pending + chunk)
+
+        log.write(data)
+
+    if pending:
+        log.write(pending)
+
+
+def split_partial_escape(data: bytes) -> tuple[bytes, bytes]:
+    """
+    The task of this function is to split the output into the part that can be written in the text file and
+    the escape sequence at its end that is not complete yet (PARTIAL_ESCAPE), which must wait for the next chunk.
+
+    -Note: An OSC sequence (a title or a hyperlink) is held back until its terminator (BEL or ESC \\) arrives,
+    even if it contains letters, but never longer than PARTIAL_ESCAPE_SIZE bytes.
+
+    :param data: The output.
+    :return: tuple[bytes, bytes]
+    """
+
+    if (partial := PARTIAL_ESCAPE.search(data, max(len(data) - PARTIAL_ESCAPE_SIZE, 0))) is None:
+        return data, b''
+
+    return data[:partial.start()], data[partial.start():]
+
+
+def get_output(python_interpreter: str, source_file: Path, args: list, output_file: Path,
+               append: bool=False, max_bytes: int=0, backups: int=5, pass_fds: tuple=()) -> None:
+    """
+    The task of this function is to write the output generated by pymg in a text file, while it is displayed on
+    the terminal (the stdout and stderr of the child Python interpreter are streamed to both of them).
+
+    -Note: If the terminal supports colors, the child Python interpreter is told to use them (PYMG_FORCE_TERMINAL)
+    even though its output is a pipe, and the colors are removed from the text file.
+
+    :param python_interpreter: The Python interpreter that is supposed to interpret the source file.
+    :param source_file: The absolute path of the source file.
+    :param args: Command line arguments.
+    :param output_file: The path of the text file where the output is to be written.
+    :param append: Append to the text file if it already exists.
+    :param max_bytes: The maximum size of the text file before it is rotated (0 means no rotation).
+    :param backups: The number of rotated files that are kept.
+    :param pass_fds: The file descriptors that are kept open in the child Python interpreter.
+    :return: None
+    """
+
+    response, output_error_message = output_path_validator(output_file=output_file, append=append)
+
+    if response:
+        environment: dict = {**os.environ, 'COLUMNS': os.environ.get('COLUMNS', shutil.get_terminal_size().columns.__str__())}
+        if sys.stdout.isatty():
+            environment['PYMG_FORCE_TERMINAL'] = '1'
+
+        log = OutputLog(path=output_file, append=append, max_bytes=max_bytes, backups=backups)
+
+        try:
+            process = subprocess.Popen(
+                [python_interpreter, '-c', gen_launcher(), source_file.__str__(), *args],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=source_file.parent, env=environment,
+                pass_fds=pass_fds
+            )
+
+            pumps: list = [
+                threading.Thread(target=pump_output, args=(process.stdout, sys.stdout.buffer, log), daemon=True),
+                threading.Thread(target=pump_output, args=(process.stderr, sys.stderr.buffer, log), daemon=True)
+            ]
+
+            for pump in pumps:
+                pump.start()
+
+            process.wait()
+
+            for pump in pumps:
+                pump.join()
+
+        finally:
+            log.close()
+    else:
+        cprint(output_error_message)
+
+
+def get_output_in_process(source_file: Path, code: CodeType, args: list, output_file: Path,
+                          append: bool=False, max_bytes: int=0, backups: int=5) -> None:
+    """
+    The task of this function is to write the output generated by pymg in a text file
+    when the source file is interpreted inside the pymg process, while it is displayed on the terminal.
+
+    -Note: The file descriptors 1 and 2 (not only sys.stdout and sys.stderr) are replaced with pipes that are streamed
+    to the terminal and the text file (pump_output), so the output of child processes (os.system, subprocess),
+    C extensions and os.write is written too, just like with a child Python interpreter (get_output). If the terminal
+    supports colors, the exceptionhook is told to use them (PYMG_FORCE_TERMINAL) even though its output is a pipe.
+
+    :param source_file: The path of the source file.
+    :param code: The compiled code of the source file.
+    :param args: Command line arguments.
+    :param output_file: The path of the text file where the output is to be written.
+    :param append: Append to the text file if it already exists.
+    :param max_bytes: The maximum size of the text file before it is rotated (0 means no rotation).
+    :param backups: The number of rotated files that are kept.
+    :return: None
+    """
+
+    response, output_error_message = output_path_validator(output_file=output_file, append=append)
+
+    if response:
+        environment: dict = {variable: os.environ.get(variable) for variable in ('COLUMNS', 'PYMG_FORCE_TERMINAL')}
+        os.environ['COLUMNS'] = os.environ.get('COLUMNS', shutil.get_terminal_size().columns.__str__())
+        if sys.stdout.isatty():
+            os.environ['PYMG_FORCE_TERMINAL'] = '1'
+
+        log = OutputLog(path=output_file, append=append, max_bytes=max_bytes, backups=backups)
+        terminals, pipes, pumps = [], [], []
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        try:
+            for descriptor in (1, 2):
+                read_fd, write_fd = os.pipe()
+                terminals.append(os.dup(descriptor))
+                pipes.append(open(read_fd, mode='rb'))
+
+                os.dup2(write_fd, descriptor)
+                os.close(write_fd)
+
+                pumps.append(
+                    threading.Thread(
+                        target=pump_output, args=(pipes[-1], open(terminals[-1], mode='wb', closefd=False), log),
+                        daemon=True
+                    )
+                )
+                pumps[-1].start()
+
+            interpret_in_process(source_file=source_file, code=code, args=args)
+
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+            for descriptor, terminal in zip((1, 2), terminals):
+                os.dup2(terminal, descriptor)
+                os.close(terminal)
+
+            for pump in pumps:
+                pump.join()
+
+            for pipe in pipes:
+                pipe.close()
+
+            log.close()
+
+            for variable, value in environment.items():
+                if value is None:
+                    os.environ.pop(variable, None)
+                else:
+                    os.environ[variable] = value
+    else:
+        cprint(output_error_message)
+
+
+def interpret(python_interpreter: str, source_file: Path, args: list, pass_fds: tuple=()) -> None:
+    """
+    The task of this function is to interpret (execute) the source file by a child Python interpreter.
+
+    -Note: The launcher installs the exceptionhook and then executes the source file by its real path,
+    so no copy of the source is written and the tracebacks point at the true file name and lines.
+
+    :param python_interpreter: The Python interpreter that is supposed to interpret the source file.
+    :param source_file: The absolute path of the source file.
+    :param args: Command line arguments.
+    :param pass_fds: The file descriptors that are kept open in the child Python interpreter.
+    :return: None
+    """
+
+    subprocess.run(
+        [python_interpreter, '-c', gen_launcher(), source_file.__str__(), *args],
+        cwd=source_file.parent, pass_fds=pass_fds
+    )
+
+
+def interpret_in_process(source_file: Path, code: CodeType, args: list) -> None:
+    """
+    The task of this function is to interpret (execute) the compiled source file inside the pymg process.
+
+    -Note: The code is executed in a fresh '__main__' module (just like runpy does), with the same
+    sys.argv, __file__ and current directory that the source file gets when it is interpreted by
+    a child process. Instead of the launcher, the exceptionhooks (sys.excepthook, threading.excepthook and the patch
+    of multiprocessing) are installed directly and the state of the pymg process is restored after the execution.
+
+    :param source_file: The absolute path of the source file.
+    :param code: The compiled code of the source file.
+    :param args: Command line arguments.
+    :return: None
+    """
+
+    main_module = ModuleType('__main__')
+    main_module.__dict__.update(
+        __file__=source_file.__str__(), __cached__=None,
+        __loader__=None, __package__=None, __spec__=None
+    )
+
+    saved_state: tuple = (
+        sys.argv, sys.path[0], sys.modules['__main__'], sys.excepthook, threading.excepthook, os.getcwd()
+    )
+
+    sys.argv = [source_file.__str__(), *args]
+    sys.path[0] = source_file.parent.__str__()
+    sys.modules['__main__'] = main_module
+    install_hooks()
+    os.chdir(source_file.parent)
+    start_tracing()
+
+    try:
+        exec(code, main_module.__dict__)
+
+    except SystemExit as exit_:
+        if exit_.code is not None and not isinstance(exit_.code, int):
+            print(exit_.code, file=sys.stderr)
+
+    except BaseException:
+        exc_type, exc_message, traceback_ = sys.exc_info()
+        sys.excepthook(exc_type, exc_message, traceback_.tb_next)
+
+    finally:
+        sys.argv, sys.path[0], sys.modules['__main__'], sys.excepthook, threading.excepthook, cwd = saved_state
+        os.chdir(cwd)
+
+        if HookFinder in sys.meta_path:
+            sys.meta_path.remove(HookFinder)
+
+        if os.environ.get('PYMG_MEMORY') and (tracemalloc := sys.modules.get('tracemalloc')) is not None \
+                and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def gen_origin(thread_name: str|None=None) -> str|None:
+    """
+    The task of this function is to generate the label of an exception that did not occur in the main thread
+    of the main process: the name of the thread and/or the name and pid of the child process (multiprocessing).
+
+    :param thread_name: The name of the thread where the exception occurred (optional).
+    :return: str|None
+    """
+
+    origin: list = [f'thread {thread_name}'] if thread_name is not None else []
+
+    if (process := sys.modules.get('multiprocessing.process')) is not None and process.parent_process() is not None:
+        origin.append(f'process {process.current_process().name} (pid {os.getpid()})')
+
+    return ' of '.join(origin) or None
+
+
+@contextmanager
+def output_lock():
+    """
+    The task of this function is to serialize the output of the exceptionhook, so that the templates of the exceptions
+    that occur at the same time in many threads or processes are displayed one after another and never interleave.
+
+    -Note: The threads of a process are serialized by a lock, and the processes by an exclusive lock (flock) on the
+    OUTPUT_LOCK file of the workspace, which is shared by the child processes. Where flock is not available,
+    only the threads are serialized.
+
+    :return: ContextManager
+    """
+
+    with OUTPUT_THREAD_LOCK:
+        try:
+            lock_file = open(file=OUTPUT_LOCK, mode='a') if OUTPUT_LOCK is not None else None
+        except OSError:
+            lock_file = None
+
+        try:
+            if lock_file is not None and fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+            yield
+
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+
+
+def gen_remote_frames(exc_message: BaseException, sources: SourceCache) -> list[FrameSnapshot]:
+    """
+    The task of this function is to generate the frames of an exception that occurred in a worker process of
+    multiprocessing.Pool or concurrent.futures.ProcessPoolExecutor and was raised again in this process.
+
+    -Note: The pools attach the formatted traceback of the worker as the cause (RemoteTraceback) of the exception,
+    so the frames are parsed from its text (the last traceback of it). They have no local variables and no columns.
+
+    :param exc_message: The message of exception that occurred.
+    :param sources: The source cache of the exception.
+    :return: list[FrameSnapshot]
+    """
+
+    cause: BaseException|None = exc_message.__cause__
+
+    if cause is None or cause.__class__.__name__ not in ('RemoteTraceback', '_RemoteTraceback') \
+            or not isinstance(getattr(cause, 'tb', None), str):
+        return []
+
+    source_file: str = Path(sources.source_info[0]).__str__()
+
+    return [
+        FrameSnapshot(
+            frame={
+                'filename': match['file'], 'lineno': int(match['line']), 'colno': None, 'end_colno': None,
+                'scope': match['scope'], 'inner': match['file'] == source_file,
+                'line': (match['code'] or '').strip(), 'indent': 0, 'locals': {}
+            }
+        )
+        for match in re.finditer(
+            r'^  File "(?P<file>[^"]+)", line (?P<line>\d+), in (?P<scope>.+)\n(?:    (?P<code>.+)\n)?',
+            cause.tb.rsplit('Traceback (most recent call last):', 1)[-1], flags=re.MULTILINE
+        )
+    ]
+
+
+def format_size(size: int) -> str:
+    """
+    The task of this function is to format a size in bytes (B, KiB, MiB or GiB).
+
+    :param size: The size in bytes.
+    :return: str
+    """
+
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+
+    return f'{size:.1f} GiB'
+
+
+def gen_memory_sites(snapshot, source_file: str, top: int) -> list[tuple[int, int, int]]:
+    """
+    The task of this function is to group the traced memory allocations by the line of the source file
+    that made them (the most recent frame of their traceback that belongs to the source file), and to return the
+    top lines with the size and the number of their memory blocks. Allocations that the source file did not make
+    (within the number of traced frames) are left out.
+
+    :param snapshot: The snapshot of tracemalloc (tracemalloc.Snapshot).
+    :param source_file: The path of the main file (source).
+    :param top: The number of lines.
+    :return: list[tuple[int, int, int]] (the line number, the size and the number of blocks)
+    """
+
+    sites: dict = {}
+
+    for statistic in snapshot.statistics('traceback'):
+        for frame in reversed(statistic.traceback):
+            if frame.filename == source_file:
+                size, count = sites.get(frame.lineno, (0, 0))
+                sites[frame.lineno] = (size + statistic.size, count + statistic.count)
+                break
+
+    return sorted(
+        ((lineno, size, count) for lineno, (size, count) in sites.items()), key=lambda site: site[1], reverse=True
+    )[:top]
+
+
+def gen_memory_record(memory: tuple, sources: SourceCache, top: int) -> dict:
+    """
+    The task of this function is to generate the record of the traced memory for the json and ndjson formats
+    (--memory option).
+
+    :param memory: The snapshot of tracemalloc, the current and the peak size of the traced memory and the counts
+                   of the garbage collector (pymg.hook.take_memory).
+    :param sources: The source cache of the exception.
+    :param top: The number of lines of the source file that are recorded.
+    :return: dict
+    """
+
+    snapshot, current, peak, gc_count, gc_collections = memory
+
+    return {
+        'current': current, 'peak': peak, 'gc_count': list(gc_count), 'gc_collections': list(gc_collections),
+        'sites': [
+            {'lineno': lineno, 'size': size, 'count': count}
+            for lineno, size, count in gen_memory_sites(
+                snapshot=snapshot, source_file=sources.source_info[0].__str__(), top=top
+            )
+        ]
+    }
+
+
+def gen_memory(memory: tuple, sources: SourceCache, top: int) -> Panel:
+    """
+    The task of this function is to generate the memory template (--memory option): the current and the peak size
+    of the traced memory, the lines of the source file that allocated the most memory and the counts of the
+    generations of the garbage collector.
+
+    :param memory: The snapshot of tracemalloc, the current and the peak size of the traced memory and the counts
+                   of the garbage collector (pymg.hook.take_memory).
+    :param sources: The source cache of the exception.
+    :param top: The number of lines of the source file that are displayed.
+    :return: Panel
+    """
+
+    snapshot, current, peak, gc_count, gc_collections = memory
+    source_file: str = sources.source_info[0].__str__()
+
+    template: list = [
+        f"[bold yellow]Current ❱[/] [bold default]{format_size(current)}[/]   "
+        f"[bold yellow]Peak ❱[/] [bold default]{format_size(peak)}[/]   "
+        f"[bold yellow]Frames ❱[/] [bold default]{snapshot.traceback_limit}[/]",
+        f"[bold yellow]GC ❱[/] [bold default]{' / '.join(map(str, gc_count))}[/] objects, "
+        f"[bold default]{' / '.join(map(str, gc_collections))}[/] collections (generations 0 / 1 / 2)"
+    ]
+
+    if sites := gen_memory_sites(snapshot=snapshot, source_file=source_file, top=top):
+        width: int = len(str(max(lineno for lineno, _, _ in sites)))
+
+        template.append('')
+        template.extend(
+            Text.from_markup(
+                f"[bold yellow]Line {lineno:>{width}} ❱[/] [bold default]{format_size(size):>10}[/] "
+                f"{count:>8} blocks   {escape(sources.getline(source_file, lineno).strip())}",
+                overflow='ellipsis'
+            )
+            for lineno, size, count in sites
+        )
+
+        for text in template[3:]:
+            text.no_wrap = True
+
+    return Panel(
+        Group(*template),
+        title='Memory',
+        style='magenta',
+        padding=(0, 1, 0, 1),
+        highlight=False
+    )
+
+
+def display_error_message(exc_type: type, exc_message: Exception, traceback_: TracebackType,
+                          origin: str|None=None, memory: tuple|None=None) -> None:
+    """
+    *** This is a customized exceptionhook function. ***
+
+    The task of this function is to pass the exception information to the functions mentioned in the recipe
+    and finally to display the templates that these functions return. With the json and ndjson formats,
+    a record of the exception is exported instead, without generating any templates. Every exception is
+    fingerprinted and recorded in the fingerprint database, and a known exception is displayed in one line
+    (--suppress-known).
+
+    -Note: When the source file is executed, if an exception occurs, the exceptionhook function is called from
+    the sys module. But according to the launcher (or the in-process mode), the exceptionhook function is replaced
+    with this function (display_error_message) and because of this, 'pymg' can receive information about the exception
+    and create messages in its own templates with the help of this replacement.
+
+    :param exc_type: The type of exception that occurred.
+    :param exc_message: The message of exception that occurred.
+    :param traceback_: A traceback that contains full information about the file where the exception occurred.
+    :param origin: The thread and/or child process where the exception occurred, if it is not the main thread of the
+                   main process (optional). It is displayed in the title of the templates.
+    :param memory: The snapshot of tracemalloc, the current and the peak size of the traced memory and the counts of
+                   the garbage collector, if the memory allocations were traced (--memory option). It is displayed
+                   after the templates.
+    :return: None
+    """
+
+    mark(phase='import')
+
+    if os.environ.get('PYMG_FORCE_TERMINAL') == '1':
+        reconfigure(force_terminal=True)
+
+    if (workspace_files := get_workspace_files()) is not None:
+        recipe_file, source_info_file, settings_file = workspace_files
+        sources = SourceCache(source_info_file=source_info_file)
+    else:
+        recipe_file, _, settings_file = get_recent_files()
+        sources = SourceCache(source_info_file=None, source_info=[Path(sys.argv[0]).absolute(), *sys.argv[1:]])
+
+    recipe: list = read_recipe(recipe_file=recipe_file) if recipe_file.exists() else DEFAULT_RECIPE
+    settings: dict = {**DEFAULT_SETTINGS, **get_settings(settings_file=settings_file)}
+
+    mark(phase='recipe')
+
+    frames: list[Frame|FrameSnapshot] = gen_frames(traceback_=traceback_, sources=sources)
+
+    if remote_frames := gen_remote_frames(exc_message=exc_message, sources=sources):
+        frames, origin = frames + remote_frames, origin or 'a worker process'
+
+    fingerprint, location = gen_fingerprint(exc_type=exc_type, frames=frames)
+    occurrence: dict = {
+        'fingerprint': fingerprint, 'type': exc_type.__name__, 'message': exception_message(exc_message=exc_message),
+        'location': location, 'time': time.time()
+    }
+
+    mark(phase='frames')
+
+    locals_repr = LocalsRepr(**{option: settings[option] for option in LOCALS_LIMITS})
+    db_file, spool_file = get_fingerprint_files()
+
+    with output_lock():
+        if settings['format'] != 'panel':
+            export_record(
+                record={
+                    **gen_record(
+                        exc_type=exc_type, exc_message=exc_message, traceback_=traceback_,
+                        sources=sources, locals_repr=locals_repr, frames=frames
+                    ),
+                    'fingerprint': fingerprint,
+                    'origin': origin,
+                    **({'memory': gen_memory_record(memory=memory, sources=sources, top=settings['memory_top'])}
+                       if memory is not None else {})
+                },
+                record_format=settings['format'],
+                target=settings['export']
+            )
+            record_occurrence(occurrence=occurrence, db_file=db_file, spool_file=spool_file)
+            return
+
+        if settings['suppress_known'] and (count := count_occurrences(
+                fingerprint=fingerprint, db_file=db_file, spool_file=spool_file)) >= settings['suppress_known']:
+            cprint(
+                (f"[bold color(172)]{escape(f'[{origin}]')}[/] " if origin else '') +
+                f"[bold yellow]KNOWN ❱[/] [bold red]{escape(exc_type.__name__)}[/][bold default]:[/] "
+                f"{escape(exception_message(exc_message=exc_message))} [default]({escape(location)}, seen {count} times before, "
+                f"fingerprint {fingerprint[:FINGERPRINT_LENGTH]})[/]"
+            )
+
+        else:
+            search: Search|None = Search(
+                exc_type=exc_type, exc_message=exc_message, timeout=settings['search_timeout'],
+                cache_file=get_search_cache(), index_file=get_index_file(), online=settings['search_online']
+            ) if 'search' in recipe else None
+
+            occurrence['report'] = display_templates(
+                recipe=recipe, search=search, title=f'Exception in {escape(origin)}' if origin else 'Exception',
+                memory=memory, exc_type=exc_type, exc_message=exc_message, traceback_=traceback_, frames=frames,
+                sources=sources, locals_repr=locals_repr, settings=settings
+            )
+
+    record_occurrence(occurrence=occurrence, db_file=db_file, spool_file=spool_file)
+
+    if settings['history_size']:
+        save_snapshot(
+            snapshot=gen_snapshot(
+                exc_type=exc_type, exc_message=exc_message, frames=frames, sources=sources,
+                locals_repr=locals_repr, recipe=recipe, fingerprint=fingerprint, origin=origin
+            ),
+            history_dir=get_history_dir(),
+            history_size=settings['history_size']
+        )
+
+    mark(phase='record')
+
+
+class PlainRenderer:
+    """
+    A renderer of the templates for outputs that are not terminals (pipes and files).
+
+    -Note: rich lays out every nested panel by rendering its content into styled segments and then cropping and
+    padding them line by line, once for every level of nesting, even when no colors are written. Without colors,
+    the templates are only boxes of plain text, so this renderer draws the same boxes (rounded panels, paddings
+    and groups) directly as strings. The markup is still rendered by the console (to remove the tags), and the
+    lines that do not fit in their box (or contain tabs) are wrapped by rich itself, so the output is the same.
+    Any other renderable raises a TypeError, and the caller falls back to rich.
+    """
+
+    __slots__ = ('console',)
+
+    def __init__(self, console) -> None:
+        """
+        :param console: The console of rich (rich.console.Console).
+        """
+
+        self.console = console
+
+    def text(self, renderable: str|Text) -> Text:
+        """
+        The task of this method is to turn a string (markup) into a Text, just like the console does.
+
+        :param renderable: The string or Text.
+        :return: Text
+        """
+
+        if isinstance(renderable, Text):
+            return renderable
+
+        if isinstance(renderable, str):
+            return self.console.render_str(renderable, highlight=False)
+
+        raise TypeError(f'{type(renderable).__name__} can not be rendered as plain text')
+
+    def measure(self, renderable: str|Text|Group|Panel, max_width: int) -> int:
+        """
+        The task of this method is to measure the maximum width of a renderable (rich.measure.Measurement.get).
+
+        :param renderable: The renderable.
+        :param max_width: The maximum width.
+        :return: int
+        """
+
+        if isinstance(renderable, Group):
+            return max((self.measure(child, max_width) for child in renderable.renderables), default=0)
+
+        if isinstance(renderable, Panel):
+            top, right, bottom, left = Padding.unpack(renderable.padding)
+            children: list = [renderable.renderable, *([self.title(renderable)] if renderable.title else [])]
+            width: int = max(self.measure(child, max_width - left - right - 2) for child in children) + left + right + 2
+        else:
+            width: int = max(cell_len(line) for line in self.text(renderable).plain.split('\n'))
+
+        return min(width, max_width) if width >= 1 else 0
+
+    @staticmethod
+    def title(panel: Panel) -> Text:
+        """
+        The task of this method is to return the title of a panel (with a space on each side).
+
+        :param panel: The panel.
+        :return: Text
+        """
+
+        title: Text = Text.from_markup(panel.title) if isinstance(panel.title, str) else panel.title.copy()
+
+        return Text(f" {title.plain.replace(chr(10), ' ')} ")
+
+    def render(self, renderable: str|Text|Group|Panel, width: int) -> list[str]:
+        """
+        The task of this method is to render a renderable into lines of exactly width cells.
+
+        :param renderable: The renderable.
+        :param width: The width of the lines.
+        :return: list[str]
+        """
+
+        if isinstance(renderable, Group):
+            return [line for child in renderable.renderables for line in self.render(child, width)]
+
+        if isinstance(renderable, Panel):
+            return self.render_panel(panel=renderable, width=width)
+
+        text: Text = self.text(renderable)
+
+        if text.justify not in (None, 'default', 'left'):
+            raise TypeError('Justified texts can not be rendered as plain text')
+
+        lines: list = text.plain.split('\n')
+
+        if any('\t' in line or cell_len(line) > width for line in lines):
+            return [
+                ''.join(segment.text for segment in line)
+                for line in self.console.render_lines(text, self.console.options.update_width(width), pad=True)
+            ]
+
+        return [line + ' ' * (width - cell_len(line)) for line in lines]
+
+    def render_panel(self, panel: Panel, width: int) -> list[str]:
+        """
+        The task of this method is to render a panel (rich.panel.Panel) into lines of exactly width cells.
+
+        :param panel: The panel.
+        :param width: The width of the lines.
+        :return: list[str]
+        """
+
+        if panel.box is not box.ROUNDED or panel.width or panel.height or panel.subtitle:
+            raise TypeError('Only the default panels can be rendered as plain text')
+
+        top, right, bottom, left = Padding.unpack(panel.padding)
+
+        if panel.expand:
+            child_width: int = width - 2
+        elif left + right and width - 2 - left - right < 1:
+            child_width: int = width - 2
+        else:
+            child_width: int = min(self.measure(panel.renderable, width - 2) + left + right, width - 2)
+
+        title: Text|None = self.title(panel) if panel.title else None
+        if title is not None:
+            child_width = min(width - 2, max(child_width, cell_len(title.plain) + 2))
+
+        blank: str = ' ' * child_width
+        lines: list = [
+            '╭' + '─' * child_width + '╮' if title is None or child_width <= 2
+            else self.render_title(title=title.plain, width=child_width - 2, align=panel.title_align),
+
+            *(f'│{blank}│' for _ in range(top)),
+            *(
+                f"│{' ' * left}{line}{' ' * right}│"
+                for line in self.render(panel.renderable, child_width - left - right)
+            ),
+            *(f'│{blank}│' for _ in range(bottom)),
+
+            '╰' + '─' * child_width + '╯'
+        ]
+
+        return lines if child_width + 2 == width else [line + ' ' * (width - child_width - 2) for line in lines]
+
+    @staticmethod
+    def render_title(title: str, width: int, align: str) -> str:
+        """
+        The task of this method is to render the top border of a panel with its title.
+
+        :param title: The title (with a space on each side).
+        :param width: The width of the title part of the border.
+        :param align: The alignment of the title (left, center or right).
+        :return: str
+        """
+
+        if cell_len(title) > width:
+            raise TypeError('Long titles can not be rendered as plain text')
+
+        excess: int = width - cell_len(title)
+
+        if align == 'left':
+            title = title + '─' * excess
+        elif align == 'center':
+            title = '─' * (excess // 2) + title + '─' * (excess - excess // 2)
+        else:
+            title = '─' * excess + title
+
+        return f'╭─{title}─╮'
+
+
+def write_renderables(*renderables: Panel|str) -> str:
+    """
+    The task of this function is to render the templates into one string and to write it to the output
+    in one call, and to return the text of the templates (without colors) for the report of the exception.
+
+    -Note: If the output is not a terminal, the panels are rendered by PlainRenderer, which is much faster than
+    rich for large traces. Otherwise, rich renders them into a capture of the console, which is sized to the
+    terminal. Either way, nothing is written until all templates are rendered, and then they are written at once.
+
+    :param renderables: The templates (panels and markup strings).
+    :return: str
+    """
+
+    console = get_console()
+    output: str|None = None
+
+    if not console.is_terminal and console.color_system is None and console.encoding.lower().startswith('utf') \
+            and all(isinstance(renderable, Panel) for renderable in renderables):
+        try:
+            renderer = PlainRenderer(console=console)
+            output = ''.join(
+                line + '\n' for renderable in renderables for line in renderer.render(renderable, console.width)
+            )
+        except TypeError:
+            output = None
+
+    if output is None:
+        if console.legacy_windows:
+            recording, console.record = console.record, True
+            for renderable in renderables:
+                console.print(renderable)
+
+            text: str = console.export_text(clear=True)
+            console.record = recording
+
+            return text
+
+        with console.capture() as capture:
+            for renderable in renderables:
+                console.print(renderable)
+
+        output = capture.get()
+
+    console.file.write(output)
+    console.file.flush()
+
+    return ANSI_ESCAPE.sub('', output)
+
+
+def display_templates(recipe: list[str], search: Search|None=None, title: str='Exception', memory: tuple|None=None,
+                      **exc_info: type|Exception|TracebackType|list|dict|SourceCache|LocalsRepr) -> str:
+    """
+    The task of this function is to pass the exception information to the functions mentioned in the recipe
+    and to display the templates that these functions return (and the result of the search, if it is in the recipe).
+    The text of the displayed templates (without colors) is returned as the report of the exception.
+
+    -Note: The templates (and the memory template) are rendered first and then written in one call
+    (write_renderables). The result of the search is written separately when it arrives, so waiting for it
+    never delays the other templates.
+
+    :param recipe: A list containing recipe information in string format.
+    :param search: The Search that was started when the exception arrived (optional).
+    :param title: The title of the templates.
+    :param memory: The snapshot of tracemalloc, the current and the peak size of the traced memory and the counts
+                   of the garbage collector, if the memory allocations were traced (optional).
+    :param exc_info: The information related to the exception and error generated by the Python interpreter,
+                     which divides this information into seven keys: exc_type, exc_message, traceback_, frames,
+                     sources, locals_repr and settings, each of which respectively contains: exception type,
+                     exception message, traceback information, the frame model of the traceback, the source cache
+                     of the exception, the LocalsRepr that displays the local variables within their limits and
+                     the settings of the templates.
+    :return: str
+    """
+
+    funcs: dict = {
+        'type': gen_type, 'message': gen_message,
+        'file': gen_file, 'scope': gen_scope,
+        'line': gen_line, 'code': gen_code,
+        'trace': gen_trace, 'trace_with_locals': gen_trace_with_locals,
+        'inner': gen_inner, 'inner_with_locals': gen_inner_with_locals,
+        'locals': gen_locals,'search': gen_search
+    }
+
+    renderables: list = []
+
+    if template := [
+        list_
+        for func in recipe if func != 'search'
+        for list_ in funcs[func](**exc_info)
+    ]:
+        renderables.append(
+            Panel(
+                Group(*template),
+                title=title,
+                style='red',
+                padding=(0, 1, 0, 1),
+                highlight=False
+            )
+        )
+
+    if memory is not None:
+        renderables.append(gen_memory(memory=memory, sources=exc_info['sources'], top=exc_info['settings']['memory_top']))
+
+    report: str = ''
+
+    if renderables:
+        mark(phase='templates')
+        report += write_renderables(*renderables)
+        mark(phase='print')
+
+    if 'search' in recipe:
+        report += gen_search(search=search, **exc_info)
+
+        mark(phase='search')
+
+    return report
+
+
+def prioritizing_options(options: dict) -> list[str]:
+    """
+    The task of this function is to prioritize between recipes (options).
+    This is done for better formatting of messages so that the user can combine
+    recipes and produce different outputs.
+
+    :param options: The options from the main function are converted into a dictionary
+                    by the click module and are used here after the filter.
+
+    :return: list[str]
+    """
+
+    prioritized_options, draft_options, available_options = [], [], [
+        option for option, value in options.items() if value
+    ]
+
+    for option in available_options:
+        if option == 'trace' and 'locals' in available_options:
+            if gen_trace in prioritized_options:
+                prioritized_options.remove(option)
+
+            prioritized_options.append('trace_with_locals')
+
+        elif option == 'inner' and 'locals' in available_options:
+            if gen_inner in prioritized_options:
+                prioritized_options.remove(option)
+
+            prioritized_options.append('inner_with_locals')
+
+        elif option == 'trace':
+            if gen_trace_with_locals not in prioritized_options:
+                prioritized_options.append(option)
+
+        elif option == 'inner':
+            if gen_inner_with_locals not in prioritized_options:
+                prioritized_options.append(option)
+
+        elif option != 'search':
+            draft_options.append(option)
+
+    if not prioritized_options:
+        prioritized_options.extend(draft_options)
+
+    if 'search' in available_options:
+        prioritized_options.append('search')
+
+    return prioritized_options
+
+
+def interpret_source(source_path: Path, code: CodeType, args: list, recipe: list[str], in_process: bool,
+                     settings: dict, output_file: Path|None=None, output_options: dict|None=None) -> None:
+    """
+    The task of this function is to prepare a new workspace for one run of pymg,
+    interpret (execute) the source file in it and finally remove the workspace.
+
+    :param source_path: The absolute path of the source file.
+    :param code: The compiled code of the source file.
+    :param args: Command line arguments.
+    :param recipe: A list containing recipe information in string format.
+    :param in_process: Interpret the source file inside the pymg process instead of a child Python interpreter.
+    :param settings: The settings of the templates, such as the limits for displaying the local variables.
+    :param output_file: The path of the text file where the output is to be written (optional).
+    :param output_options: The append, max_bytes and backups options of the text file (optional).
+    :return: None
+    """
+
+    output_options = output_options or {}
+    pass_fds: tuple = (int(settings['export'][3:]),) if settings.get('export', '').startswith('fd:') else ()
+
+    workspace: Path = mk_workspace()
+
+    if settings.get('memory'):
+        os.environ['PYMG_MEMORY'] = str(settings['memory_frames'])
+
+    recipe_file, source_info_file, settings_file = get_workspace_files()
+
+    try:
+        write_recipe(recipe_file=recipe_file, recipe_data=recipe)
+        write_source_info(source_info_file=source_info_file, source_info=(source_path, *args))
+        write_settings(settings_file=settings_file, settings=settings)
+
+        mark(phase='workspace')
+
+        if in_process:
+            if output_file is not None:
+                get_output_in_process(
+                    source_file=source_path, code=code, args=args, output_file=output_file, **output_options
+                )
+            else:
+                interpret_in_process(source_file=source_path, code=code, args=args)
+
+        else:
+            if output_file is not None:
+                get_output(
+                    python_interpreter=sys.executable,
+                    source_file=source_path,
+                    args=args,
+                    output_file=output_file,
+                    pass_fds=pass_fds,
+                    **output_options
+                )
+            else:
+                interpret(
+                    python_interpreter=sys.executable,
+                    source_file=source_path,
+                    args=args,
+                    pass_fds=pass_fds
+                )
+
+    finally:
+        os.environ.pop('PYMG_MEMORY', None)
+        rm_workspace(workspace=workspace)
+
+
+def recent_interpretation(args: list, source_info_file: Path, recipe_file: Path,
+                          settings_file: Path, in_process: bool=False) -> None:
+    """
+    The task of this function is to interpret (execute) the last-recent registered operation.
+
+    :param args: Command Line arguments.
+    :param recipe_file: The path of the recipe file where the recipe information of the last operation is stored.
+    :param source_info_file: The path of the file that contains the information of the last main file (source).
+    :param settings_file: The path of the file that contains the settings of the templates of the last operation.
+    :param in_process: Interpret the source file inside the pymg process instead of a child Python interpreter.
+    :return: None
     """
 
-    extracted_tb: list[traceback.FrameSummary] = traceback.extract_tb(exc_info.get('traceback_'))
+    if recipe_file.exists() and source_info_file.exists():
+
+        source_info: list = get_source_info(source_info_file=source_info_file)
+
+        if source_info and Path(source_info[0]).exists():
+            source_path: Path = Path(source_info[0])
+
+            response, content = check_syntax(source_file=source_path)
+
+            if response:
+                interpret_source(
+                    source_path=source_path,
+                    code=content,
+                    args=args,
+                    recipe=read_recipe(recipe_file=recipe_file),
+                    in_process=in_process,
+                    settings=get_settings(settings_file=settings_file)
+                )
+            else:
+                display_syntax_error(source_file=source_path, syntax_err=content)
+        else:
+            cprint("[bold red]Error:[/] The available information is corrupted.")
+    else:
+        cprint("[bold red]Error:[/] No information on the last operation is available.")
+
+
+class FileWatcher:
+    """
+    A watcher of the source file (or of all Python files in its project directory) for the --watch option.
+
+    -Note: On Linux, the directories are watched with inotify (through ctypes, without any extra dependency),
+    so a change is noticed as soon as it is saved. The directories are watched instead of the files, so the editors
+    that save by replacing the file are supported too. Elsewhere, the modification times of the files are polled.
+    """
+
+    __slots__ = ('source_file', 'project', '_fd', '_libc', '_watches', '_mtimes')
+
+    # The inotify events of a file that is written, created, deleted or moved (and IN_CLOEXEC of inotify_init1).
+    IN_EVENTS: int = 0x00000008 | 0x00000080 | 0x00000100 | 0x00000200 | 0x00000040
+    IN_CLOEXEC: int = 0o2000000
+
+    def __init__(self, source_file: Path, project: bool=False) -> None:
+        """
+        :param source_file: The path of the source file.
+        :param project: Watch all Python files in the directory of the source file (recursively).
+        """
+
+        self.source_file, self.project = source_file, project
+        self._fd: int = -1
+        self._libc = None
+        self._watches: dict = {}
+        self._mtimes: dict = {}
+
+        if sys.platform.startswith('linux') and (library := ctypes.util.find_library('c')):
+            self._libc = ctypes.CDLL(library, use_errno=True)
+            self._fd = self._libc.inotify_init1(self.IN_CLOEXEC)
+
+        if self._fd >= 0:
+            for directory in self._directories():
+                self._watches[self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.IN_EVENTS)] = directory
+        else:
+            self._mtimes = self._snapshot()
+
+    def _directories(self) -> list[Path]:
+        """
+        The task of this method is to return the directories that are watched
+        (hidden directories, __pycache__ and virtual environments are skipped).
+
+        :return: list[Path]
+        """
+
+        if not self.project:
+            return [self.source_file.parent]
+
+        directories: list = []
+        for directory, subdirectories, _ in os.walk(self.source_file.parent):
+            subdirectories[:] = [
+                name for name in subdirectories
+                if not name.startswith('.') and name != '__pycache__'
+                and not Path(directory, name, 'pyvenv.cfg').exists()
+            ]
+            directories.append(Path(directory))
+
+        return directories
+
+    def _is_watched(self, file_path: Path) -> bool:
+        """
+        The task of this method is to check whether a changed file is watched.
+
+        :param file_path: The path of the changed file.
+        :return: bool
+        """
+
+        return file_path == self.source_file or (self.project and file_path.suffix == '.py')
+
+    def _snapshot(self) -> dict:
+        """
+        The task of this method is to take the modification times and sizes of the watched files (for polling).
+
+        :return: dict
+        """
+
+        snapshot: dict = {}
+        for directory in self._directories():
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and self._is_watched(Path(entry.path)):
+                        status = entry.stat()
+                        snapshot[entry.path] = (status.st_mtime_ns, status.st_size)
+
+        return snapshot
+
+    def _read_events(self, timeout: float|None) -> list[Path]:
+        """
+        The task of this method is to wait for the inotify events (until the timeout)
+        and to return the watched files that were changed.
+
+        :param timeout: The time limit (seconds) of waiting, or None to wait forever.
+        :return: list[Path]
+        """
+
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return []
+
+        try:
+            buffer: bytes = os.read(self._fd, 65536)
+        except InterruptedError:
+            return []
+
+        changed, offset = [], 0
+        while offset < len(buffer):
+            watch_descriptor, _, _, length = struct.unpack_from('iIII', buffer, offset)
+            name: bytes = buffer[offset + 16:offset + 16 + length].rstrip(b'\0')
+            offset += 16 + length
+
+            if watch_descriptor in self._watches and name:
+                changed.append(Path(self._watches[watch_descriptor], os.fsdecode(name)))
+
+        return [file_path for file_path in changed if self._is_watched(file_path)]
+
+    def wait(self) -> list[Path]:
+        """
+        The task of this method is to wait until the watched files are changed and no other change
+        happens for WATCH_DEBOUNCE seconds (so saving one file several times reruns the source file once).
+
+        :return: list[Path]
+        """
+
+        changed: list = []
+
+        while not changed:
+            if self._fd >= 0:
+                changed = self._read_events(timeout=None)
+            else:
+                time.sleep(WATCH_POLL_INTERVAL)
+                snapshot: dict = self._snapshot()
+                changed = [Path(file) for file in snapshot.keys() ^ self._mtimes.keys()] + [
+                    Path(file) for file in snapshot.keys() & self._mtimes.keys() if snapshot[file] != self._mtimes[file]
+                ]
+                self._mtimes = snapshot
+
+        while self._fd >= 0 and (events := self._read_events(timeout=WATCH_DEBOUNCE)):
+            changed.extend(events)
+
+        return list(dict.fromkeys(changed))
+
+    def close(self) -> None:
+        """
+        The task of this method is to stop watching.
+
+        :return: None
+        """
+
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def warm_renderer() -> None:
+    """
+    The task of this function is to import and initialize everything that is needed for rendering
+    the templates (the lexer and the theme of the code, the panels, ...) before the first exception occurs,
+    so the pre-forked interpreters of the --watch option render the exception without importing anything.
+
+    :return: None
+    """
+
+    with redirect_stdout(StringIO()):
+        cprint(
+            Panel(
+                Group(
+                    Syntax(
+                        code='pass', lexer='python', line_numbers=True, start_line=1, highlight_lines={1},
+                        background_color='default', theme='gruvbox-dark'
+                    )
+                ),
+                title='warm'
+            )
+        )
+
 
-    template, locals_, counter = [], {}, 0
+def prefork_interpreter(run) -> tuple[int, int]:
+    """
+    The task of this function is to fork an interpreter that waits until it is told to run.
 
-    while exc_info['traceback_']:
-        locals_[exc_info['traceback_'].tb_frame.f_code.co_name] = {
-            var: value for var, value in exc_info['traceback_'].tb_frame.f_locals.items()
-            if not var.startswith('__') and not var.endswith('__') and \
-               var not in ['display_error_message'] and not isinstance(value, ModuleType)
-        }
+    -Note: The forked interpreter has already imported the exceptionhook and the renderer, so it only has to
+    interpret the source file. It runs once (when b'1' is written to the returned file descriptor) and exits,
+    so the modules that the source file imports are always imported again from their current version.
 
-        if extracted_tb[counter].filename == MIRROR_FILE.__str__():
-            local = Group(
-                Panel(
-                    Group(
-                        '\n'.join([f"[bold color(125)]{var}[/] = [italic default]{value}[/]"
-                        for var, value in locals_[extracted_tb[counter].name].items()]),
-                    )
+    :param run: The function that the forked interpreter runs.
+    :return: tuple[int, int]
+    """
 
-                , title=f'[bold]{extracted_tb[counter].name} locals[/]', title_align='left',
-                padding=(1, 1, 0, 1), style='color(172)')
-            )
+    read_fd, write_fd = os.pipe()
+    pid: int = os.fork()
 
-            template.extend(['', local])
+    if pid == 0:
+        os.close(write_fd)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
 
-        counter += 1
+        exit_code: int = 0
+        if os.read(read_fd, 1) == b'1':
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            try:
+                run()
+            except BaseException:
+                exit_code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
 
-        exc_info['traceback_'] = exc_info['traceback_'].tb_next
+        os._exit(exit_code)
 
-    return template
+    os.close(read_fd)
 
+    return pid, write_fd
 
-def gen_search(**exc_info: type|Exception|TracebackType) -> None:
+
+def watch_source(source_path: Path, args: list, recipe: list[str], settings: dict, project: bool=False,
+                 in_process: bool=True, output_file: Path|None=None, output_options: dict|None=None) -> None:
     """
-    The task of this function is to find and search for a solution in stackoverflow for the exception that occurred with the
-    help of this site's APIs. Finally, the title and link of the related posts that received the answer will be displayed.
+    The task of this function is to interpret (execute) the source file and then interpret it again
+    whenever it (or, with the project option, any Python file of its directory) is changed.
 
-    :param exc_info: The information related to the exception and error generated by the Python interpreter,
-                     which divides this information into three keys: exc_type, exc_message, and traceback_,
-                     each of which respectively contains: exception type, exception message, and traceback information.
+    -Note: Where os.fork is available, every run happens in an interpreter that was forked before the change
+    (with the exceptionhook and the renderer already imported and initialized), so the time from saving the file to
+    the rendered exception is only the time of interpreting the source file. Elsewhere, the source file is
+    interpreted inside the pymg process.
+
+    :param source_path: The absolute path of the source file.
+    :param args: Command line arguments.
+    :param recipe: A list containing recipe information in string format.
+    :param settings: The settings of the templates.
+    :param project: Watch all Python files in the directory of the source file (recursively).
+    :param in_process: Interpret the source file inside the (forked) pymg process instead of a child Python
+                       interpreter.
+    :param output_file: The text file where the output of every run is written, as with interpret_source (optional).
+    :param output_options: The append, backups and max_bytes options of the text file (optional).
     :return: None
     """
 
+    def run() -> None:
+        response, content = check_syntax(source_file=source_path)
+
+        if response:
+            interpret_source(
+                source_path=source_path, code=content, args=args, recipe=recipe, in_process=in_process,
+                settings=settings, output_file=output_file, output_options=output_options
+            )
+        else:
+            display_syntax_error(source_file=source_path, syntax_err=content)
+
+    warm_renderer()
+    watcher = FileWatcher(source_file=source_path, project=project)
+    forked: tuple|None = prefork_interpreter(run=run) if hasattr(os, 'fork') else None
+
     try:
-        response = requests.get(
-            'https://api.stackexchange.com/' +
-            f'/2.3/search?order=desc&sort=activity&tagged=python&intitle={exc_info["exc_message"]}&site=stackoverflow')
+        while True:
+            if forked is None:
+                run()
+            else:
+                pid, write_fd = forked
+                forked = (pid, None)
 
-    except requests.RequestException:
-        cprint("[bold red]Error:[/] [default]No internet connection![/]")
+                os.write(write_fd, b'1')
+                os.close(write_fd)
+                os.waitpid(pid, 0)
 
-    else:
-        posts: dict = {
-            item.get('title'): item.get('link')
-            for item in response.json().get('items')
-            if item.get('is_answered')
-        }
+                forked = prefork_interpreter(run=run)
 
-        search_box = Panel(
-            Group(
-                '\n'.join(
-                    [
-                        f'[bold]{title}[/]\n[underline color(33)]{link}[/]\n'
-                        for title, link in posts.items()
-                    ]
+            cprint(f'\n[bold color(33)]Watching {"the project of " if project else ""}{source_path}'
+                   f' for changes... (Ctrl+C to stop)[/]')
+
+            changed: list = watcher.wait()
+            cprint(
+                Rule(
+                    f"[bold]{datetime.datetime.now().strftime('%H:%M:%S')} "
+                    f"{', '.join(file.name for file in changed)} changed[/]",
+                    style='color(33)'
                 )
-            ),
-            title='[bold]Search Result[/]',
-            title_align='center',
-            padding=(1, 1, 0, 1),
-            style='color(29)',
-        )
+            )
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        watcher.close()
+
+        if forked is not None:
+            pid, write_fd = forked
 
-        cprint(search_box)
+            if write_fd is not None:
+                os.close(write_fd)
 
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
 
-def get_output(python_interpreter: str, mirror_file: Path, args: list, output_file: Path) -> None:
+
+def serve_worker(listener: socket.socket) -> None:
     """
-    The task of this function is to write the output generated by pymg in a text file.
+    The task of this function is to serve one request of the pymg server (in a forked worker) and then exit.
 
-    :param python_interpreter: The Python interpreter that is supposed to interpret the mirror file.
-    :param mirror_file: The path of the mirror file to be interpreted.
-    :param args: Command line arguments.
-    :param output_file: The path of the text file where the output is to be written.
+    -Note: The worker accepts a connection, reads the request (the command line of pymg, the current directory,
+    the environment variables, sys.path and the terminal of the client), takes over them and runs the command line
+    with the main function of pymg. If the client runs another interpreter (sys.executable or sys.prefix, such as
+    another virtual environment), the worker only tells the client to run the command line itself (FRAME_LOCAL). Its stdout and stderr (file descriptors 1 and 2) are pipes that are streamed to the
+    client in frames (see pymg.client), and the exit code is sent as the last frame. Because the worker exits after
+    one run, no state can leak between the runs.
+
+    :param listener: The listening Unix socket of the server.
     :return: None
     """
 
-    if output_file.__str__().endswith('.txt') and not output_file.is_dir():
-        if not output_file.exists():
+    connection, _ = listener.accept()
+    listener.close()
 
-            with open(output_file, "w+") as output_file_:
-                subprocess.call(
-                    [
-                        python_interpreter, mirror_file.__str__(), *args
+    with connection, connection.makefile('rb') as request_file:
+        request: dict = json.loads(request_file.readline())
 
-                    ], stdout=output_file_
-                )
-        else:
-            cprint("[bold red]Error:[/] Writing output to text file was not successful!")
-            cprint("A file with this name already exists in this path!")
-    else:
-        cprint("[bold red]Error:[/] Writing output to text file was not successful!")
-        cprint("The selected path must be the path of a file with a .txt suffix.")
+        if (request.get('executable', sys.executable), request.get('prefix', sys.prefix)) != (sys.executable, sys.prefix):
+            connection.sendall(FRAME_HEADER.pack(FRAME_LOCAL, 0))
+            return
+
+        lock, pumps = threading.Lock(), []
+
+        def pump(read_fd: int, channel: int) -> None:
+            while chunk := os.read(read_fd, 65536):
+                with lock:
+                    connection.sendall(FRAME_HEADER.pack(channel, len(chunk)) + chunk)
+
+        for channel in (1, 2):
+            read_fd, write_fd = os.pipe()
+            os.dup2(write_fd, channel)
+            os.close(write_fd)
+
+            pumps.append(threading.Thread(target=pump, args=(read_fd, channel), daemon=True))
+            pumps[-1].start()
+
+        null_fd: int = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(null_fd, 0)
+        os.close(null_fd)
+
+        sys.stdin = open(0, 'r', closefd=False)
+        sys.stdout = open(1, 'w', encoding='utf-8', buffering=1, closefd=False)
+        sys.stderr = open(2, 'w', encoding='utf-8', buffering=1, closefd=False)
+
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        os.environ['COLUMNS'] = request['columns'].__str__()
+        os.environ.pop('PYMG_WORKSPACE', None)
+        sys.path[:] = request.get('path', sys.path)
+        if request['isatty']:
+            os.environ['PYMG_FORCE_TERMINAL'] = '1'
+
+        reconfigure(force_terminal=request['isatty'], width=request['columns'])
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        try:
+            main.main(args=request['argv'], prog_name='pymg', standalone_mode=False)
+            exit_code: int = 0
+        except click.ClickException as error:
+            error.show()
+            exit_code: int = error.exit_code
+        except SystemExit as exit_:
+            exit_code: int = exit_.code if isinstance(exit_.code, int) else int(exit_.code is not None)
+        except BaseException:
+            exit_code: int = 1
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        null_fd: int = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(null_fd, 1)
+        os.dup2(null_fd, 2)
+        os.close(null_fd)
 
+        for pump_ in pumps:
+            pump_.join()
 
-def interpret(python_interpreter: str, mirror_file: Path, args: list) -> None:
+        data: bytes = exit_code.__str__().encode()
+        connection.sendall(FRAME_HEADER.pack(0, len(data)) + data)
+
+
+def fork_worker(listener: socket.socket, pool: set) -> None:
     """
-    The task of this function is to interpret (execute) the mirror file.
+    The task of this function is to fork a worker of the pymg server that waits for one request,
+    and to add its pid to the pool.
 
-    :param python_interpreter: The Python interpreter that is supposed to interpret the mirror file.
-    :param mirror_file: The path of the mirror file to be interpreted.
-    :param args: Command line arguments.
+    -Note: SIGINT and SIGTERM are blocked while forking, until the worker has set their actions and the pid is in the
+    pool. Otherwise a signal of the stopping server that arrived in between would be lost in the worker (which would
+    wait for a request forever) or would stop the server before the worker could be stopped with it.
+
+    :param listener: The listening Unix socket of the server.
+    :param pool: The pids of the workers.
     :return: None
     """
 
-    subprocess.run([python_interpreter, mirror_file.__str__(), *args])
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGINT, signal.SIGTERM})
 
+    try:
+        pid: int = os.fork()
 
-def display_error_message(exc_type: type, exc_message: Exception, traceback_: TracebackType) -> None:
-    """
-    *** This is a customized exceptionhook function. ***
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGINT, signal.SIGTERM})
 
-    The task of this function is to pass the exception information to the functions mentioned in the recipe
-    and finally to display the templates that these functions return.
+            exit_code: int = 0
+            try:
+                serve_worker(listener=listener)
+            except BaseException:
+                exit_code = 1
 
-    -Note: When the mirror file is executed, if an exception occurs, the exceptionhook function is called from
-    the sys module. But according to the header that the mirror file has, the exceptionhook function is replaced
-    with this function (display_error_message) and because of this, 'pymg' can receive information about the exception
-    and create messages in its own templates with the help of this replacement.
+            os._exit(exit_code)
 
-    :param exc_type: The type of exception that occurred.
-    :param exc_message: The message of exception that occurred.
-    :param traceback_: A traceback that contains full information about the file where the exception occurred.
+        pool.add(pid)
+
+    finally:
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGINT, signal.SIGTERM})
+
+
+def serve(socket_path: Path, workers: int) -> None:
+    """
+    The task of this function is to run the pymg server: a local daemon that keeps a pool of pre-imported
+    workers, which run the command lines that the clients (pymg-client) send over a Unix socket.
+
+    -Note: The server imports and initializes the renderer once and then forks the workers, so a worker only has
+    to interpret the source file. Each worker serves one request and exits, and the server immediately forks a new
+    one in its place, so the pool always has the same number of fresh workers waiting.
+
+    :param socket_path: The path of the Unix socket.
+    :param workers: The number of workers.
     :return: None
     """
 
-    recipe: list = read_recipe(recipe_file=RECIPE_FILE)
+    if not hasattr(os, 'fork') or not hasattr(socket, 'AF_UNIX'):
+        cprint("[bold red]Error:[/] The pymg server is not supported on this platform.")
+        return
 
-    funcs: dict = {
-        'type': gen_type, 'message': gen_message,
-        'file': gen_file, 'scope': gen_scope,
-        'line': gen_line, 'code': gen_code,
-        'trace': gen_trace, 'trace_with_locals': gen_trace_with_locals,
-        'inner': gen_inner, 'inner_with_locals': gen_inner_with_locals,
-        'locals': gen_locals,'search': gen_search
-    }
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
 
-    search_status: bool = False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        if probe.connect_ex(socket_path.__str__()) == 0:
+            cprint(f"[bold red]Error:[/] A pymg server is already running on {socket_path}.")
+            return
 
-    if 'search' in recipe:
-        search_status = True
-        recipe.remove('search')
+    socket_path.unlink(missing_ok=True)
 
-    if template := [
-        list_
-        for func in recipe
-        for list_ in funcs[func](
-            exc_type=exc_type, exc_message=exc_message, traceback_=traceback_
-        )
-    ]:
-        cprint(
-            Panel(
-                Group(*template),
-                title='Exception',
-                style='red',
-                padding=(0, 1, 0, 1),
-                highlight=False
-            )
-        )
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path.__str__())
+    os.chmod(socket_path, 0o600)
+    listener.listen(128)
 
-    if search_status:
-        gen_search(
-            exc_type=exc_type,
-            exc_message=exc_message,
-            traceback_=traceback_
-        )
+    warm_renderer()
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
 
+    pool: set = set()
 
-def prioritizing_options(options: dict) -> list[str]:
+    try:
+        for _ in range(workers):
+            fork_worker(listener=listener, pool=pool)
+
+        cprint(f'[bold color(33)]pymg server is listening on {socket_path} with {workers} workers (Ctrl+C to stop)[/]')
+
+        while True:
+            pid, _ = os.wait()
+            if pid in pool:
+                pool.discard(pid)
+                fork_worker(listener=listener, pool=pool)
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        for pid in pool:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+
+        listener.close()
+        socket_path.unlink(missing_ok=True)
+
+
+def find_scripts(pattern: str) -> list[Path]:
     """
-    The task of this function is to prioritize between recipes (options).
-    This is done for better formatting of messages so that the user can combine
-    recipes and produce different outputs.
+    The task of this function is to find the Python files of the --batch option.
 
-    :param options: The options from the main function are converted into a dictionary
-                    by the click module and are used here after the filter.
+    :param pattern: A directory (all Python files in it, recursively) or a glob pattern (** is supported).
+    :return: list[Path]
+    """
 
-    :return: list[str]
+    if Path(pattern).is_dir():
+        return sorted(Path(pattern).absolute().rglob('*.py'))
+
+    return sorted(
+        Path(file).absolute() for file in glob.glob(pattern, recursive=True)
+        if file.endswith('.py') and Path(file).is_file()
+    )
+
+
+def run_script(source_path: Path, timeout: float, settings: dict) -> dict:
     """
+    The task of this function is to interpret (execute) one Python file of the --batch option in its own child
+    Python interpreter and workspace, and to return the result of it.
 
-    prioritized_options, draft_options, available_options = [], [], [
-        option for option, value in options.items() if value
-    ]
+    -Note: The exceptionhook of the child exports the record of the exception (--format json) into the workspace,
+    and the type, message, file and line of the exception are taken from the record.
 
-    for option in available_options:
-        if option == 'trace' and 'locals' in available_options:
-            if gen_trace in prioritized_options:
-                prioritized_options.remove(option)
+    :param source_path: The absolute path of the Python file.
+    :param timeout: The time limit (seconds) of the Python file.
+    :param settings: The settings of the templates.
+    :return: dict
+    """
 
-            prioritized_options.append('trace_with_locals')
+    result: dict = {'file': source_path, 'status': 'passed', 'type': None, 'message': None, 'line': None}
+    start: float = time.perf_counter()
 
-        elif option == 'inner' and 'locals' in available_options:
-            if gen_inner in prioritized_options:
-                prioritized_options.remove(option)
+    try:
+        response, content = check_syntax(source_file=source_path)
+    except OSError as error:
+        response, content = False, error
 
-            prioritized_options.append('inner_with_locals')
+    if isinstance(content, OSError):
+        result.update(status='failed', type=content.__class__.__name__, message=content.strerror or content.__str__())
 
-        elif option == 'trace':
-            if gen_trace_with_locals not in prioritized_options:
-                prioritized_options.append(option)
+    elif not response:
+        result.update(status='failed', type=content.__class__.__name__, message=content.msg, line=content.lineno)
 
-        elif option == 'inner':
-            if gen_inner_with_locals not in prioritized_options:
-                prioritized_options.append(option)
+    else:
+        workspace: Path = Path(tempfile.mkdtemp(prefix='pymg-'))
+        record_file: Path = Path(workspace, 'record.json')
+
+        try:
+            write_recipe(recipe_file=Path(workspace, 'recipe.pymgrcp'), recipe_data=['type'])
+            write_source_info(source_info_file=Path(workspace, 'sourceinfo.pymgsinfo'), source_info=(source_path,))
+            write_settings(
+                settings_file=Path(workspace, 'settings.pymgstg'),
+                settings={**settings, 'format': 'json', 'export': record_file.__str__()}
+            )
 
-        elif option != 'search':
-            draft_options.append(option)
+            try:
+                process = subprocess.run(
+                    [sys.executable, '-c', gen_launcher(), source_path.__str__()],
+                    cwd=source_path.parent, env={**os.environ, 'PYMG_WORKSPACE': workspace.__str__()},
+                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=timeout
+                )
+            except subprocess.TimeoutExpired:
+                result.update(status='timeout', type='Timeout', message=f'The file took longer than {timeout}s.')
 
-    if not prioritized_options:
-        prioritized_options.extend(draft_options)
+            else:
+                if record_file.exists():
+                    record: dict = json.loads(record_file.read_text(encoding='utf-8'))
+                    frame: dict = next(
+                        (frame for frame in reversed(record['frames']) if frame['inner']), (record['frames'] or [{}])[-1]
+                    )
+                    result.update(
+                        status='failed', type=record['type'], message=record['message'],
+                        file=Path(frame.get('file', source_path)), line=frame.get('line')
+                    )
 
-    if 'search' in available_options:
-        prioritized_options.append('search')
+                elif process.returncode != 0:
+                    result.update(
+                        status='failed', type='SystemExit',
+                        message=(process.stderr.decode(errors='replace').strip().splitlines() or
+                                 [f'exit code {process.returncode}'])[-1]
+                    )
 
-    return prioritized_options
+        finally:
+            rm_workspace(workspace=workspace)
 
+    result['duration'] = time.perf_counter() - start
 
-def recent_interpretation(python_interpreter: str, mirror_file: Path, args: list,
-                          source_info_file: Path, recipe_file: Path) -> None:
+    return result
+
+
+def display_batch_summary(results: list[dict], duration: float) -> None:
     """
-    The task of this function is to interpret (execute) the last-recent registered operation.
+    The task of this function is to display the summary of the --batch option: the number of passed and failed
+    Python files, and the failures grouped by the type of their exception (file, line and message of each one).
 
-    :param python_interpreter: The Python interpreter that is supposed to interpret the mirror file.
-    :param mirror_file: The path of the mirror file to be interpreted.
-    :param args: Command Line arguments.
-    :param recipe_file: The path of the recipe file where the recipe information is stored.
-    :param source_info_file: The path of the file that contains the information of the main file (source).
+    :param results: The results of the Python files.
+    :param duration: The time (seconds) of the whole batch.
     :return: None
     """
 
-    if mirror_file.exists() and recipe_file.exists() and source_info_file.exists():
+    failures: dict = {}
+    for result in results:
+        if result['status'] != 'passed':
+            failures.setdefault(result['type'], []).append(result)
+
+    passed: int = sum(result['status'] == 'passed' for result in results)
+    timeouts: int = sum(result['status'] == 'timeout' for result in results)
+
+    template: list = [
+        f"[bold yellow]Files ❱[/] [bold default]{len(results)}[/]   "
+        f"[bold green]Passed ❱[/] [bold default]{passed}[/]   "
+        f"[bold red]Failed ❱[/] [bold default]{len(results) - passed}[/]"
+        + (f" [default](timed out: {timeouts})[/]" if timeouts else '')
+        + f"   [bold yellow]Time ❱[/] [bold default]{duration:.2f}s[/]"
+    ]
+
+    for exc_type, group in sorted(failures.items(), key=lambda item: -len(item[1])):
+        template.extend(
+            [
+                '',
+
+                Panel(
+                    '\n'.join(
+                        f"[bold default]{escape(result['file'].__str__())}[/]"
+                        + (f"[bold color(172)]:{result['line']}[/]" if result['line'] else '')
+                        + f" [bold yellow]❱[/] {escape(result['message'].__str__())}"
+                        for result in group
+                    ),
+                    title=f"[bold]{escape(exc_type)} ({len(group)})[/]", title_align='left',
+                    padding=(0, 1, 0, 1), style='red'
+                )
+            ]
+        )
+
+    cprint(
+        Panel(
+            Group(*template),
+            title='Batch', style='green' if not failures else 'red',
+            padding=(0, 1, 0, 1), highlight=False
+        )
+    )
+
+
+def run_batch(pattern: str, jobs: int, timeout: float, settings: dict) -> int:
+    """
+    The task of this function is to interpret (execute) many Python files concurrently (--batch option),
+    each one in its own child Python interpreter and workspace, and to display the summary of them.
+
+    :param pattern: A directory or a glob pattern of the Python files.
+    :param jobs: The number of Python files that are interpreted at the same time.
+    :param timeout: The time limit (seconds) of each Python file.
+    :param settings: The settings of the templates.
+    :return: int
+    """
+
+    if not (scripts := find_scripts(pattern=pattern)):
+        cprint("[bold red]Error:[/] No Python files were found!")
+        return 2
+
+    results, start = [], time.perf_counter()
 
-        source: list = get_source_info(source_info_file=source_info_file)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures: list = [
+            executor.submit(run_script, source_path=script, timeout=timeout, settings=settings) for script in scripts
+        ]
+
+        for future in as_completed(futures):
+            result: dict = future.result()
+            results.append(result)
 
-        if source and Path(source[0]).exists():
-            interpret(
-                python_interpreter=python_interpreter,
-                mirror_file=mirror_file,
-                args=args
+            cprint(
+                f"{'[bold green]PASSED[/] ' if result['status'] == 'passed' else '[bold red]FAILED[/] '}"
+                f"{escape(result['file'].__str__())} [default]({result['duration']:.2f}s)[/]"
             )
-        else:
-            cprint("[bold red]Error:[/] The available information is corrupted.")
-    else:
-        cprint("[bold red]Error:[/] No information on the last operation is available.")
+
+    results.sort(key=lambda result: result['file'])
+    display_batch_summary(results=results, duration=time.perf_counter() - start)
+
+    return 0 if all(result['status'] == 'passed' for result in results) else 1
 
 
-def gen_mirror_header(source_path: Path) -> list[str]:
+def start_timings(timings_format: str) -> Path:
     """
-    The task of this function is to generate a header for the
-    mirror file and return it in the form of a list.
+    The task of this function is to start recording the phases of pymg (--timings option) and to display
+    them when pymg exits.
 
-    :param source_path: The path of the source file.
-    :return: list[str]
+    -Note: The path of the timings file is passed to the exceptionhook and the child interpreter through the
+    PYMG_TIMINGS environment variable. The first phase (importing pymg) is recorded from the time when pymg.hook
+    was imported, which is the first module of pymg that the Python interpreter imports.
+
+    :param timings_format: The format of the timings (table or json).
+    :return: Path
+    """
+
+    fd, timings_file = tempfile.mkstemp(prefix='pymg-', suffix='.pymgtime')
+    os.close(fd)
+
+    os.environ['PYMG_TIMINGS'] = timings_file
+
+    mark(phase='start', timestamp=STARTED)
+    mark(phase='imports')
+
+    atexit.register(display_timings, timings_file=Path(timings_file), timings_format=timings_format)
+
+    return Path(timings_file)
+
+
+def read_timings(timings_file: Path) -> list[dict]:
+    """
+    The task of this function is to read the timings file and to return the phases in the order in which they ended,
+    with the process and the duration of each one.
+
+    :param timings_file: The path of the timings file.
+    :return: list[dict]
     """
 
-    header: list = [
-        'import sys, os\n',
-        'from pymg import display_error_message\n',
-        'sys.excepthook = display_error_message\n',
-        f'__file__ = "{source_path}"\n',
-        f'os.chdir("{source_path.parent}")\n',
+    marks: list = []
+    with open(file=timings_file, mode='r', encoding='utf-8') as timings_file_:
+        for line in timings_file_:
+            if len(fields := line.split('\t')) == 3 and fields[2].strip().isdigit():
+                marks.append((int(fields[2]), int(fields[0]), fields[1]))
+
+    marks.sort()
+
+    return [
+        {
+            'phase': phase, 'description': TIMING_PHASES.get(phase, phase),
+            'process': 'pymg' if pid == os.getpid() else f'child {pid}',
+            'ms': round((timestamp - previous) / 1e6, 3)
+        }
+        for (previous, _, _), (timestamp, pid, phase) in zip(marks, marks[1:])
     ]
 
-    return header
+
+def display_timings(timings_file: Path, timings_format: str) -> None:
+    """
+    The task of this function is to display the phases of pymg (--timings option) as a compact table
+    or as JSON on stderr, and to remove the timings file.
+
+    :param timings_file: The path of the timings file.
+    :param timings_format: The format of the timings (table or json).
+    :return: None
+    """
+
+    mark(phase='exit')
+    os.environ.pop('PYMG_TIMINGS', None)
+
+    try:
+        phases: list = read_timings(timings_file=timings_file)
+    except OSError:
+        return
+    finally:
+        timings_file.unlink(missing_ok=True)
+
+    total: float = round(sum(phase['ms'] for phase in phases), 3)
+
+    if timings_format == 'json':
+        sys.stderr.write(json.dumps({'phases': phases, 'total_ms': total}) + '\n')
+        return
+
+    width: int = max((len(phase['description']) for phase in phases), default=0)
+
+    Console(stderr=True).print(
+        Panel(
+            '\n'.join(
+                f"[bold yellow]{escape(phase['description']):<{width}} ❱[/] [bold default]{phase['ms']:>9.2f} ms[/] "
+                f"{phase['ms'] / total if total else 0:>4.0%}  [default]{escape(phase['process'])}[/]"
+                for phase in phases
+            ) + f"\n[bold yellow]{'Total':<{width}} ❱[/] [bold default]{total:>9.2f} ms[/]",
+            title='Timings', style='blue', padding=(0, 1, 0, 1), highlight=False
+        )
+    )
+
+
+def gen_launcher() -> str:
+    """
+    The task of this function is to generate the launcher that is passed to the
+    Python interpreter with the -c option to interpret the source file.
+
+    -Note: The launcher imports the lightweight exceptionhook (pymg.hook) from the directory that contains
+    the pymg package and calls its bootstrap function, which installs the exceptionhook and executes the
+    source file (sys.argv[1]) by its real path as the __main__ module.
+
+    :return: str
+    """
+
+    return f'import sys; sys.path[0] = {Path(__file__).parent.parent.__str__()!r}; ' \
+           f'from pymg.hook import bootstrap; bootstrap()'
 
 
 def get_version() -> str:
@@ -964,7 +4614,7 @@ def get_version() -> str:
 
 @click.command(context_settings={'help_option_names': ['-h', '--help']})
 @click.argument('python_file', required=False, nargs=-1)
-@click.option('-x', '--syntax', is_flag=True, help="It checks the syntax of the selected Python file. If there is a syntax problem, an error message will be displayed, otherwise 'INTACT' will be displayed.")
+@click.option('-x', '--syntax', is_flag=True, help="It checks the syntax of the selected Python file. If there is a syntax problem, an error message will be displayed, otherwise 'INTACT' will be displayed. With many files, directories or glob patterns, all Python files are checked in parallel (--jobs), the unchanged files are skipped and a summary is displayed. The exit code is 1 if any file has a syntax error.")
 @click.option('-t', '--type', is_flag=True, help="The type of exception that occurred will be displayed.")
 @click.option('-m', '--message', is_flag=True, help="The message of exception that occurred will be displayed.")
 @click.option('-f', '--file', is_flag=True, help="The full path of the Python file where the exception occurred will be displayed.")
@@ -975,8 +4625,47 @@ def get_version() -> str:
 @click.option('-i', '--inner', is_flag=True, help="Just like the --trace option, The exception that occurred will be tracked and the result will be limited and displayed to the internal content of the selected Python file.")
 @click.option('-L', '--locals', is_flag=True, help="The last value of each scope's local variables before the exception occurs will be displayed. This option can be combined with --trace and --inner.")
 @click.option('-S', '--search', is_flag=True, help="With the help of stackoverflow api, the links of answered posts related to the exception that occurred will be displayed.")
+@click.option('--locals-length', type=click.IntRange(min=1), default=LOCALS_LIMITS['locals_length'], show_default=True, help="The maximum length of each local variable displayed by --locals.")
+@click.option('--locals-items', type=click.IntRange(min=0), default=LOCALS_LIMITS['locals_items'], show_default=True, help="The maximum number of items displayed from each container (list, dict, set, ...) by --locals.")
+@click.option('--locals-depth', type=click.IntRange(min=0), default=LOCALS_LIMITS['locals_depth'], show_default=True, help="The maximum depth of nested containers displayed by --locals.")
+@click.option('--locals-size', type=click.IntRange(min=1), default=LOCALS_LIMITS['locals_size'], show_default=True, help="The total number of characters of all local variables displayed by --locals. The rest of the variables are skipped.")
+@click.option('--locals-timeout', type=click.FloatRange(min=0, min_open=True), default=LOCALS_LIMITS['locals_timeout'], show_default=True, help="The time limit (seconds) for displaying each local variable.")
+@click.option('--locals-budget', type=click.FloatRange(min=0, min_open=True), default=LOCALS_LIMITS['locals_budget'], show_default=True, help="The total time (seconds) for displaying all local variables. The rest of the variables are skipped.")
+@click.option('--trace-head', type=click.IntRange(min=1), default=DEFAULT_SETTINGS['trace_head'], show_default=True, help="The number of the first frames displayed by --trace, --inner and --locals. Repeated frames (recursion) are displayed once.")
+@click.option('--trace-tail', type=click.IntRange(min=1), default=DEFAULT_SETTINGS['trace_tail'], show_default=True, help="The number of the last frames displayed by --trace, --inner and --locals. The frames between the first and the last frames are omitted.")
+@click.option('--context', type=click.IntRange(min=0), default=DEFAULT_SETTINGS['context'], show_default=True, help="The number of lines of code displayed before and after the line of each frame by --code, --trace and --inner.")
+@click.option('--search-timeout', type=click.FloatRange(min=0, min_open=True), default=SEARCH_TIMEOUT, show_default=True, help="The time limit (seconds) of the --search option.")
+@click.option('--search-online/--search-offline', default=True, help="Requests the stackoverflow api if no solution is found in the local index or the cache of the --search option (default).")
+@click.option('--build-index', nargs=1, type=Path, help="Builds the local solution index of the --search option. It has an argument that contains the path of a JSON corpus of exception/solution pairs or the Posts.xml file of a StackExchange dump.")
+@click.option('--format', type=click.Choice(['panel', 'json', 'ndjson']), default='panel', show_default=True, help="The format of the exception. With json and ndjson, a machine-readable record of the exception (type, message, source file, frames, locals and chained exceptions) is exported instead of the templates.")
+@click.option('--export', default='-', show_default=True, help="Where the record of the --format option is exported: the path of a file (appended for ndjson), fd:N for a file descriptor or - for stdout.")
 @click.option('-o', '--output', nargs=1, type=Path, help="Writes the output to a text file. It has an argument that contains the path of the text file.")
-@click.option('-r', '--recent', is_flag=True, help="Redisplays the last operation performed.")
+@click.option('-a', '--append', is_flag=True, help="Appends the output to the text file of the --output option if it already exists.")
+@click.option('--rotate', type=click.FloatRange(min=0), default=0, metavar='MEGABYTES', help="Rotates the text file of the --output option when it grows beyond this size (0 means no rotation).")
+@click.option('--backups', type=click.IntRange(min=0), default=5, show_default=True, help="The number of rotated text files of the --output option that are kept.")
+@click.option('-r', '--recent', is_flag=True, help="Redisplays the last exception that occurred from the crash history, without interpreting the Python file again. The recipe options can be combined with it.")
+@click.option('--show', type=click.IntRange(min=1), metavar='N', help="Redisplays the exception number N of the crash history (1 is the most recent one, see --history), without interpreting the Python file again. The recipe options can be combined with it.")
+@click.option('--history', is_flag=True, help="Displays the crash history: the exceptions that can be redisplayed by --recent and --show.")
+@click.option('--history-size', type=click.IntRange(min=0), default=HISTORY_SIZE, show_default=True, help="The number of exceptions that are kept in the crash history (0 means the exception is not stored).")
+@click.option('--rerun', is_flag=True, help="Interprets the Python file of the last operation again, with the same arguments and options.")
+@click.option('-P', '--in-process/--subprocess', default=True, help="Interprets the selected Python file inside the pymg process instead of a child Python interpreter (default), which saves launching two extra interpreters for every run.")
+@click.option('-w', '--watch', is_flag=True, help="Interprets the selected Python file again whenever it is changed, in a pre-forked interpreter that has already imported pymg.")
+@click.option('--watch-project', is_flag=True, help="With --watch, all Python files in the directory of the selected Python file (recursively) are watched.")
+@click.option('--serve', is_flag=True, help="Starts a pymg server that keeps a pool of pre-imported workers, which run the command lines sent by pymg-client over a Unix socket.")
+@click.option('--workers', type=click.IntRange(min=1), default=4, show_default=True, help="The number of workers of the pymg server.")
+@click.option('--socket', 'socket_path', type=Path, default=Path(SERVER_SOCKET), help="The path of the Unix socket of the pymg server.")
+@click.option('--batch', metavar='DIR_OR_GLOB', help="Interprets all Python files of a directory (recursively) or a glob pattern concurrently and displays a summary of the passed and failed files. The exit code is 1 if any file fails.")
+@click.option('-j', '--jobs', type=click.IntRange(min=1), default=os.cpu_count() or 1, show_default='number of CPUs', help="The number of Python files that --batch interprets (or --syntax checks) at the same time.")
+@click.option('--timeout', type=click.FloatRange(min=0, min_open=True), default=60, show_default=True, help="The time limit (seconds) of each Python file interpreted by --batch.")
+@click.option('--suppress-known', type=click.IntRange(min=0), default=0, metavar='N', help="Displays a one-line summary instead of the templates for an exception whose fingerprint (type and frames) has already occurred N times (0 means never).")
+@click.option('--stats', is_flag=True, help="Displays the most recurring exceptions (fingerprints) with the number of their occurrences and their first and last time.")
+@click.option('--top', type=click.IntRange(min=1), default=10, show_default=True, help="The number of exceptions displayed by --stats.")
+@click.option('--report', metavar='FINGERPRINT', help="Displays the latest report of an exception by its fingerprint (or the beginning of it), as shown by --stats.")
+@click.option('--memory', is_flag=True, help="Traces the memory allocations of the selected Python file (tracemalloc) and, if an exception occurs, displays the current and peak traced memory, the lines of the file that allocated the most memory and the counts of the garbage collector.")
+@click.option('--memory-frames', type=click.IntRange(min=1), default=DEFAULT_SETTINGS['memory_frames'], show_default=True, help="The number of frames that --memory stores for each memory allocation. More frames find the lines of the selected Python file behind allocations made in libraries, but slow the tracing down.")
+@click.option('--memory-top', type=click.IntRange(min=1), default=DEFAULT_SETTINGS['memory_top'], show_default=True, help="The number of lines of the selected Python file displayed by --memory.")
+@click.option('--timings', is_flag=True, help="Displays how long each phase of pymg took (importing pymg, checking the syntax, starting the child interpreter, reading the recipe, generating and printing the templates, ...) on stderr when pymg exits.")
+@click.option('--timings-format', type=click.Choice(['table', 'json']), default='table', show_default=True, help="The format of the --timings option: a compact table or a JSON object.")
 @click.option('-v', '--version', is_flag=True, help='Displays the current version of pymg installed on the system.')
 def main(**options):
     """
@@ -986,16 +4675,80 @@ def main(**options):
     if options['version'] and not options['python_file']:
         click.echo(get_version())
 
-    elif options['recent'] and not options['python_file']:
+    elif options['batch'] is not None and not options['python_file']:
+        sys.exit(
+            run_batch(
+                pattern=options['batch'], jobs=options['jobs'], timeout=options['timeout'],
+                settings={option: options[option] for option in SETTING_OPTIONS}
+            )
+        )
+
+    elif options['stats'] and not options['python_file']:
+        try:
+            db_file, spool_file = get_fingerprint_files()
+            display_stats(rows=get_fingerprints(db_file=db_file, spool_file=spool_file, limit=options['top']))
+        except (OSError, sqlite3.Error) as error:
+            cprint(f"[bold red]Error:[/] Reading the fingerprint database was not successful!\n{escape(error.__str__())}")
+
+    elif options['report'] is not None and not options['python_file']:
+        try:
+            db_file, spool_file = get_fingerprint_files()
+            report: tuple|None = get_report(fingerprint=options['report'], db_file=db_file, spool_file=spool_file)
+        except (OSError, sqlite3.Error) as error:
+            cprint(f"[bold red]Error:[/] Reading the fingerprint database was not successful!\n{escape(error.__str__())}")
+        else:
+            if report is None:
+                cprint("[bold red]Error:[/] No exception (or more than one exception) matches the fingerprint!")
+            elif report[1] is None:
+                cprint("[bold red]Error:[/] No report has been stored for this exception!")
+            else:
+                sys.stdout.write(report[1])
+
+    elif options['syntax'] and options['python_file'] and (
+            len(options['python_file']) > 1 or Path(options['python_file'][0]).is_dir()
+            or glob.has_magic(options['python_file'][0])):
+        sys.exit(check_project_syntax(patterns=options['python_file'], jobs=options['jobs'], cache_file=get_syntax_cache()))
+
+    elif options['serve'] and not options['python_file']:
+        serve(socket_path=options['socket_path'], workers=options['workers'])
+
+    elif options['build_index'] is not None and not options['python_file']:
+        if options['build_index'].is_file():
+            try:
+                count: int = build_index(corpus_file=options['build_index'], index_file=get_index_file())
+            except (OSError, ValueError, ElementTree.ParseError, sqlite3.Error) as error:
+                cprint(f"[bold red]Error:[/] Building the local solution index was not successful!\n{escape(error.__str__())}")
+            else:
+                cprint(f'[bold green]INDEXED[/] {count} solutions in {get_index_file()}')
+        else:
+            cprint("[bold red]Error:[/] The corpus does not exist!")
+
+    elif (options['recent'] or options['show'] is not None) and not options['python_file']:
+        show_snapshot(
+            number=options['show'] or 1,
+            history_dir=get_history_dir(),
+            recipe=prioritizing_options(options={option: options[option] for option in RECIPE_OPTIONS}),
+            settings={option: options[option] for option in SETTING_OPTIONS}
+        )
+
+    elif options['history'] and not options['python_file']:
+        display_history(history_dir=get_history_dir())
+
+    elif options['rerun'] and not options['python_file']:
+        recipe_file, source_info_file, settings_file = get_recent_files()
+
         recent_interpretation(
-            python_interpreter=sys.executable,
-            mirror_file=MIRROR_FILE,
-            args=get_source_info(source_info_file=SOURCE_INFO)[1:],
-            source_info_file=SOURCE_INFO,
-            recipe_file=RECIPE_FILE
+            args=get_source_info(source_info_file=source_info_file)[1:],
+            source_info_file=source_info_file,
+            recipe_file=recipe_file,
+            settings_file=settings_file,
+            in_process=options['in_process']
         )
 
     elif options['python_file']:
+        if options['timings']:
+            start_timings(timings_format=options['timings_format'])
+
         if options['version'] or options['recent']:
             click.echo(
                 "Usage: pymg [OPTIONS] [PYTHON_FILE]...\nTry 'pymg --help' for help.\n\nError: Two options --version and --recent cannot be used at this stage.")
@@ -1003,75 +4756,79 @@ def main(**options):
             response, file_error_message = pyfile_path_validator(py_file=Path(options['python_file'][0]))
 
             if response:
+                source_path: Path = Path(os.getcwd(), options['python_file'][0])
+
+                response, content = check_syntax(source_file=source_path)
+
+                mark(phase='syntax')
+
                 if options['syntax']:
-                    response, content = check_syntax(
-                        source_file=options['python_file'][0],
-                        python_interpreter=sys.executable
-                    )
+                    if not response:
+                        display_syntax_error(source_file=source_path, syntax_err=content)
+                        sys.exit(1)
 
-                    cprint(f'[bold green]{content}[/]') if response \
-                        else display_syntax_error(
-                        source_file=options['python_file'][0],
-                        syntax_err=content
-                    )
+                    cprint('[bold green]INTACT[/]')
 
-                else:
-                    response, syntax_err = check_syntax(
-                        source_file=options['python_file'][0],
-                        python_interpreter=sys.executable
-                    )
+                elif not (export_response := export_target_validator(target=options['export']))[0]:
+                    cprint(export_response[1])
 
-                    if response:
-                        filtered_options: dict = {
-                            option: value
-                            for option, value in options.items()
-                            if option not in [
-                                'python_file', 'syntax', 'output', 'version', 'recent'
-                            ]
-                        }
-
-                        if recipe := prioritizing_options(
-                            options=filtered_options
-                        ):
-                            write_recipe(recipe_file=RECIPE_FILE, recipe_data=recipe)
-                        else:
-                            write_recipe(recipe_file=RECIPE_FILE, recipe_data=['inner_with_locals'])
-
-                        source_info: tuple = (
-                            Path(os.getcwd(), options['python_file'][0]), *options['python_file'][1:]
-                        )
+                elif response or options['watch']:
+                    filtered_options: dict = {option: options[option] for option in RECIPE_OPTIONS}
+                    settings: dict = {option: options[option] for option in SETTING_OPTIONS}
+                    if settings['export'] != '-' and not settings['export'].startswith('fd:'):
+                        settings['export'] = Path(settings['export']).absolute().__str__()
 
-                        write_source_info(source_info_file=SOURCE_INFO, source_info=source_info)
+                    recipe: list = prioritizing_options(options=filtered_options) or DEFAULT_RECIPE
 
-                        mk_mirror_file(
-                            mirror_file=MIRROR_FILE,
-                            source=read_source(Path(options['python_file'][0])),
-                            header=gen_mirror_header(source_path=Path(os.getcwd(), options['python_file'][0]))
-                        )
+                    recipe_file, source_info_file, settings_file = get_recent_files()
 
-                        if options['output'] is not None:
-                            output_file: Path = Path(options['output'])
-                            get_output(
-                                python_interpreter=sys.executable,
-                                mirror_file=MIRROR_FILE,
-                                args=options['python_file'][1:],
-                                output_file=output_file
-                            )
-
-                        else:
-                            interpret(
-                                python_interpreter=sys.executable,
-                                mirror_file=MIRROR_FILE,
-                                args=options['python_file'][1:]
-                            )
-                    else:
-                        display_syntax_error(
-                            source_file=options['python_file'][0],
-                            syntax_err=syntax_err
+                    write_recipe(recipe_file=recipe_file, recipe_data=recipe)
+                    write_settings(settings_file=settings_file, settings=settings)
+                    write_source_info(
+                        source_info_file=source_info_file,
+                        source_info=(source_path, *options['python_file'][1:])
+                    )
+
+                    output_file: Path|None = None if options['output'] is None else Path(options['output']).absolute()
+                    output_options: dict = {
+                        'append': options['append'], 'backups': options['backups'],
+                        'max_bytes': int(options['rotate'] * 1024 * 1024)
+                    }
+
+                    if options['watch']:
+                        watch_source(
+                            source_path=source_path,
+                            args=options['python_file'][1:],
+                            recipe=recipe,
+                            settings=settings,
+                            project=options['watch_project'],
+                            in_process=options['in_process'],
+                            output_file=output_file,
+                            output_options=output_options
                         )
+                        return
+
+                    interpret_source(
+                        source_path=source_path,
+                        code=content,
+                        args=options['python_file'][1:],
+                        recipe=recipe,
+                        in_process=options['in_process'],
+                        settings=settings,
+                        output_file=output_file,
+                        output_options=output_options
+                    )
+                else:
+                    display_syntax_error(
+                        source_file=source_path,
+                        syntax_err=content
+                    )
             else:
                 cprint(file_error_message)
 
+                if options['syntax']:
+                    sys.exit(2)
+
     else:
         click.echo("Usage: pymg [OPTIONS] [PYTHON_FILE]...\nTry 'pymg --help' for help.\n\nError: Missing argument 'PYTHON_FILE...'.")
 
@@ -18,6 +18,7 @@ setup (
  entry_points='''
         [console_scripts]
         pymg=pymg.pymg:main
+        pymg-client=pymg.client:main
     ''',
  author="mimseyedi",
  keyword=["pymg", "debugger", "CLI", "Python", "bug", "debugger-tool"],
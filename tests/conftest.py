@@ -0,0 +1,45 @@
+"""
+The fixtures of the tests of pymg.
+"""
+
+
+import os
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+
+# The command that runs pymg with the package of this repository.
+PYMG: list = [sys.executable, '-c', 'from pymg.pymg import main; main(prog_name="pymg")']
+
+
+@pytest.fixture
+def pymg_environment(tmp_path: Path) -> dict:
+    """
+    The environment variables of a run of pymg, with its own state and cache directories in tmp_path.
+    """
+
+    return {
+        **{variable: value for variable, value in os.environ.items() if not variable.startswith('PYMG_')},
+        'PYTHONPATH': os.pathsep.join(filter(None, [ROOT.__str__(), os.environ.get('PYTHONPATH')])),
+        'XDG_STATE_HOME': Path(tmp_path, 'state').__str__(), 'XDG_CACHE_HOME': Path(tmp_path, 'cache').__str__(),
+        'COLUMNS': '80',
+    }
+
+
+@pytest.fixture
+def run_pymg(tmp_path: Path, pymg_environment: dict):
+    """
+    A function that runs pymg in tmp_path (with pymg_environment) and returns the completed process.
+    """
+
+    def run(*args: str, timeout: float=60) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [*PYMG, *args], cwd=tmp_path, env=pymg_environment, capture_output=True, text=True, timeout=timeout
+        )
+
+    return run
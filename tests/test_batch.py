@@ -0,0 +1,37 @@
+"""
+The tests of interpreting many Python files concurrently (--batch).
+"""
+
+
+from pathlib import Path
+
+
+def test_batch_summary_and_exit_code(run_pymg, tmp_path: Path):
+    scripts: Path = Path(tmp_path, 'scripts')
+    scripts.mkdir()
+
+    Path(scripts, 'passes.py').write_text('print("ok")\n')
+    Path(scripts, 'raises.py').write_text('def fail():\n    raise KeyError("missing")\n\nfail()\n')
+    Path(scripts, 'broken.py').write_text('def broken(:\n    pass\n')
+    Path(scripts, 'undecodable.py').write_bytes(b'text = "\xff\xfe"\n')
+    Path(scripts, 'sleeps.py').write_text('import time\ntime.sleep(30)\n')
+
+    process = run_pymg('--batch', 'scripts', '--timeout', '3', '-j', '5')
+
+    assert process.returncode == 1
+    assert process.stdout.count('PASSED') == 1
+    assert process.stdout.count('FAILED') == 4
+    assert 'KeyError' in process.stdout
+    assert 'SyntaxError' in process.stdout
+    assert 'Timeout' in process.stdout
+    assert 'Traceback' not in process.stdout + process.stderr
+
+
+def test_batch_passes(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'passes.py').write_text('print("ok")\n')
+
+    assert run_pymg('--batch', '*.py').returncode == 0
+
+
+def test_batch_without_files(run_pymg, tmp_path: Path):
+    assert run_pymg('--batch', 'nothing').returncode == 2
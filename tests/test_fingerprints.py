@@ -0,0 +1,126 @@
+"""
+The tests of the exception fingerprints (--suppress-known, --stats and --report).
+"""
+
+
+import os
+import re
+import sys
+import time
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from pymg import pymg
+
+
+SCRIPT: str = '''
+def parse(value):
+    return int(value)
+
+
+parse("x")
+'''
+
+
+def record(db_file: Path, spool_file: Path, count: int) -> None:
+    """
+    The task of this function is to record occurrences of three fingerprints with a small spool (so they are flushed
+    into the fingerprint database while the other processes are still recording).
+
+    :param db_file: The path of the fingerprint database.
+    :param spool_file: The path of the spool of the fingerprint database.
+    :param count: The number of occurrences.
+    :return: None
+    """
+
+    pymg.FINGERPRINT_SPOOL_SIZE = 2000
+
+    for index in range(count):
+        pymg.record_occurrence(
+            occurrence={
+                'fingerprint': f'{index % 3:040x}', 'type': 'ValueError', 'message': 'bad', 'location': 'script.py:1',
+                'time': time.time()
+            },
+            db_file=db_file, spool_file=spool_file
+        )
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='the spool is not locked without fcntl')
+def test_concurrent_occurrences_are_kept(tmp_path: Path):
+    db_file, spool_file = Path(tmp_path, 'fingerprints.db'), Path(tmp_path, 'fingerprints.spool')
+
+    processes: list = [
+        multiprocessing.get_context('spawn').Process(target=record, args=(db_file, spool_file, 200))
+        for _ in range(6)
+    ]
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join(timeout=120)
+
+    assert all(process.exitcode == 0 for process in processes)
+
+    rows: list = pymg.get_fingerprints(db_file=db_file, spool_file=spool_file, limit=10)
+
+    assert sum(row[-1] for row in rows) == 1200
+    assert [path.name for path in tmp_path.iterdir()] == ['fingerprints.db']
+
+
+def test_fingerprint_ignores_moved_lines(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+    run_pymg('-c', 'script.py')
+
+    Path(tmp_path, 'script.py').write_text('\n\n\n' + SCRIPT)
+    run_pymg('-c', 'script.py')
+
+    stats: str = run_pymg('--stats').stdout
+
+    assert '2× ValueError' in stats
+    assert 'script.py:6' in stats
+
+
+def test_suppress_known(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+
+    outputs: list = [run_pymg('--suppress-known', '2', 'script.py').stdout for _ in range(3)]
+
+    assert 'KNOWN ❱' not in outputs[0] and 'KNOWN ❱' not in outputs[1]
+    assert 'KNOWN ❱' in outputs[2]
+    assert len(outputs[2].splitlines()) < len(outputs[0].splitlines())
+
+
+def test_stats_and_report(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+
+    for _ in range(3):
+        run_pymg('script.py')
+
+    stats: str = run_pymg('--stats').stdout
+
+    assert '3× ValueError' in stats
+    fingerprint: str = re.search(r'\b([0-9a-f]{12})\b', stats).group(1)
+
+    report = run_pymg('--report', fingerprint)
+
+    assert report.returncode == 0
+    assert 'ValueError' in report.stdout
+    assert 'parse("x")' in report.stdout
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX permissions')
+def test_fingerprint_database_is_private(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT.replace('parse("x")', 'token = "s3cr3t"\nparse("x")'))
+    run_pymg('-L', 'script.py')
+    run_pymg('--stats')
+
+    db_file: Path = Path(tmp_path, 'state', 'pymg', 'fingerprints.db')
+
+    assert b's3cr3t' in db_file.read_bytes()
+    assert all(
+        os.stat(state_file).st_mode & 0o077 == 0
+        for state_file in db_file.parent.iterdir() if state_file.name.startswith('fingerprints')
+    )
@@ -0,0 +1,93 @@
+"""
+The tests of the crash history (--recent, --show, --history and --history-size).
+"""
+
+
+import os
+import sys
+import zlib
+import pickle
+from pathlib import Path
+
+import pytest
+
+
+SCRIPT: str = '''
+token = "s3cr3t"
+''' + ''.join(f'value_{index} = {index}\n' for index in range(300)) + '''
+raise KeyError("missing")
+'''
+
+
+def read_snapshots(tmp_path: Path) -> list[dict]:
+    """
+    The task of this function is to read the snapshots of the crash history of tmp_path (the most recent first).
+
+    :param tmp_path: The temporary directory of the test.
+    :return: list[dict]
+    """
+
+    history_dir: Path = Path(tmp_path, 'state', 'pymg', 'history')
+
+    return [
+        pickle.loads(zlib.decompress(snapshot_file.read_bytes()))
+        for snapshot_file in sorted(history_dir.glob('*.pymgsnap'), reverse=True)
+    ]
+
+
+def test_snapshot_without_locals(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+    run_pymg('-t', 'script.py')
+
+    snapshot: dict = read_snapshots(tmp_path=tmp_path)[0]
+
+    assert snapshot['type'] == 'KeyError'
+    assert all(not frame['locals'] for frame in snapshot['frames'])
+    assert b's3cr3t' not in pickle.dumps(snapshot)
+
+    assert 'KeyError' in run_pymg('--recent', '-c').stdout
+
+
+def test_snapshot_with_limited_locals(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+    run_pymg('-L', 'script.py')
+
+    frame: dict = read_snapshots(tmp_path=tmp_path)[0]['frames'][-1]
+
+    assert len(frame['locals']) == 100
+    assert frame['locals']['token'] == 's3cr3t'
+    assert frame['omitted'] == 201
+
+    shown: str = run_pymg('--show', '1', '-L').stdout
+    assert 'token = s3cr3t' in shown
+    assert '201 more locals omitted' in shown
+
+
+def test_history_size(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+
+    for _ in range(3):
+        run_pymg('-t', '--history-size', '2', 'script.py')
+
+    assert len(read_snapshots(tmp_path=tmp_path)) == 2
+    assert run_pymg('--history').stdout.count('KeyError') == 2
+
+    run_pymg('-t', '--history-size', '0', 'script.py')
+    assert len(read_snapshots(tmp_path=tmp_path)) == 2
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX permissions')
+def test_snapshots_are_private(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+    run_pymg('-t', 'script.py')
+
+    history_dir: Path = Path(tmp_path, 'state', 'pymg', 'history')
+
+    assert all(os.stat(snapshot_file).st_mode & 0o077 == 0 for snapshot_file in history_dir.iterdir())
+
+
+def test_snapshot_message_is_bounded(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text('raise ValueError("x" * 1_000_000)\n')
+    run_pymg('-t', 'script.py')
+
+    assert read_snapshots(tmp_path=tmp_path)[0]['message'] == 'x' * 160 + '... (1000000 characters)'
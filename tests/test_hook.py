@@ -0,0 +1,61 @@
+"""
+The tests of the import budget of the exceptionhook (pymg.hook):
+https://github.com/mimseyedi/pymg/blob/master/docs/guide/how_does_pymg_work.md#hook_budget
+"""
+
+
+import os
+import sys
+import subprocess
+from pathlib import Path
+
+from pymg.hook import HOOK_IMPORT_BUDGET
+
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+
+ENVIRONMENT: dict = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [ROOT.__str__(), os.environ.get('PYTHONPATH')]))}
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    """
+    The task of this function is to run the Python interpreter with the pymg package of this repository.
+
+    :param args: The arguments of the Python interpreter.
+    :return: subprocess.CompletedProcess
+    """
+
+    return subprocess.run([sys.executable, *args], env=ENVIRONMENT, capture_output=True, text=True, check=True)
+
+
+def test_hook_imports_no_new_modules():
+    list_modules: str = 'import sys; {}print("\\n".join(sys.modules))'
+
+    baseline: set = set(run_python('-c', list_modules.format('')).stdout.split())
+    with_hook: set = set(run_python('-c', list_modules.format('import pymg.hook; ')).stdout.split())
+
+    assert with_hook - baseline == {'pymg', 'pymg.hook'}
+    assert not {'click', 'rich', 'requests'} & with_hook
+
+
+def test_hook_import_time_within_budget():
+    cumulative: int = min(
+        max(
+            int(line.split('|')[1]) for line in run_python('-X', 'importtime', '-c', 'import pymg.hook').stderr.splitlines()
+            if line.split('|')[-1].strip() == 'pymg'
+        )
+        for _ in range(3)
+    )
+
+    assert cumulative < HOOK_IMPORT_BUDGET
+
+
+def test_threading_is_patched_when_imported():
+    # Without the site module (-S), threading is not imported before the exceptionhooks are installed.
+    installed: str = run_python('-S', '-c', (
+        'import sys; from pymg.hook import install_hooks, display_thread_error; '
+        'print("threading" in sys.modules); install_hooks(); import threading; '
+        'print(threading.excepthook is display_thread_error, threading.__excepthook__ is display_thread_error)'
+    )).stdout
+
+    assert installed.split() == ['False', 'True', 'False']
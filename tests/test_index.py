@@ -0,0 +1,99 @@
+"""
+The tests of the local solution index (--build-index and the offline --search option).
+"""
+
+
+import os
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+from pymg import pymg
+
+
+CORPUS: list = [
+    {'exception': 'KeyError', 'message': "'name'", 'title': 'KeyError when reading a dict', 'link': 'https://k/1'},
+    {'exception': 'ZeroDivisionError', 'message': 'division by zero', 'title': 'Dividing by zero',
+     'link': 'https://z/1'},
+    {'exception': 'ZeroDivisionError', 'message': 'division by zero', 'title': 'Dividing by zero',
+     'link': 'https://z/2'},
+    {'exception': 'ValueError', 'message': 'math domain error', 'title': 'A math error with a division',
+     'link': 'https://v/1'},
+]
+
+POSTS: str = '''<?xml version="1.0" encoding="utf-8"?>
+<posts>
+  <row Id="10" PostTypeId="1" Title="ZeroDivisionError: division by zero in a loop" Tags="&lt;python&gt;"
+       AcceptedAnswerId="11" />
+  <row Id="11" PostTypeId="2" ParentId="10" />
+  <row Id="20" PostTypeId="1" Title="KeyError in a nested dict" Tags="&lt;python&gt;" AnswerCount="1" />
+  <row Id="30" PostTypeId="1" Title="ZeroDivisionError without an answer" Tags="&lt;python&gt;" AnswerCount="0" />
+  <row Id="40" PostTypeId="1" Title="ZeroDivisionError in javascript" Tags="&lt;javascript&gt;" AnswerCount="2" />
+</posts>
+'''
+
+SCRIPT: str = '''
+ratio = 1 / 0
+'''
+
+
+def build(run_pymg, tmp_path: Path, pymg_environment: dict, corpus_file: str) -> list[tuple[str, str]]:
+    """
+    The task of this function is to build the local solution index of tmp_path from a corpus and to return the
+    posts that the offline --search option finds for a ZeroDivisionError (in the order they are displayed).
+
+    :param run_pymg: The fixture that runs pymg.
+    :param tmp_path: The temporary directory of the test.
+    :param pymg_environment: The environment variables of pymg.
+    :param corpus_file: The name of the corpus in tmp_path.
+    :return: list[tuple[str, str]]
+    """
+
+    pymg_environment['PYMG_INDEX'] = Path(tmp_path, 'solutions.db').__str__()
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+
+    assert 'INDEXED' in run_pymg('--build-index', corpus_file).stdout
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.db') and name != 'solutions.db']
+
+    return pymg.search_index(
+        exc_type=ZeroDivisionError, query=pymg.normalize_message(exc_type=ZeroDivisionError,
+                                                                 exc_message=ZeroDivisionError('division by zero')),
+        index_file=Path(tmp_path, 'solutions.db')
+    )
+
+
+def test_json_corpus(run_pymg, tmp_path: Path, pymg_environment: dict):
+    Path(tmp_path, 'corpus.json').write_text(json.dumps(CORPUS))
+
+    posts: list = build(run_pymg=run_pymg, tmp_path=tmp_path, pymg_environment=pymg_environment,
+                        corpus_file='corpus.json')
+
+    assert sorted(posts[:2]) == [('Dividing by zero', 'https://z/1'), ('Dividing by zero', 'https://z/2')]
+    assert posts[2:] == [('A math error with a division', 'https://v/1')]
+
+    output: str = run_pymg('-S', '--search-offline', 'script.py').stdout
+    assert output.count('Dividing by zero') == 2
+    assert output.index('https://z/') < output.index('https://v/1')
+    assert 'https://k/1' not in output
+
+
+def test_posts_xml(run_pymg, tmp_path: Path, pymg_environment: dict):
+    Path(tmp_path, 'Posts.xml').write_text(POSTS)
+
+    posts: list = build(run_pymg=run_pymg, tmp_path=tmp_path, pymg_environment=pymg_environment,
+                        corpus_file='Posts.xml')
+
+    assert posts == [('ZeroDivisionError: division by zero in a loop', 'https://stackoverflow.com/questions/10')]
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='/proc/self/fd')
+def test_build_index_does_not_leak(tmp_path: Path):
+    Path(tmp_path, 'corpus.json').write_text(json.dumps(CORPUS))
+    descriptors: int = len(os.listdir('/proc/self/fd'))
+
+    for _ in range(3):
+        assert pymg.build_index(corpus_file=Path(tmp_path, 'corpus.json'), index_file=Path(tmp_path, 'solutions.db')) == 4
+
+    assert len(os.listdir('/proc/self/fd')) == descriptors
@@ -0,0 +1,119 @@
+"""
+The tests of displaying the local variables within their limits and budgets (LocalsRepr).
+"""
+
+
+import time
+import threading
+
+from pymg.pymg import Frame, LocalsRepr, LOCALS_LIMITS, gen_locals_text
+
+
+class Slow:
+    def __repr__(self) -> str:
+        time.sleep(3)
+        return 'slow'
+
+    __str__ = __repr__
+
+
+def gen_frame(namespace: dict) -> Frame:
+    """
+    The task of this function is to raise an exception at the module level of a namespace
+    and to return the frame model of that module frame.
+
+    :param namespace: The globals (and locals) of the module.
+    :return: Frame
+    """
+
+    try:
+        exec('raise ValueError', namespace)
+    except ValueError as error:
+        return Frame(traceback_=error.__traceback__.tb_next, inner=True, sources=None)
+
+
+def test_locals_within_limits():
+    locals_repr = LocalsRepr(**LOCALS_LIMITS)
+
+    assert locals_repr.render('x' * 1000).endswith('... (1000 characters)')
+    assert locals_repr.render(list(range(100))).endswith('...]')
+    assert not locals_repr.exhausted
+
+
+def test_exhausted_budget_omits_remaining_locals():
+    frame: Frame = gen_frame(namespace={f'v{index}': index * 1000003 for index in range(5000)})
+    locals_repr = LocalsRepr(**{**LOCALS_LIMITS, 'locals_size': 500})
+
+    texts: dict = frame.locals_texts(locals_repr=locals_repr)
+
+    assert locals_repr.exhausted
+    assert len(texts) < 100
+    assert len(texts) + frame.omitted == len(frame.locals)
+    assert gen_locals_text(frame=frame, locals_repr=locals_repr).count('\n') == len(texts)
+    assert f'{frame.omitted} more locals omitted' in gen_locals_text(frame=frame, locals_repr=locals_repr)
+
+
+def test_time_limit_on_main_thread():
+    start: float = time.perf_counter()
+    text: str = LocalsRepr(**{**LOCALS_LIMITS, 'locals_timeout': 0.2}).render(Slow())
+
+    assert 'truncated' in text
+    assert time.perf_counter() - start < 2
+
+
+def test_time_limit_outside_main_thread():
+    texts: list = []
+    locals_repr = LocalsRepr(**{**LOCALS_LIMITS, 'locals_timeout': 0.2})
+
+    start: float = time.perf_counter()
+    worker = threading.Thread(target=lambda: texts.append(locals_repr.render(Slow())))
+    worker.start()
+    worker.join()
+
+    assert 'truncated' in texts[0]
+    assert time.perf_counter() - start < 2
+
+
+def test_failing_repr_is_summarized():
+    class Broken:
+        def __str__(self) -> str:
+            raise RuntimeError
+
+    assert LocalsRepr(**LOCALS_LIMITS).render(Broken()) == '<Broken: can not be displayed (RuntimeError)>'
+
+
+def test_time_limit_is_not_swallowed():
+    class Swallowing:
+        def __str__(self) -> str:
+            for _ in range(40):
+                try:
+                    time.sleep(0.1)
+                except Exception:
+                    pass
+
+            return 'swallowing'
+
+    start: float = time.perf_counter()
+    text: str = LocalsRepr(**{**LOCALS_LIMITS, 'locals_timeout': 0.2}).render(Swallowing())
+
+    assert 'truncated' in text
+    assert time.perf_counter() - start < 2
+
+
+def test_binary_data_is_sliced():
+    locals_repr = LocalsRepr(**LOCALS_LIMITS)
+    data: bytes = bytes(50_000_000)
+
+    start: float = time.perf_counter()
+    texts: list = [
+        locals_repr.render(data), locals_repr.render(bytearray(data)), locals_repr.render(memoryview(data)),
+        locals_repr.render([data, data])
+    ]
+
+    assert time.perf_counter() - start < 0.5
+    assert texts[0].startswith("b'\\x00") and texts[0].endswith('... (50000000 bytes)')
+    assert texts[1].startswith("bytearray(b'\\x00") and texts[1].endswith('... (50000000 bytes)')
+    assert texts[2].startswith("<memoryview: b'\\x00") and texts[2].endswith('... (50000000 bytes)>')
+    assert all(len(text) < 500 for text in texts)
+
+    assert locals_repr.render(b'short') == "b'short'"
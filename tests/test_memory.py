@@ -0,0 +1,88 @@
+"""
+The tests of the memory diagnostics (--memory, --memory-frames and --memory-top).
+"""
+
+
+import json
+from pathlib import Path
+
+import pytest
+
+
+SCRIPT: str = '''
+import sys
+
+small = [0] * 1000
+large = [bytes(1000) for _ in range(20000)]
+print("tracemalloc" in sys.modules)
+raise MemoryError("pretend")
+'''
+
+
+def read_record(output: str) -> tuple[str, dict]:
+    """
+    The task of this function is to split the output of the script (before the record) from the json record.
+
+    :param output: The output of pymg.
+    :return: tuple[str, dict]
+    """
+
+    start: int = output.index('{')
+
+    return output[:start], json.loads(output[start:])
+
+
+@pytest.mark.parametrize('mode', ['--in-process', '--subprocess'])
+def test_memory_record(run_pymg, tmp_path: Path, mode: str):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+
+    printed, record = read_record(output=run_pymg('--memory', '--memory-top', '2', '--format', 'json', mode,
+                                                  'script.py').stdout)
+    memory: dict = record['memory']
+
+    assert printed.strip() == 'True'
+    assert memory['peak'] >= memory['current'] > 20000 * 1000
+    assert [site['lineno'] for site in memory['sites']] == [5, 4]
+    assert memory['sites'][0]['count'] >= 20000
+    assert len(memory['gc_count']) == len(memory['gc_collections']) == 3
+
+
+def test_memory_panel(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+
+    output: str = run_pymg('--memory', '--memory-top', '1', 'script.py').stdout
+
+    assert 'Memory' in output and 'Peak ❱' in output
+    assert 'Line 5 ❱' in output and 'Line 4 ❱' not in output
+
+
+def test_without_memory(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+
+    printed, record = read_record(output=run_pymg('--format', 'json', 'script.py').stdout)
+
+    assert printed.strip() == 'False'
+    assert record.get('memory') is None
+
+
+@pytest.mark.parametrize('mode', ['--in-process', '--subprocess'])
+def test_tracing_of_the_script(run_pymg, tmp_path: Path, mode: str):
+    Path(tmp_path, 'script.py').write_text(
+        'import tracemalloc\n'
+        'tracemalloc.start()\n'
+        'try:\n'
+        '    raise KeyError("handled")\n'
+        'except KeyError:\n'
+        '    import sys\n'
+        '    sys.excepthook(*sys.exc_info())\n'
+        'print("still tracing", tracemalloc.is_tracing())\n'
+        'raise ValueError("traced")\n'
+    )
+
+    output: str = run_pymg(mode, 'script.py').stdout
+
+    assert 'still tracing True' in output
+    assert 'Memory' not in output and 'Peak ❱' not in output
+
+    printed, record = read_record(output=run_pymg('--format', 'json', mode, 'script.py').stdout.split('still')[0])
+    assert record.get('memory') is None
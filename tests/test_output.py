@@ -0,0 +1,77 @@
+"""
+The tests of the --output option: the escape sequences are removed from the text file,
+even when they are split between the chunks of the output, and the output written at the level of the file
+descriptors is written too.
+"""
+
+
+import io
+import os
+import time
+import threading
+from pathlib import Path
+
+import pytest
+
+from pymg.pymg import OutputLog, pump_output, split_partial_escape
+
+
+@pytest.mark.parametrize('data, pending', [
+    (b'plain text', b''),
+    (b'text\x1b', b'\x1b'),
+    (b'text\x1b[31', b'\x1b[31'),
+    (b'text\x1b[31mred', b''),
+    (b'text\x1b]8;;https://example.com/a/b', b'\x1b]8;;https://example.com/a/b'),
+    (b'text\x1b]0;title\x1b', b'\x1b]0;title\x1b'),
+    (b'text\x1b]0;title\x07more', b''),
+    (b'text\x1b]0;title\x1b\\more', b''),
+])
+def test_split_partial_escape(data: bytes, pending: bytes):
+    assert split_partial_escape(data=data) == (data[:len(data) - len(pending)], pending)
+
+
+@pytest.mark.parametrize('chunks', [
+    [b'see \x1b]8;;https://example.com/docs', b'\x1b\\the docs\x1b]8;;\x1b\\ and ', b'\x1b[1mbold\x1b[0m\n'],
+    [b'see \x1b]8;;https://example.com/docs\x1b', b'\\the docs\x1b]8;;\x07 and \x1b[', b'1mbold\x1b[0m\n'],
+])
+def test_split_escape_sequences_are_stripped(tmp_path: Path, chunks: list[bytes]):
+    log = OutputLog(path=Path(tmp_path, 'output.txt'))
+    terminal = io.BytesIO()
+    reader, writer = os.pipe()
+
+    os.write(writer, chunks[0])
+
+    with os.fdopen(reader, 'rb') as pipe:
+        pump = threading.Thread(target=pump_output, args=(pipe, terminal, log))
+        pump.start()
+
+        for chunk in chunks[1:]:
+            time.sleep(0.1)
+            os.write(writer, chunk)
+
+        os.close(writer)
+        pump.join()
+
+    log.close()
+
+    assert terminal.getvalue() == b''.join(chunks)
+    assert Path(tmp_path, 'output.txt').read_bytes() == b'see the docs and bold\n'
+
+
+@pytest.mark.parametrize('mode', ['--in-process', '--subprocess'])
+def test_file_descriptor_output(run_pymg, tmp_path: Path, mode: str):
+    Path(tmp_path, 'script.py').write_text(
+        'import os, sys\n'
+        'print("from-print")\n'
+        'os.system("echo from-shell")\n'
+        'os.write(1, b"raw-fd\\n")\n'
+        'os.write(2, b"raw-stderr\\n")\n'
+        'raise ValueError("logged")\n'
+    )
+
+    completed = run_pymg('-t', '-o', 'output.txt', mode, 'script.py')
+    log: str = Path(tmp_path, 'output.txt').read_text()
+
+    for line in ('from-print', 'from-shell', 'raw-fd', 'raw-stderr', 'ValueError'):
+        assert line in log
+        assert line in completed.stdout + completed.stderr
@@ -0,0 +1,96 @@
+"""
+The tests of the machine-readable record of an exception (--format json|ndjson and --export).
+"""
+
+
+import json
+from pathlib import Path
+
+
+SCRIPT: str = '''
+def divide(numerator, denominator):
+    ratio = None
+    return numerator / denominator
+
+try:
+    int('x')
+except ValueError as error:
+    raise RuntimeError('wrapped') from divide(1, 0)
+'''
+
+POOL_SCRIPT: str = '''
+from concurrent.futures import ProcessPoolExecutor
+
+def work(value):
+    return value / (value - value)
+
+if __name__ == '__main__':
+    with ProcessPoolExecutor(1) as pool:
+        pool.submit(work, 3).result()
+'''
+
+
+def test_json_record(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+
+    record: dict = json.loads(run_pymg('--format', 'json', 'script.py').stdout)
+
+    assert record['type'] == 'ZeroDivisionError'
+    assert record['frames'][-1]['scope'] == 'divide'
+    assert record['frames'][-1]['locals'] == {'numerator': '1', 'denominator': '0', 'ratio': 'None'}
+    assert record['context']['type'] == 'ValueError'
+    assert record['fingerprint']
+
+
+def test_json_record_with_output(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+
+    process = run_pymg('--format', 'json', '--output', 'output.txt', 'script.py')
+
+    assert json.loads(process.stdout)['type'] == 'ZeroDivisionError'
+    assert json.loads(Path(tmp_path, 'output.txt').read_text())['type'] == 'ZeroDivisionError'
+
+
+def test_ndjson_records_are_appended(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+
+    for _ in range(2):
+        run_pymg('--format', 'ndjson', '--export', 'records.ndjson', 'script.py')
+
+    records: list = Path(tmp_path, 'records.ndjson').read_text().splitlines()
+
+    assert len(records) == 2
+    assert all(json.loads(record)['type'] == 'ZeroDivisionError' for record in records)
+
+
+def test_json_record_has_the_frames_of_the_worker(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(POOL_SCRIPT)
+
+    record: dict = json.loads(run_pymg('--format', 'json', 'script.py').stdout)
+
+    assert record['origin'] == 'a worker process'
+    assert record['frames'][-1]['scope'] == 'work'
+
+
+def test_message_is_bounded(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text('raise ValueError("x" * 1_000_000)\n')
+
+    record: dict = json.loads(run_pymg('--format', 'ndjson', 'script.py').stdout)
+
+    assert record['message'] == 'x' * 160 + '... (1000000 characters)'
+
+
+def test_message_that_can_not_be_converted(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(
+        'class Broken(Exception):\n'
+        '    def __str__(self):\n'
+        '        raise RuntimeError("str")\n'
+        '\n'
+        'raise Broken()\n'
+    )
+
+    completed = run_pymg('--format', 'json', 'script.py')
+
+    assert 'Traceback' not in completed.stderr
+    assert json.loads(completed.stdout)['message'] == '<exception str() failed>'
+    assert 'Exception Message ❱ <exception str() failed>' in run_pymg('-t', '-m', 'script.py').stdout
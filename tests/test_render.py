@@ -0,0 +1,98 @@
+"""
+The tests of the rendering of the templates (PlainRenderer and the fallback to rich).
+"""
+
+
+import re
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+
+# The objects of the script have fixed representations (no addresses), so the outputs of -L can be compared.
+SCRIPT: str = '''
+import sys
+
+
+class Loader:
+    def __repr__(self):
+        return "Loader()"
+
+    def load(self, path, retries=3):
+        return open(path).read()
+
+    def main(self, paths):
+        label = "数据集 — café"
+        tabbed = "a\\tb\\tc"
+        long_name = "x" * 150
+
+        try:
+            return [self.load(path) for path in paths]
+        except OSError as error:
+            raise RuntimeError(f"无法加载 {label} ({len(paths)} files): {error}") from error
+
+
+Loader().main(["missing.txt", "other.txt"])
+'''
+
+
+# The commands that run pymg with PlainRenderer (which writes "plain" to stderr when it renders a template)
+# and with rich (PlainRenderer fails, so write_renderables falls back to rich).
+RENDER: str = '''
+from pymg import pymg
+render = pymg.PlainRenderer.render
+
+def plain(self, renderable, width):
+    print("plain", file=__import__("sys").stderr)
+    return render(self, renderable, width)
+
+def rich(self, renderable, width):
+    raise TypeError("rich")
+
+pymg.PlainRenderer.render = {}
+pymg.main(prog_name="pymg")
+'''
+
+
+def run_renderer(renderer: str, args: tuple, tmp_path: Path, pymg_environment: dict) -> subprocess.CompletedProcess:
+    """
+    The task of this function is to run pymg with one of the renderers (plain or rich).
+
+    :param renderer: The name of the renderer (plain or rich).
+    :param args: The arguments of pymg.
+    :param tmp_path: The temporary directory of the test.
+    :param pymg_environment: The environment variables of pymg.
+    :return: subprocess.CompletedProcess
+    """
+
+    return subprocess.run(
+        [sys.executable, '-c', RENDER.format(renderer), *args], cwd=tmp_path, env=pymg_environment,
+        capture_output=True, text=True, encoding='utf-8', timeout=60
+    )
+
+
+@pytest.mark.parametrize('width', ['20', '40', '80', '200'])
+@pytest.mark.parametrize('recipe', [[], ['-T'], ['-i'], ['-L'], ['-c', '-t', '-m'], ['-T', '-L', '--context', '2']])
+def test_plain_renderer_matches_rich(tmp_path: Path, pymg_environment: dict, recipe: list, width: str):
+    Path(tmp_path, 'script.py').write_text(SCRIPT, encoding='utf-8')
+    pymg_environment.update(COLUMNS=width, PYTHONIOENCODING='utf-8')
+
+    plain = run_renderer(renderer='plain', args=(*recipe, 'script.py'), tmp_path=tmp_path,
+                         pymg_environment=pymg_environment)
+    rich = run_renderer(renderer='rich', args=(*recipe, 'script.py'), tmp_path=tmp_path,
+                        pymg_environment=pymg_environment)
+
+    assert 'plain' in plain.stderr
+    assert plain.stdout.startswith('╭')
+    assert plain.stdout == rich.stdout
+
+
+def test_report_matches_output(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'script.py').write_text(SCRIPT, encoding='utf-8')
+
+    output: str = run_pymg('-T', 'script.py').stdout
+    fingerprint: str = re.search(r'\b([0-9a-f]{12})\b', run_pymg('--stats').stdout).group(1)
+
+    assert run_pymg('--report', fingerprint).stdout == output
@@ -0,0 +1,101 @@
+"""
+The tests of the --search option against a local stand-in for the stackoverflow api.
+"""
+
+
+import json
+import time
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from pymg import pymg
+
+
+ITEMS: list = [
+    {'title': 'How to fix ZeroDivisionError?', 'link': 'https://stackoverflow.com/q/1', 'is_answered': True},
+    {'title': 'An unanswered question', 'link': 'https://stackoverflow.com/q/2', 'is_answered': False},
+]
+
+
+class StackExchange(BaseHTTPRequestHandler):
+    """
+    A stand-in for the search endpoint of the stackexchange api, which counts its requests
+    and answers after the delay of its server.
+    """
+
+    def do_GET(self) -> None:
+        self.server.requests.append(self.path)
+        time.sleep(self.server.delay)
+
+        body: bytes = json.dumps({'items': ITEMS}).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def api(monkeypatch: pytest.MonkeyPatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StackExchange)
+    server.daemon_threads, server.requests, server.delay = True, [], 0.0
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(pymg, 'SEARCH_API', f'http://127.0.0.1:{server.server_port}/2.3/search')
+    monkeypatch.setenv('NO_PROXY', '127.0.0.1')
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def search(tmp_path: Path, timeout: float=5.0) -> pymg.Search:
+    """
+    The task of this function is to start a search for a ZeroDivisionError with the cache and index of tmp_path.
+
+    :param tmp_path: The temporary directory of the test.
+    :param timeout: The time limit of the search.
+    :return: Search
+    """
+
+    try:
+        1 / 0
+    except ZeroDivisionError as error:
+        return pymg.Search(
+            exc_type=ZeroDivisionError, exc_message=error, timeout=timeout,
+            cache_file=Path(tmp_path, 'search.pymgcache'), index_file=Path(tmp_path, 'index.sqlite3')
+        )
+
+
+def test_search_hit(api, tmp_path: Path):
+    assert search(tmp_path=tmp_path).result() == [('How to fix ZeroDivisionError?', 'https://stackoverflow.com/q/1')]
+    assert len(api.requests) == 1
+    assert 'intitle=division+by+zero' in api.requests[0]
+
+
+def test_search_cache_hit(api, tmp_path: Path):
+    first: list = search(tmp_path=tmp_path).result()
+    second: pymg.Search = search(tmp_path=tmp_path)
+
+    assert second.result() == first
+    assert len(api.requests) == 1
+
+
+def test_search_timeout(api, tmp_path: Path):
+    api.delay = 2.0
+
+    start: float = time.monotonic()
+    slow: pymg.Search = search(tmp_path=tmp_path, timeout=0.3)
+
+    assert slow.result() is None
+    assert slow.error == 'The search timed out!'
+    assert time.monotonic() - start < 1.5
+    assert not Path(tmp_path, 'search.pymgcache').exists()
@@ -0,0 +1,85 @@
+"""
+The tests of the pymg server (--serve) and its client (pymg-client).
+"""
+
+
+import sys
+import json
+import time
+import socket
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from conftest import PYMG
+from pymg.client import FRAME_LOCAL, FRAME_HEADER, recv_exactly
+
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='The pymg server needs Unix sockets and fork.')
+
+
+@pytest.fixture
+def server(tmp_path: Path, pymg_environment: dict):
+    socket_path: Path = Path(tmp_path, 'server.sock')
+    process = subprocess.Popen(
+        [*PYMG, '--serve', '--socket', socket_path.__str__(), '--workers', '1'],
+        cwd=tmp_path, env={**pymg_environment, 'XDG_STATE_HOME': Path(tmp_path, 'server-state').__str__()},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    deadline: float = time.monotonic() + 30
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        while probe.connect_ex(socket_path.__str__()) != 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    yield socket_path
+
+    process.terminate()
+    process.wait(timeout=10)
+
+
+def test_client_state_is_used(server: Path, tmp_path: Path, pymg_environment: dict):
+    Path(tmp_path, 'script.py').write_text('1 / 0\n')
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'pymg.client', '--socket', server.__str__(), '-t', 'script.py'],
+        cwd=tmp_path, env={**pymg_environment, 'PYMG_FINGERPRINTS': Path(tmp_path, 'client.db').__str__()},
+        capture_output=True, text=True, timeout=60
+    )
+
+    assert 'ZeroDivisionError' in process.stdout
+    assert Path(tmp_path, 'client.spool').exists()
+    assert list(Path(tmp_path, 'state', 'pymg', 'history').iterdir())
+    assert not Path(tmp_path, 'server-state', 'pymg', 'history').exists()
+
+
+def test_client_path_is_used(server: Path, tmp_path: Path, pymg_environment: dict):
+    Path(tmp_path, 'lib').mkdir()
+    Path(tmp_path, 'lib', 'client_only.py').write_text('def parse(value):\n    return int(value)\n')
+    Path(tmp_path, 'script.py').write_text('import client_only\n\nclient_only.parse("x")\n')
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'pymg.client', '--socket', server.__str__(), '-t', '-m', 'script.py'], cwd=tmp_path,
+        env={**pymg_environment, 'PYTHONPATH': f"{Path(tmp_path, 'lib')}:{pymg_environment['PYTHONPATH']}"},
+        capture_output=True, text=True, timeout=60
+    )
+
+    assert 'ValueError' in process.stdout
+    assert 'ModuleNotFoundError' not in process.stdout
+
+
+def test_other_interpreter_runs_locally(server: Path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(server.__str__())
+        connection.sendall(
+            json.dumps(
+                {
+                    'argv': ['--version'], 'cwd': '/', 'env': {}, 'executable': '/other/venv/bin/python',
+                    'prefix': '/other/venv', 'path': [], 'isatty': False, 'columns': 80
+                }
+            ).encode('utf-8') + b'\n'
+        )
+
+        assert recv_exactly(connection, FRAME_HEADER.size) == FRAME_HEADER.pack(FRAME_LOCAL, 0)
+        assert connection.recv(1) == b''
@@ -0,0 +1,33 @@
+"""
+The tests of the source cache (the lines of the files that appear in the traceback).
+"""
+
+
+import sys
+import subprocess
+from pathlib import Path
+
+
+# The source cache runs in a child interpreter, so a crash of it (SIGBUS) does not stop the tests.
+CACHE: str = '''
+from pathlib import Path
+from pymg.pymg import SourceCache
+
+sources = SourceCache(source_info_file=None, source_info=[])
+print(repr(sources.getline("module.py", 1)))
+
+Path("module.py").write_text("")
+print(repr(sources.getline("module.py", 4000)))
+print(repr(sources.getline("module.py", 4001)))
+'''
+
+
+def test_truncated_file(tmp_path: Path, pymg_environment: dict):
+    Path(tmp_path, 'module.py').write_text(''.join(f'value_{lineno} = {lineno}\n' for lineno in range(1, 4001)))
+
+    completed = subprocess.run(
+        [sys.executable, '-c', CACHE], cwd=tmp_path, env=pymg_environment, capture_output=True, text=True, timeout=60
+    )
+
+    assert completed.returncode == 0
+    assert completed.stdout.splitlines() == ["'value_1 = 1\\n'", "'value_4000 = 4000\\n'", "''"]
@@ -0,0 +1,46 @@
+"""
+The tests of checking the syntax of Python files (--syntax) and its exit code.
+"""
+
+
+from pathlib import Path
+
+
+def test_single_file(run_pymg, tmp_path: Path):
+    Path(tmp_path, 'good.py').write_text('def f():\n    return 1\n')
+    Path(tmp_path, 'bad.py').write_text('def f(:\n    return 1\n')
+    Path(tmp_path, 'undecodable.py').write_bytes(b'text = "\xff"\n')
+
+    good = run_pymg('--syntax', 'good.py')
+    assert good.returncode == 0 and 'INTACT' in good.stdout
+
+    bad = run_pymg('--syntax', 'bad.py')
+    assert bad.returncode == 1 and 'SyntaxError' in bad.stdout
+
+    undecodable = run_pymg('--syntax', 'undecodable.py')
+    assert undecodable.returncode == 1 and 'SyntaxError' in undecodable.stdout
+    assert 'Traceback' not in undecodable.stderr
+
+    assert run_pymg('--syntax', 'missing.py').returncode == 2
+
+
+def test_project_and_cache(run_pymg, tmp_path: Path):
+    project: Path = Path(tmp_path, 'project')
+    Path(project, 'package').mkdir(parents=True)
+
+    for index in range(5):
+        Path(project, 'package', f'module_{index}.py').write_text(f'VALUE = {index}\n')
+    Path(project, 'broken.py').write_text('if True\n    pass\n')
+
+    first = run_pymg('--syntax', 'project')
+    assert first.returncode == 1
+    assert 'Failed ❱ 1' in first.stdout and 'Cached ❱ 0' in first.stdout
+
+    Path(project, 'broken.py').write_text('if True:\n    pass\n')
+
+    second = run_pymg('--syntax', 'project')
+    assert second.returncode == 0
+    assert 'Checked ❱ 1' in second.stdout and 'Cached ❱ 5' in second.stdout
+
+    assert run_pymg('--syntax', 'project', 'project/*.py').returncode == 0
+    assert run_pymg('--syntax', 'empty/*.py', 'nothing/*.py').returncode == 2
@@ -0,0 +1,63 @@
+"""
+The tests of the phases of pymg (--timings and --timings-format).
+"""
+
+
+import json
+from pathlib import Path
+
+import pytest
+
+
+SCRIPT: str = '''
+value = 1
+raise ValueError("timed")
+'''
+
+
+@pytest.fixture
+def timed_run(run_pymg, tmp_path: Path, pymg_environment: dict):
+    """
+    A function that runs pymg with its temporary files (the timings file) in tmp_path/tmp.
+    """
+
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+    Path(tmp_path, 'tmp').mkdir()
+    pymg_environment['TMPDIR'] = Path(tmp_path, 'tmp').__str__()
+
+    return run_pymg
+
+
+def test_timings_table(timed_run, tmp_path: Path):
+    completed = timed_run('--timings', 'script.py')
+
+    assert 'Timings' in completed.stderr and 'Timings' not in completed.stdout
+    assert 'ValueError' in completed.stdout
+
+    for description in ('Importing pymg', 'Checking the syntax', 'Generating the templates', 'Printing the templates',
+                        'Total'):
+        assert description in completed.stderr
+
+    assert not any(Path(tmp_path, 'tmp').iterdir())
+
+
+def test_timings_json_across_processes(timed_run, tmp_path: Path):
+    completed = timed_run('--timings', '--timings-format', 'json', '--subprocess', 'script.py')
+
+    timings: dict = json.loads(completed.stderr)
+    processes: dict = {phase['phase']: phase['process'] for phase in timings['phases']}
+
+    assert processes['imports'] == processes['syntax'] == processes['exit'] == 'pymg'
+    assert processes['launch'].startswith('child ')
+    assert processes['templates'] == processes['print'] == processes['launch']
+
+    assert all(phase['ms'] >= 0 for phase in timings['phases'])
+    assert sum(phase['ms'] for phase in timings['phases']) == pytest.approx(timings['total_ms'], abs=0.1)
+    assert not any(Path(tmp_path, 'tmp').iterdir())
+
+
+def test_without_timings(timed_run, tmp_path: Path):
+    completed = timed_run('script.py')
+
+    assert 'Timings' not in completed.stderr
+    assert not any(Path(tmp_path, 'tmp').iterdir())
@@ -0,0 +1,71 @@
+"""
+The tests of the --watch option.
+"""
+
+
+import sys
+import time
+import signal
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from conftest import PYMG
+
+
+SCRIPT: str = '''
+import time
+from pathlib import Path
+
+print("run")
+Path("started").touch()
+time.sleep(1)
+raise ValueError("watched")
+'''
+
+
+def watch(tmp_path: Path, pymg_environment: dict, *args: str) -> subprocess.CompletedProcess:
+    """
+    The task of this function is to start pymg with the --watch option, to interrupt it (Ctrl+C) while
+    the script is running and to return the completed process.
+
+    :param tmp_path: The temporary directory of the test.
+    :param pymg_environment: The environment variables of pymg.
+    :param args: The arguments of pymg.
+    :return: subprocess.CompletedProcess
+    """
+
+    Path(tmp_path, 'script.py').write_text(SCRIPT)
+    process = subprocess.Popen(
+        [*PYMG, '--watch', *args, 'script.py'], cwd=tmp_path, env=pymg_environment,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+
+    deadline: float = time.monotonic() + 30
+    while not Path(tmp_path, 'started').exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    process.send_signal(signal.SIGINT)
+    stdout, stderr = process.communicate(timeout=30)
+
+    return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='SIGINT')
+def test_interrupt_while_running(tmp_path: Path, pymg_environment: dict):
+    completed = watch(tmp_path, pymg_environment)
+
+    assert completed.returncode == 0
+    assert 'Traceback' not in completed.stderr
+    assert 'ValueError' in completed.stdout
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='SIGINT')
+@pytest.mark.parametrize('mode', ['--in-process', '--subprocess'])
+def test_output_file(tmp_path: Path, pymg_environment: dict, mode: str):
+    completed = watch(tmp_path, pymg_environment, '-o', 'watch.txt', mode)
+    log: str = Path(tmp_path, 'watch.txt').read_text()
+
+    assert completed.returncode == 0
+    assert 'run' in log and 'ValueError' in log
@@ -0,0 +1,126 @@
+"""
+The tests of the exceptions of threads and multiprocessing children.
+"""
+
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+
+THREADS: str = '''
+import threading
+
+
+def work(number):
+    raise ValueError(f"thread {number}")
+
+
+threads = [threading.Thread(target=work, args=(number,), name=f"worker-{number}") for number in range(8)]
+
+for thread in threads:
+    thread.start()
+
+for thread in threads:
+    thread.join()
+
+print("done")
+'''
+
+# The message of each child is rendered into a panel larger than a pipe buffer, so the panels interleave without
+# the output lock.
+PROCESSES: str = '''
+import sys
+import multiprocessing
+
+
+def work(number):
+    raise KeyError(f"child {number} " * 20000)
+
+
+if __name__ == "__main__":
+    context = multiprocessing.get_context(sys.argv[1])
+    processes = [context.Process(target=work, args=(number,), name=f"child-{number}") for number in range(4)]
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+
+    print("exit codes", *(process.exitcode for process in processes))
+'''
+
+
+def get_panels(output: str) -> list[list[str]]:
+    """
+    The task of this function is to split an output into its outer panels and to check that they do not interleave.
+
+    :param output: The output of pymg.
+    :return: list[list[str]]
+    """
+
+    panels: list = []
+    panel: list|None = None
+
+    for line in output.splitlines():
+        if line.startswith('╭'):
+            assert panel is None, 'a panel started inside another panel'
+            panel = [line]
+        elif panel is not None:
+            panel.append(line)
+
+            if line.startswith('╰'):
+                panels.append(panel)
+                panel = None
+
+    assert panel is None, 'a panel was not closed'
+
+    return panels
+
+
+@pytest.mark.parametrize('mode', ['--in-process', '--subprocess'])
+def test_thread_exceptions(run_pymg, tmp_path: Path, mode: str):
+    Path(tmp_path, 'script.py').write_text(THREADS)
+    completed = run_pymg(mode, 'script.py')
+
+    panels: list = get_panels(output=completed.stdout)
+    titles: list = [re.search(r'Exception in thread (worker-\d)', panel[0]).group(1) for panel in panels]
+
+    assert sorted(titles) == [f'worker-{number}' for number in range(8)]
+    assert all('ValueError' in '\n'.join(panel) for panel in panels)
+    assert 'Traceback' not in completed.stderr
+    assert 'done' in completed.stdout
+
+
+@pytest.mark.parametrize('mode', ['--in-process', '--subprocess'])
+def test_default_thread_excepthook_is_kept(run_pymg, tmp_path: Path, mode: str):
+    Path(tmp_path, 'script.py').write_text(
+        'import threading\n'
+        'threading.excepthook = threading.__excepthook__\n'
+        'thread = threading.Thread(target=lambda: 1 / 0, name="restored")\n'
+        'thread.start()\n'
+        'thread.join()\n'
+    )
+    completed = run_pymg(mode, 'script.py')
+
+    assert 'Exception in thread restored' in completed.stderr and 'ZeroDivisionError' in completed.stderr
+    assert not get_panels(output=completed.stdout)
+
+
+@pytest.mark.parametrize('start_method', [
+    pytest.param('fork', marks=pytest.mark.skipif(sys.platform == 'win32', reason='no fork')), 'spawn'
+])
+def test_process_exceptions(run_pymg, tmp_path: Path, start_method: str):
+    Path(tmp_path, 'script.py').write_text(PROCESSES)
+    completed = run_pymg('script.py', start_method)
+
+    panels: list = get_panels(output=completed.stdout)
+    titles: list = [re.search(r'Exception in process (child-\d) \(pid \d+\)', panel[0]).group(1) for panel in panels]
+
+    assert sorted(titles) == [f'child-{number}' for number in range(4)]
+    assert all('KeyError' in '\n'.join(panel) for panel in panels)
+    assert 'Traceback' not in completed.stderr
+    assert 'exit codes 1 1 1 1' in completed.stdout
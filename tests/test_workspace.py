@@ -0,0 +1,75 @@
+"""
+The tests of the exceptionhook outside of a run of pymg (without a workspace).
+"""
+
+
+import sys
+import pickle
+import subprocess
+from pathlib import Path
+
+
+APP: str = '''
+import sys
+from pymg.pymg import display_error_message
+
+sys.excepthook = display_error_message
+
+
+def parse(value):
+    return int(value)
+
+
+parse("x")
+'''
+
+
+class Planted:
+    """
+    A pickle that creates the file 'planted' in the current directory when it is loaded.
+    """
+
+    def __reduce__(self):
+        return open, ('planted', 'w')
+
+
+def run_app(tmp_path: Path, pymg_environment: dict) -> subprocess.CompletedProcess:
+    """
+    The task of this function is to run a script that installs the exceptionhook by hand,
+    with its temporary directory in tmp_path/tmp.
+
+    :param tmp_path: The temporary directory of the test.
+    :param pymg_environment: The environment variables of pymg.
+    :return: subprocess.CompletedProcess
+    """
+
+    Path(tmp_path, 'app.py').write_text(APP)
+
+    return subprocess.run(
+        [sys.executable, 'app.py'], cwd=tmp_path, env={**pymg_environment, 'TMPDIR': Path(tmp_path, 'tmp').__str__()},
+        capture_output=True, text=True, timeout=60
+    )
+
+
+def test_shared_directory_is_not_read(tmp_path: Path, pymg_environment: dict):
+    Path(tmp_path, 'tmp').mkdir()
+
+    for name in ('recipe.pymgrcp', 'sourceinfo.pymgsinfo', 'settings.pymgstg'):
+        Path(tmp_path, 'tmp', name).write_bytes(pickle.dumps(Planted()))
+
+    completed = run_app(tmp_path=tmp_path, pymg_environment=pymg_environment)
+
+    assert not Path(tmp_path, 'planted').exists()
+    assert 'ValueError' in completed.stdout
+    assert 'parse' in completed.stdout and 'app.py' in completed.stdout
+
+
+def test_recipe_of_the_last_operation(run_pymg, tmp_path: Path, pymg_environment: dict):
+    Path(tmp_path, 'tmp').mkdir()
+    Path(tmp_path, 'script.py').write_text('raise KeyError("k")\n')
+    run_pymg('-t', 'script.py')
+
+    completed = run_app(tmp_path=tmp_path, pymg_environment=pymg_environment)
+
+    assert 'Exception Type ❱ ValueError' in completed.stdout
+    assert 'Trace' not in completed.stdout